@@ -0,0 +1,95 @@
+"""Synthetic meeting transcripts and WAV files for offline benchmarks."""
+import os
+import random
+import wave
+from typing import Dict, List
+
+import numpy as np
+
+
+NAMES = ["Alice", "Bob", "Priya", "Chen", "Maria", "Omar", "Sofia", "Liam"]
+TOPICS = ["the Q3 deck", "the onboarding flow", "the billing migration", "the hiring plan",
+          "the vendor contract", "the release checklist", "the compliance audit", "the marketing budget"]
+FILLERS = ["um", "uh", "you know", "I mean", "so"]
+TEMPLATES = [
+    "{filler}, I think we should finalize {topic} by Friday.",
+    "{name} will send {topic} to finance before the review.",
+    "We are a bit behind on {topic} and that is a concern.",
+    "Great progress on {topic}, the team did a solid job.",
+    "Can {name} own {topic}? {filler}, it needs an owner.",
+    "The risk is that {topic} slips into next quarter.",
+    "Let's agree that {name} follows up on {topic} next week.",
+    "{filler} {filler}, I I think {topic} is on track.",
+]
+
+
+def synthetic_segments(duration: float, seed: int = 0, segment_seconds: float = 5.0) -> List[Dict]:
+    """Whisper-style segments covering `duration` seconds of a fake meeting."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(start + rng.uniform(0.6, 1.4) * segment_seconds, duration)
+        text = rng.choice(TEMPLATES).format(
+            filler=rng.choice(FILLERS), name=rng.choice(NAMES), topic=rng.choice(TOPICS)
+        )
+        segments.append({"start": round(start, 2), "end": round(end, 2), "text": " " + text})
+        start = end
+    return segments
+
+
+def synthetic_transcript(duration: float, seed: int = 0) -> str:
+    """Transcript rendered the way `transcribe_audio` renders it."""
+    return "\n".join(
+        f"Speaker {i+1} ({seg['start']}s): {seg['text'].strip()}"
+        for i, seg in enumerate(synthetic_segments(duration, seed))
+    )
+
+
+def write_wav(path: str, duration: float, seed: int = 0, sample_rate: int = 16000, channels: int = 1,
+              silence_ratio: float = 0.3):
+    """
+    Speech-like audio: bursts of modulated tones from a few "voices" separated by silences.
+    Different seeds give different content (and hashes), so runs are not coalesced.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * sample_rate)
+    audio = np.zeros(total, dtype=np.float32)
+    voices = rng.uniform(110, 260, size=3)
+
+    pos = 0
+    while pos < total:
+        burst = int(rng.uniform(1.0, 6.0) * sample_rate)
+        t = np.arange(min(burst, total - pos), dtype=np.float32) / sample_rate
+        f0 = rng.choice(voices)
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(2, 5) * t)
+        audio[pos:pos + len(t)] = 0.3 * envelope * (
+            np.sin(2 * np.pi * f0 * t) + 0.5 * np.sin(2 * np.pi * 2 * f0 * t)
+        )
+        pos += len(t) + int(rng.exponential(silence_ratio * 4) * sample_rate)
+
+    audio += rng.normal(0, 0.003, size=total).astype(np.float32)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    return path
+
+
+def build_corpus(directory: str, durations: List[float], copies: int = 1, **wav_options) -> List[Dict]:
+    """Write `copies` distinct WAV files per duration; returns [{path, duration, seed, copy}]."""
+    os.makedirs(directory, exist_ok=True)
+    corpus = []
+    for duration in durations:
+        for copy in range(copies):
+            seed = int(duration * 1000) + copy
+            path = os.path.join(directory, f"meeting_{int(duration)}s_{copy}.wav")
+            if not os.path.exists(path):
+                write_wav(path, duration, seed=seed, **wav_options)
+            corpus.append({"path": path, "duration": duration, "seed": seed, "copy": copy})
+    return corpus
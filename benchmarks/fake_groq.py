@@ -0,0 +1,237 @@
+"""
+Local stand-in for the Groq API (chat completions + Whisper transcriptions).
+
+Latency, completion sizes and error rates are configurable, so the pipeline can be
+benchmarked without keys or network:
+
+    python -m benchmarks.fake_groq --port 8099 --latency-ms 400 --error-rate 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8099 GROQ_API_KEY=fake uvicorn src.interfaces.api:app
+"""
+import io
+import json
+import random
+import threading
+import time
+import wave
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import click
+
+from benchmarks.corpus import synthetic_segments
+from src.core.compact import estimate_tokens
+
+
+@dataclass
+class FakeGroqConfig:
+    latency_ms: float = 300.0           # fixed latency per chat completion
+    ms_per_input_token: float = 0.02    # prompt processing cost
+    ms_per_output_token: float = 2.0    # generation cost
+    completion_tokens: int = 200        # target size of generated text
+    whisper_base_ms: float = 500.0      # fixed latency per transcription
+    whisper_rtf: float = 0.005          # transcription seconds per audio second
+    error_rate: float = 0.0             # fraction of requests answered with 429/500
+    jitter: float = 0.1                 # +/- fraction of random latency jitter
+    seed: int = 0
+
+
+@dataclass
+class FakeGroqStats:
+    chat_requests: int = 0
+    transcription_requests: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    audio_seconds: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def as_dict(self) -> Dict:
+        with self.lock:
+            return {k: v for k, v in self.__dict__.items() if k != "lock"}
+
+
+def _pad_to_tokens(text: str, tokens: int) -> str:
+    filler = " The team will revisit open questions at the next sync."
+    while estimate_tokens(text) < tokens:
+        text += filler
+    return text
+
+
+def _chat_reply(messages, json_mode: bool, config: FakeGroqConfig) -> str:
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    if json_mode:
+        return json.dumps({
+            "summary": _pad_to_tokens("The team reviewed progress and agreed on next steps.", config.completion_tokens // 2),
+            "sentiment": "Positive",
+            "action_items": [
+                {"description": "Send the Q3 deck to finance", "assignee": "Bob", "deadline": "Friday",
+                 "priority": "High", "delay_risk": "Low"},
+                {"description": "Finalize the vendor contract", "assignee": "Priya", "deadline": "N/A",
+                 "priority": "Medium", "delay_risk": "Medium"},
+            ]
+        })
+    if "Generate a customizable" in prompt:
+        if "action item" in prompt:
+            return "Extract action items with owner, deadline and priority.\nTranscript: {transcript}\nSummary: {summary}"
+        return "Summarize this meeting for the stated audience:\n\n{transcript}"
+    if "predict risk of delay" in prompt:
+        text = "- Send the Q3 deck to finance: Low\n- Finalize the vendor contract: Medium"
+    elif "extract action items" in prompt:
+        text = ("- Send the Q3 deck to finance (Assignee: Bob, Deadline: Friday, Priority: High)\n"
+                "- Finalize the vendor contract (Assignee: Priya, Deadline: N/A, Priority: Medium)")
+    else:
+        text = "The team reviewed progress, discussed risks and agreed on next steps."
+    return _pad_to_tokens(text, config.completion_tokens)
+
+
+def _audio_seconds(body: bytes) -> float:
+    start = body.find(b"RIFF")
+    if start >= 0:
+        try:
+            with wave.open(io.BytesIO(body[start:]), "rb") as wf:
+                return wf.getnframes() / float(wf.getframerate())
+        except (wave.Error, EOFError):
+            pass
+    # Unknown container: assume 16 kHz 16-bit mono
+    return len(body) / 32000.0
+
+
+def make_handler(config: FakeGroqConfig, stats: FakeGroqStats):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+
+    def jittered(ms: float) -> float:
+        with rng_lock:
+            return max(ms * (1 + rng.uniform(-config.jitter, config.jitter)), 0) / 1000.0
+
+    def should_fail() -> Optional[int]:
+        with rng_lock:
+            if rng.random() < config.error_rate:
+                return rng.choice([429, 500])
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _fail(self, status: int):
+            with stats.lock:
+                stats.errors += 1
+            self._send_json(status, {"error": {"message": "injected failure", "type": "fake_error"}})
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send_json(200, stats.as_dict())
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.endswith("/chat/completions"):
+                self._chat(json.loads(body or b"{}"))
+            elif self.path.endswith("/audio/transcriptions"):
+                self._transcribe(body)
+            else:
+                self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def _chat(self, request: Dict):
+            status = should_fail()
+            if status:
+                return self._fail(status)
+
+            messages = request.get("messages", [])
+            json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+            prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+            text = _chat_reply(messages, json_mode, config)
+            completion_tokens = estimate_tokens(text)
+            time.sleep(jittered(
+                config.latency_ms
+                + prompt_tokens * config.ms_per_input_token
+                + completion_tokens * config.ms_per_output_token
+            ))
+
+            with stats.lock:
+                stats.chat_requests += 1
+                stats.prompt_tokens += prompt_tokens
+                stats.completion_tokens += completion_tokens
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+        def _transcribe(self, body: bytes):
+            status = should_fail()
+            if status:
+                return self._fail(status)
+
+            duration = _audio_seconds(body)
+            time.sleep(jittered(config.whisper_base_ms + duration * config.whisper_rtf * 1000))
+            segments = synthetic_segments(duration, seed=zlib.crc32(body))
+
+            with stats.lock:
+                stats.transcription_requests += 1
+                stats.audio_seconds += duration
+            self._send_json(200, {
+                "text": "".join(seg["text"] for seg in segments).strip(),
+                "language": "en",
+                "duration": duration,
+                "segments": [{"id": i, **seg} for i, seg in enumerate(segments)]
+            })
+
+    return Handler
+
+
+def start_fake_groq(config: Optional[FakeGroqConfig] = None, host: str = "127.0.0.1", port: int = 0):
+    """Start the stand-in in a daemon thread; returns (server, base_url, stats)."""
+    config = config or FakeGroqConfig()
+    stats = FakeGroqStats()
+    server = ThreadingHTTPServer((host, port), make_handler(config, stats))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", stats
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8099, show_default=True)
+@click.option("--latency-ms", default=300.0, show_default=True)
+@click.option("--completion-tokens", default=200, show_default=True)
+@click.option("--error-rate", default=0.0, show_default=True)
+def main(host: str, port: int, latency_ms: float, completion_tokens: int, error_rate: float):
+    config = FakeGroqConfig(latency_ms=latency_ms, completion_tokens=completion_tokens, error_rate=error_rate)
+    server, base_url, _ = start_fake_groq(config, host, port)
+    click.echo(f"Fake Groq listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local stand-in for Slack's chat.postMessage, for exercising the notification outbox:
+
+    python -m benchmarks.fake_slack --port 8098 --error-rate 0.2
+    SLACK_API_URL=http://127.0.0.1:8098/api SLACK_BOT_TOKEN=fake uvicorn src.interfaces.api:app
+
+Like Slack, it answers 429 with Retry-After when a channel gets more than
+`rate_per_channel` posts per second. GET /messages returns what was received.
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import click
+
+
+@dataclass
+class FakeSlackConfig:
+    latency_ms: float = 50.0
+    error_rate: float = 0.0             # fraction of posts answered with HTTP 500
+    rate_per_channel: float = 1.0       # posts per second before 429
+    max_text: int = 40000               # longer texts fail with msg_too_long
+    seed: int = 0
+
+
+@dataclass
+class FakeSlackStats:
+    posts: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    messages: List[Dict] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def as_dict(self) -> Dict:
+        with self.lock:
+            return {"posts": self.posts, "errors": self.errors, "rate_limited": self.rate_limited,
+                    "messages": list(self.messages)}
+
+
+def make_handler(config: FakeSlackConfig, stats: FakeSlackStats):
+    rng = random.Random(config.seed)
+    last_post: Dict[str, float] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path in ("/messages", "/stats"):
+                self._send_json(200, stats.as_dict())
+            else:
+                self._send_json(404, {"ok": False, "error": "unknown_method"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.endswith("/chat.postMessage"):
+                return self._send_json(404, {"ok": False, "error": "unknown_method"})
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._send_json(200, {"ok": False, "error": "not_authed"})
+
+            request = json.loads(body or b"{}")
+            channel = request.get("channel")
+            time.sleep(config.latency_ms / 1000.0)
+            with stats.lock:
+                now = time.monotonic()
+                if now - last_post.get(channel, -1e9) < 1.0 / config.rate_per_channel:
+                    stats.rate_limited += 1
+                    return self._send_json(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": "1"})
+                if rng.random() < config.error_rate:
+                    stats.errors += 1
+                    return self._send_json(500, {"ok": False, "error": "internal_error"})
+                if not channel:
+                    return self._send_json(200, {"ok": False, "error": "channel_not_found"})
+                if len(request.get("text", "")) > config.max_text:
+                    return self._send_json(200, {"ok": False, "error": "msg_too_long"})
+
+                last_post[channel] = now
+                ts = f"{time.time():.6f}"
+                stats.posts += 1
+                stats.messages.append({"channel": channel, "ts": ts, "thread_ts": request.get("thread_ts"),
+                                       "text": request.get("text", "")})
+            self._send_json(200, {"ok": True, "channel": channel, "ts": ts})
+
+    return Handler
+
+
+def start_fake_slack(config: Optional[FakeSlackConfig] = None, host: str = "127.0.0.1", port: int = 0):
+    """Start the stand-in in a daemon thread; returns (server, api_base_url, stats)."""
+    config = config or FakeSlackConfig()
+    stats = FakeSlackStats()
+    server = ThreadingHTTPServer((host, port), make_handler(config, stats))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api", stats
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8098, show_default=True)
+@click.option("--latency-ms", default=50.0, show_default=True)
+@click.option("--error-rate", default=0.0, show_default=True)
+@click.option("--rate-per-channel", default=1.0, show_default=True)
+def main(host: str, port: int, latency_ms: float, error_rate: float, rate_per_channel: float):
+    config = FakeSlackConfig(latency_ms=latency_ms, error_rate=error_rate, rate_per_channel=rate_per_channel)
+    server, base_url, _ = start_fake_slack(config, host, port)
+    click.echo(f"Fake Slack listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
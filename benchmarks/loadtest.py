@@ -0,0 +1,363 @@
+"""
+Load test of the API: simulated Socket.IO chat users plus concurrent HTTP callers.
+
+Starts the fake Groq server (benchmarks/fake_groq.py) and one uvicorn worker in
+subprocesses, seeds a meeting, then ramps the number of virtual users level by level.
+Each user holds a Socket.IO connection and loops over a weighted mix of chat `message`
+events, /process_meeting uploads, /get_meetings reads and /feedback posts:
+
+    python -m benchmarks.loadtest --levels 1,2,4,8,16,32,64 --step-seconds 15
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --mix chat=80,get_meetings=20
+
+Per level it reports latency percentiles and errors per operation, throughput, and the
+server's event-loop lag (scraped from /metrics). The first level whose overall p99
+exceeds --p99-slo or whose error rate exceeds --max-error-rate is the saturation point;
+ramping stops there. Results are written as JSON
+(default: benchmarks/results/loadtest-<commit>-<timestamp>.json).
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import click
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import ROOT, git_commit, summarize_latencies
+
+
+OPERATIONS = ("chat", "process_meeting", "get_meetings", "feedback")
+LAG_METRIC = "clarity_event_loop_lag_seconds"
+BUCKET_RE = re.compile(rf'^{LAG_METRIC}_bucket\{{le="([^"]+)"\}} ([0-9.e+-]+)$')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise click.BadParameter(f"unknown operation {name!r} (expected one of {', '.join(OPERATIONS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class SocketIOClient:
+    """Minimal Socket.IO (Engine.IO v4, WebSocket transport) client for the default namespace."""
+
+    def __init__(self, base_url: str):
+        self.url = base_url.replace("http", "ws", 1).rstrip("/") + "/socket.io/?EIO=4&transport=websocket"
+        self.events: asyncio.Queue = asyncio.Queue()
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self, timeout: float = 10.0):
+        import websockets
+
+        self._ws = await asyncio.wait_for(websockets.connect(self.url, max_size=None), timeout)
+        await asyncio.wait_for(self._ws.recv(), timeout)  # Engine.IO open packet
+        await self._ws.send("40")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        async for packet in self._ws:
+            if packet == "2":
+                await self._ws.send("3")  # heartbeat
+            elif packet.startswith("42"):
+                event, *args = json.loads(packet[2:])
+                await self.events.put((event, args[0] if args else None))
+
+    async def emit(self, event: str, data):
+        await self._ws.send("42" + json.dumps([event, data]))
+
+    async def ask(self, message: str, meeting_id: Optional[str], timeout: float) -> Dict:
+        """Send a chat message and wait for the server's answer (status events are skipped)."""
+        await self.emit("message", {"message": message, "meeting_id": meeting_id})
+        deadline = time.monotonic() + timeout
+        while True:
+            event, data = await asyncio.wait_for(self.events.get(), max(deadline - time.monotonic(), 0.001))
+            if event == "message" and isinstance(data, dict) and data.get("type") in ("message", "error"):
+                return data
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        if self._ws:
+            await self._ws.close()
+
+
+def lag_snapshot(metrics_text: str) -> Dict[float, float]:
+    """Cumulative bucket counts of the event-loop lag histogram."""
+    buckets = {}
+    for line in metrics_text.splitlines():
+        match = BUCKET_RE.match(line)
+        if match:
+            buckets[float(match.group(1))] = float(match.group(2))
+    return buckets
+
+
+def lag_between(before: Dict[float, float], after: Dict[float, float]) -> Dict:
+    """Lag percentiles between two snapshots; each value is its bucket's upper bound."""
+    bounds = sorted(after)
+    counts = [after[b] - before.get(b, 0.0) for b in bounds]
+    total = counts[-1] if counts else 0
+    if not total:
+        return {"samples": 0}
+
+    def pct(q: float) -> float:
+        for bound, cumulative in zip(bounds, counts):
+            if cumulative >= q * total:
+                return bound
+        return bounds[-1]
+
+    return {"samples": int(total), "p50": pct(0.5), "p99": pct(0.99), "max": pct(1.0)}
+
+
+class Stack:
+    """Fake Groq and the API, each in its own process, in a scratch directory."""
+
+    def __init__(self, workers: int, latency_ms: float, completion_tokens: int):
+        self.workdir = tempfile.mkdtemp(prefix="clarity-load-")
+        self.groq_port, self.api_port = free_port(), free_port()
+        self.base_url = f"http://127.0.0.1:{self.api_port}"
+        env = {
+            **os.environ,
+            "PYTHONPATH": ROOT,
+            "GROQ_API_KEY": "fake-key",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{self.groq_port}",
+            "DB_PATH": os.path.join(self.workdir, "instance", "analytics.db"),
+            "STATE_DB_PATH": os.path.join(self.workdir, "instance", "state.db"),
+            "CHECKPOINT_DB_PATH": os.path.join(self.workdir, "instance", "checkpoints.db"),
+            "LOG_LEVEL": "WARNING",
+        }
+        self.log = open(os.path.join(self.workdir, "server.log"), "wb")
+        self.processes = [
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_groq", "--port", str(self.groq_port),
+                 "--latency-ms", str(latency_ms), "--completion-tokens", str(completion_tokens)],
+                cwd=ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT
+            ),
+            subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "--factory", "src.interfaces.api:create_app",
+                 "--port", str(self.api_port), "--workers", str(workers), "--log-level", "warning"],
+                cwd=self.workdir, env=env, stdout=self.log, stderr=subprocess.STDOUT
+            ),
+        ]
+
+    async def wait_ready(self, client, timeout: float = 60.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if any(process.poll() is not None for process in self.processes):
+                break
+            try:
+                if (await client.get("/get_meetings")).status_code == 200:
+                    return
+            except Exception:
+                pass
+            await asyncio.sleep(0.25)
+        raise RuntimeError(f"API did not start; see {self.log.name}")
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.log.close()
+
+
+async def upload(client, path: str) -> Tuple[bool, Optional[str]]:
+    with open(path, "rb") as f:
+        response = await client.post(
+            "/process_meeting",
+            data={"input": json.dumps({"meeting_title": "load test"})},
+            files={"file": (os.path.basename(path), f, "audio/wav")},
+        )
+    ok = response.status_code == 200
+    return ok, response.json().get("meeting_id") if ok else None
+
+
+async def run_level(client, base_url: str, users: int, seconds: float, weights: Dict[str, float],
+                    meeting_id: str, corpus: List[Dict], timeout: float, think_ms: float, rng: random.Random) -> Dict:
+    latencies: Dict[str, List[Optional[float]]] = {op: [] for op in weights}
+    sockets: List[SocketIOClient] = []
+    connect_errors = 0
+    for _ in range(users):
+        sio = SocketIOClient(base_url)
+        try:
+            await sio.connect()
+            sockets.append(sio)
+        except Exception:
+            connect_errors += 1
+
+    operations, cumulative = list(weights), []
+    total = 0.0
+    for op in operations:
+        total += weights[op]
+        cumulative.append(total)
+
+    async def user(index: int, sio: Optional[SocketIOClient], deadline: float):
+        while time.monotonic() < deadline:
+            op = operations[next(i for i, c in enumerate(cumulative) if rng.random() * total < c)]
+            start = time.perf_counter()
+            try:
+                if op == "chat":
+                    if sio is None:
+                        raise RuntimeError("not connected")
+                    reply = await sio.ask(f"What did the team decide? ({index})", meeting_id, timeout)
+                    ok = reply.get("type") == "message"
+                elif op == "process_meeting":
+                    ok, _ = await asyncio.wait_for(upload(client, rng.choice(corpus)["path"]), timeout)
+                elif op == "get_meetings":
+                    ok = (await client.get("/get_meetings", timeout=timeout)).status_code == 200
+                else:
+                    response = await client.post("/feedback", timeout=timeout, json={
+                        "meeting_id": meeting_id, "rating": rng.randint(1, 5), "comments": "load test"
+                    })
+                    ok = response.status_code == 200
+            except Exception:
+                ok = False
+            latencies[op].append(time.perf_counter() - start if ok else None)
+            if think_ms:
+                await asyncio.sleep(think_ms / 1000.0)
+
+    before = lag_snapshot((await client.get("/metrics")).text)
+    start = time.perf_counter()
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(
+        user(i, sockets[i] if i < len(sockets) else None, deadline) for i in range(users)
+    ))
+    elapsed = time.perf_counter() - start
+    lag = lag_between(before, lag_snapshot((await client.get("/metrics")).text))
+    await asyncio.gather(*(sio.close() for sio in sockets), return_exceptions=True)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    overall = summarize_latencies(all_latencies)
+    requests = len(all_latencies)
+    return {
+        "users": users,
+        "seconds": round(elapsed, 2),
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round((overall["errors"] + connect_errors) / max(requests + connect_errors, 1), 4),
+        "connect_errors": connect_errors,
+        "overall": overall,
+        "operations": {op: summarize_latencies(values) for op, values in latencies.items()},
+        "event_loop_lag": lag,
+    }
+
+
+async def load_test(url: Optional[str], levels: List[int], step_seconds: float, weights: Dict[str, float],
+                    p99_slo: float, max_error_rate: float, timeout: float, think_ms: float, workers: int,
+                    latency_ms: float, completion_tokens: int, seed: int) -> Dict:
+    import httpx
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    stack = None if url else Stack(workers, latency_ms, completion_tokens)
+    base_url = url or stack.base_url
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+            if stack:
+                await stack.wait_ready(client)
+            corpus = build_corpus(os.path.join(tempfile.gettempdir(), "clarity-load-corpus"), [15], copies=8)
+
+            click.echo("Seeding a meeting for chat and feedback ...")
+            ok, meeting_id = await upload(client, corpus[0]["path"])
+            if not ok:
+                raise RuntimeError("Seeding /process_meeting failed")
+
+            results, saturation = [], None
+            for users in levels:
+                level = await run_level(client, base_url, users, step_seconds, weights, meeting_id, corpus,
+                                        timeout, think_ms, rng)
+                results.append(level)
+                overall, lag = level["overall"], level["event_loop_lag"]
+                click.echo(
+                    f"  {users:>4} users: {level['requests_per_second']:>7.1f} req/s  "
+                    f"p50 {overall.get('p50', float('nan')):.3f}s  p99 {overall.get('p99', float('nan')):.3f}s  "
+                    f"errors {level['error_rate']:.1%}  loop lag p99 {lag.get('p99', float('nan'))}s"
+                )
+                if overall.get("p99", float("inf")) > p99_slo or level["error_rate"] > max_error_rate:
+                    saturation = users
+                    click.echo(f"Saturated at {users} users (p99 SLO {p99_slo}s, max error rate {max_error_rate:.1%})")
+                    break
+    finally:
+        if stack:
+            stack.stop()
+
+    best = max(results, key=lambda level: level["requests_per_second"]) if results else None
+    return {
+        "levels": results,
+        "saturation_users": saturation,
+        "max_sustained_users": next(
+            (level["users"] for level in reversed(results) if level["users"] != saturation), None
+        ),
+        "peak_requests_per_second": best["requests_per_second"] if best else None,
+    }
+
+
+@click.command()
+@click.option("--url", default=None, help="Target a running API instead of starting one")
+@click.option("--levels", default="1,2,4,8,16,32,64,128", show_default=True, help="Comma-separated user counts to ramp through")
+@click.option("--step-seconds", default=15.0, show_default=True, help="Duration of each level")
+@click.option("--mix", default="chat=60,get_meetings=20,feedback=15,process_meeting=5", show_default=True,
+              help="Operation weights")
+@click.option("--p99-slo", default=2.0, show_default=True, help="Overall p99 (s) above which a level counts as saturated")
+@click.option("--max-error-rate", default=0.01, show_default=True)
+@click.option("--timeout", default=30.0, show_default=True, help="Per-request timeout (s)")
+@click.option("--think-ms", default=0.0, show_default=True, help="Pause between a user's requests")
+@click.option("--workers", default=1, show_default=True, help="uvicorn workers when starting the API")
+@click.option("--latency-ms", default=300.0, show_default=True, help="Fake Groq latency per call")
+@click.option("--completion-tokens", default=200, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option("--output", default=None, help="Result file (default: benchmarks/results/loadtest-<commit>-<time>.json)")
+def main(url, levels, step_seconds, mix, p99_slo, max_error_rate, timeout, think_ms, workers, latency_ms,
+         completion_tokens, seed, output):
+    levels = [int(level) for level in levels.split(",")]
+    weights = parse_mix(mix)
+    click.echo(f"Ramping {levels} users, {step_seconds:.0f}s per level, mix {weights}")
+    report = asyncio.run(load_test(url, levels, step_seconds, weights, p99_slo, max_error_rate, timeout,
+                                   think_ms, workers, latency_ms, completion_tokens, seed))
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "url": url, "levels": levels, "step_seconds": step_seconds, "mix": weights, "p99_slo": p99_slo,
+            "max_error_rate": max_error_rate, "workers": workers, "latency_ms": latency_ms,
+            "completion_tokens": completion_tokens,
+        },
+        **report,
+    }
+    output = output or os.path.join(
+        ROOT, "benchmarks", "results", f"loadtest-{result['commit']}-{time.strftime('%Y%m%d%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    click.echo(f"Saturation: {report['saturation_users'] or 'not reached'}; "
+               f"max sustained users: {report['max_sustained_users']}; "
+               f"peak throughput: {report['peak_requests_per_second']} req/s")
+    click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
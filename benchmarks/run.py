@@ -0,0 +1,316 @@
+"""
+Offline end-to-end benchmark of the meeting pipeline and API.
+
+Runs `run_workflow` and the FastAPI endpoints against the local fake Groq server
+(benchmarks/fake_groq.py) over a synthetic WAV corpus and reports per-node latency,
+end-to-end p50/p95, throughput per concurrency level and memory high-water marks:
+
+    python -m benchmarks.run --durations 30,120,600 --concurrency 1,4,16
+    python -m benchmarks.run --compare benchmarks/results/<previous>.json
+
+Results are written as JSON (default: benchmarks/results/<commit>-<timestamp>.json).
+"""
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import click
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_groq import FakeGroqConfig, start_fake_groq
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def summarize_latencies(values: List[Optional[float]]) -> Dict:
+    """Latency percentiles; `None` entries count as failed runs."""
+    errors = sum(value is None for value in values)
+    ordered = sorted(value for value in values if value is not None)
+    if not ordered:
+        return {"count": 0, "errors": errors}
+
+    def pct(q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": round(pct(0.50), 4),
+        "p95": round(pct(0.95), 4),
+        "p99": round(pct(0.99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class NodeTimer:
+    """Collects per-node durations reported by the workflow's node observers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def __call__(self, name, seconds, state, error):
+        with self.lock:
+            self.durations.setdefault(name, []).append(seconds)
+            if error is not None:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self) -> Dict:
+        with self.lock:
+            return {
+                name: {**summarize_latencies(values), "errors": self.errors.get(name, 0)}
+                for name, values in sorted(self.durations.items())
+            }
+
+
+def timed_run(item: Dict, workdir: str, **options) -> Optional[float]:
+    """Seconds for one `run_workflow`, or None if it failed (e.g. injected Groq errors)."""
+    from src.graphs.meeting_workflow import run_workflow
+
+    output = os.path.join(workdir, f"notes_{os.path.basename(item['path'])}.md")
+    start = time.perf_counter()
+    try:
+        run_workflow(item["path"], output, **options)
+    except Exception as e:
+        click.echo(f"  run failed for {os.path.basename(item['path'])}: {e}", err=True)
+        return None
+    return time.perf_counter() - start
+
+
+def bench_pipeline(corpus: List[Dict], workdir: str, repeats: int, options: Dict) -> Dict:
+    """Sequential runs per audio duration: end-to-end latency by input length."""
+    # Warm-up run so lazy imports and graph compilation are not measured
+    timed_run(corpus[-1], workdir, **options)
+
+    by_duration: Dict[str, List[float]] = {}
+    for _ in range(repeats):
+        for item in corpus:
+            if item["copy"] != 0:
+                continue
+            by_duration.setdefault(f"{int(item['duration'])}s", []).append(timed_run(item, workdir, **options))
+    return {duration: summarize_latencies(values) for duration, values in by_duration.items()}
+
+
+def bench_concurrency(corpus: List[Dict], workdir: str, levels: List[int], options: Dict) -> List[Dict]:
+    """Throughput of `run_workflow` with N concurrent meetings (distinct audio, so nothing is coalesced)."""
+    shortest = min(item["duration"] for item in corpus)
+    files = [item for item in corpus if item["duration"] == shortest]
+    results = []
+    for level in levels:
+        batch = files[:max(level * 2, 1)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            latencies = list(pool.map(lambda item: timed_run(item, workdir, **options), batch))
+        elapsed = time.perf_counter() - start
+        results.append({
+            "concurrency": level,
+            "meetings": len(batch),
+            "audio_seconds": shortest,
+            "wall_seconds": round(elapsed, 3),
+            "meetings_per_second": round(sum(lat is not None for lat in latencies) / elapsed, 3),
+            "latency": summarize_latencies(latencies),
+        })
+        click.echo(f"  concurrency {level:>3}: {results[-1]['meetings_per_second']:.2f} meetings/s, "
+                   f"p95 {results[-1]['latency'].get('p95', float('nan')):.2f}s")
+    return results
+
+
+async def bench_api(corpus: List[Dict], levels: List[int], read_requests: int) -> Dict:
+    """Drive the FastAPI app in-process over ASGI: uploads, then read endpoints."""
+    import httpx
+    from src.interfaces.api import create_app
+
+    transport = httpx.ASGITransport(app=create_app())
+    shortest = min(item["duration"] for item in corpus)
+    files = [item for item in corpus if item["duration"] == shortest]
+    report: Dict = {"process_meeting": [], "reads": {}}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for level in levels:
+            semaphore = asyncio.Semaphore(level)
+            latencies, errors = [], 0
+
+            async def upload(item):
+                nonlocal errors
+                async with semaphore:
+                    with open(item["path"], "rb") as f:
+                        start = time.perf_counter()
+                        response = await client.post(
+                            "/process_meeting",
+                            data={"input": json.dumps({"meeting_title": "bench"})},
+                            files={"file": (os.path.basename(item["path"]), f, "audio/wav")},
+                        )
+                        latencies.append(time.perf_counter() - start)
+                        errors += response.status_code != 200
+
+            start = time.perf_counter()
+            await asyncio.gather(*(upload(item) for item in files[:max(level * 2, 1)]))
+            elapsed = time.perf_counter() - start
+            report["process_meeting"].append({
+                "concurrency": level,
+                "requests": len(latencies),
+                "errors": errors,
+                "requests_per_second": round(len(latencies) / elapsed, 3),
+                "latency": summarize_latencies(latencies),
+            })
+
+        for path in ("/get_meetings", "/analytics"):
+            latencies = []
+
+            async def read():
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(read() for _ in range(read_requests)))
+            report["reads"][path] = summarize_latencies(latencies)
+
+    return report
+
+
+def print_comparison(current: Dict, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def row(label, old, new):
+        if old is None or new is None:
+            return
+        change = (new - old) / old * 100 if old else 0.0
+        click.echo(f"  {label:<45} {old:>9.3f} -> {new:>9.3f}  ({change:+.1f}%)")
+
+    click.echo(f"\nComparison against {baseline.get('commit')} ({baseline_path}):")
+    for duration, stats in current["pipeline"].items():
+        row(f"pipeline {duration} p50 (s)", baseline.get("pipeline", {}).get(duration, {}).get("p50"), stats.get("p50"))
+    for node, stats in current["nodes"].items():
+        row(f"node {node} p50 (s)", baseline.get("nodes", {}).get(node, {}).get("p50"), stats.get("p50"))
+    old_levels = {entry["concurrency"]: entry for entry in baseline.get("concurrency", [])}
+    for entry in current["concurrency"]:
+        old = old_levels.get(entry["concurrency"], {})
+        row(f"throughput @{entry['concurrency']} (meetings/s)", old.get("meetings_per_second"), entry["meetings_per_second"])
+    row("max RSS (MB)", baseline.get("memory", {}).get("max_rss_mb"), current["memory"]["max_rss_mb"])
+
+
+@click.command()
+@click.option("--durations", default="30,120,600", show_default=True, help="Comma-separated audio lengths (seconds)")
+@click.option("--concurrency", default="1,4,16", show_default=True, help="Comma-separated concurrency levels")
+@click.option("--repeats", default=3, show_default=True, help="Sequential runs per duration")
+@click.option("--latency-ms", default=300.0, show_default=True, help="Fake Groq fixed latency per chat call")
+@click.option("--completion-tokens", default=200, show_default=True)
+@click.option("--error-rate", default=0.0, show_default=True, help="Fraction of fake Groq calls that fail")
+@click.option("--pipeline-mode", type=click.Choice(["multi", "structured"]), default="multi", show_default=True)
+@click.option("--api/--no-api", default=True, show_default=True, help="Also benchmark the HTTP endpoints")
+@click.option("--trace-memory", is_flag=True, help="Track Python heap peaks with tracemalloc (slower)")
+@click.option("--output", default=None, help="Result file (default: benchmarks/results/<commit>-<time>.json)")
+@click.option("--compare", "compare_with", default=None, help="Previous result file to diff against")
+def main(durations, concurrency, repeats, latency_ms, completion_tokens, error_rate, pipeline_mode,
+         api, trace_memory, output, compare_with):
+    from src.graphs.meeting_workflow import node_observers
+    from src.utils.config import Config
+
+    durations = [float(d) for d in durations.split(",")]
+    levels = [int(c) for c in concurrency.split(",")]
+    fake_config = FakeGroqConfig(latency_ms=latency_ms, completion_tokens=completion_tokens, error_rate=error_rate)
+    server, base_url, fake_stats = start_fake_groq(fake_config)
+
+    output = os.path.abspath(output) if output else None
+    compare_with = os.path.abspath(compare_with) if compare_with else None
+    workdir = tempfile.mkdtemp(prefix="clarity-bench-")
+    Config.GROQ_BASE_URL = base_url
+    Config.GROQ_API_KEY = "fake-key"
+    Config.DB_PATH = os.path.join(workdir, "instance", "analytics.db")
+    os.chdir(workdir)  # uploads/ and notes_*.md land in the scratch dir
+
+    click.echo(f"Building corpus in {workdir} ...")
+    corpus = build_corpus(os.path.join(workdir, "corpus"), durations, copies=max(levels) * 2)
+
+    timer = NodeTimer()
+    node_observers.append(timer)
+    if trace_memory:
+        tracemalloc.start()
+
+    options = {"pipeline_mode": pipeline_mode}
+    memory = {}
+
+    click.echo("Pipeline latency by audio length ...")
+    pipeline = bench_pipeline(corpus, workdir, repeats, options)
+    if trace_memory:
+        memory["pipeline_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.reset_peak()
+
+    click.echo("Throughput by concurrency ...")
+    concurrency_results = bench_concurrency(corpus, workdir, levels, options)
+    if trace_memory:
+        memory["concurrency_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.reset_peak()
+
+    api_results = None
+    if api:
+        click.echo("API endpoints ...")
+        api_results = asyncio.run(bench_api(corpus, levels, read_requests=50))
+        if trace_memory:
+            memory["api_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+
+    node_observers.remove(timer)
+    server.shutdown()
+    memory["max_rss_mb"] = max_rss_mb()
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "durations": durations, "concurrency": levels, "repeats": repeats,
+            "pipeline_mode": pipeline_mode, "fake_groq": fake_config.__dict__,
+        },
+        "pipeline": pipeline,
+        "nodes": timer.report(),
+        "concurrency": concurrency_results,
+        "api": api_results,
+        "memory": memory,
+        "fake_groq": fake_stats.as_dict(),
+    }
+
+    output = output or os.path.join(ROOT, "benchmarks", "results", f"{result['commit']}-{time.strftime('%Y%m%d%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    click.echo("\nPer-node latency:")
+    for node, stats in result["nodes"].items():
+        click.echo(f"  {node:<25} p50 {stats.get('p50', 0):.3f}s  p95 {stats.get('p95', 0):.3f}s  (n={stats['count']}, errors={stats['errors']})")
+    click.echo("End-to-end: " + ", ".join(f"{d} p50 {s.get('p50', 0):.2f}s / p95 {s.get('p95', 0):.2f}s" for d, s in pipeline.items()))
+    click.echo(f"Memory: {memory}")
+    click.echo(f"Results written to {output}")
+
+    if compare_with:
+        print_comparison(result, compare_with)
+
+
+if __name__ == "__main__":
+    main()
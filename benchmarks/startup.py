@@ -0,0 +1,67 @@
+"""
+Import-time profile of the API server and CLI, enforced against a startup budget.
+
+    python -m benchmarks.startup              # exit 1 if any target is over budget
+    python -m benchmarks.startup --budget 0.8 --top 15
+
+Each target runs in a fresh interpreter (no GROQ_API_KEY required) and is timed
+end to end; `-X importtime` output is used to list the slowest imports.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TARGETS = {
+    "api": [sys.executable, "-X", "importtime", "-c", "import src.interfaces.api"],
+    "cli --help": [sys.executable, "-X", "importtime", os.path.join("src", "main.py"), "--help"],
+}
+
+# Modules that must only be imported when first used
+LAZY_MODULES = ("langchain_groq", "langchain_core", "langgraph", "groq", "spacy", "pyaudio", "numpy")
+
+
+def profile(cmd):
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        imports.append((int(cumulative_us), name))
+    return elapsed, imports
+
+
+@click.command()
+@click.option("--budget", default=1.0, show_default=True, help="Maximum seconds per target")
+@click.option("--top", default=10, show_default=True, help="Number of slowest imports to list")
+def main(budget: float, top: int):
+    failed = False
+    for target, cmd in TARGETS.items():
+        elapsed, imports = profile(cmd)
+        eager = sorted({name for _, name in imports if name.split(".")[0] in LAZY_MODULES})
+        status = "OK" if elapsed <= budget and not eager else "FAIL"
+        failed |= status == "FAIL"
+
+        click.echo(f"[{status}] {target}: {elapsed:.3f}s (budget {budget:.2f}s)")
+        for cumulative_us, name in sorted(imports, reverse=True)[:top]:
+            click.echo(f"    {cumulative_us / 1e6:7.3f}s  {name}")
+        if eager:
+            click.echo(f"    eagerly imported heavy modules: {', '.join(eager[:10])}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,15 @@ function RealTime({ setResults }) {
   const [error, setError] = useState('');
   const [loading, setLoading] = useState(false);
 
-  const fetchResults = async () => {
+  const [meetingId, setMeetingId] = useState(null);
+
+  const fetchResults = async (id) => {
     setLoading(true);
     try {
-      const resultRes = await axios.get('http://localhost:8000/get_transcription_results');
+      // Long-poll: the server answers as soon as the recording has been processed
+      const resultRes = await axios.get('http://localhost:8000/get_transcription_results', {
+        params: { meeting_id: id || undefined, timeout: 60 }
+      });
       setResults(resultRes.data);
       setError('');
     } catch (err) {
@@ -39,7 +44,8 @@ function RealTime({ setResults }) {
         custom_prompt_description: customPromptDescription
       });
       if (res.data.status === 'Recording started') {
-        setTimeout(fetchResults, 35000);
+        setMeetingId(res.data.meeting_id);
+        setTimeout(() => fetchResults(res.data.meeting_id), 35000);
       }
     } catch (err) {
       const errorMessage = 'Error starting real-time transcription: ' + (err.response?.data?.detail || err.message);
@@ -53,7 +59,7 @@ function RealTime({ setResults }) {
       const res = await axios.post('http://localhost:8000/stop_recording');
       setRecording(false);
       if (res.data.status === 'Recording stopped') {
-        await fetchResults();
+        await fetchResults(meetingId);
       }
     } catch (err) {
       const errorMessage = 'Error stopping recording: ' + (err.response?.data?.detail || err.message);
@@ -0,0 +1,426 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.analytics import transaction
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+# Words that carry no meaning for "is this the same task"
+STOPWORDS = frozenset({
+    "a", "an", "the", "to", "of", "for", "on", "in", "at", "by", "with", "and", "or", "from", "into",
+    "our", "their", "his", "her", "its", "this", "that", "these", "those", "all", "any", "up",
+    "will", "should", "must", "needs", "need", "please",
+})
+WORD_RE = re.compile(r"[^\W_]+")
+BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(?:\*\*)?(.+?)(?:\*\*)?\s*$")
+ITEM_SUFFIX_RE = re.compile(r"\s*\((?:Assignee|Owner|Deadline|Priority|Delay risk)\b.*$", re.IGNORECASE)
+
+GRAM_BITS = 24            # features are character (byte) trigrams, which fit in 24 bits and are their own ids
+NUM_PERM = 32             # MinHash permutations, split into BANDS bands of ROWS rows for LSH blocking
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+FEATURE_CHUNK = 100_000   # texts per feature/MinHash batch (bounds peak memory)
+PAIR_CHUNK = 250_000      # candidate pairs per cosine batch
+MERGE_PENDING = 10_000    # incremental band keys kept unsorted before they are merged into the index
+BUCKET_CANDIDATES = 32    # most recent items compared per LSH bucket when assigning a new item
+
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = np.uint64(0x100000001B3)
+
+
+def normalize(text: str) -> str:
+    """Lowercase words without punctuation or stopwords; the text that is compared ("" if it has no words)."""
+    words = WORD_RE.findall(text.lower())
+    kept = [word for word in words if word not in STOPWORDS]
+    return " ".join(kept or words)
+
+
+def parse_action_items(actions: Optional[str]) -> List[str]:
+    """
+    Action item descriptions from a meeting's stored `actions`: the bullet text both
+    pipelines produce (the "Predictions:" section is skipped) or a JSON list of
+    {"description": ...} objects from older rows.
+    """
+    if not actions:
+        return []
+    text = actions.strip()
+    if text.startswith("["):
+        try:
+            descriptions = [item.get("description") or "" for item in json.loads(text) if isinstance(item, dict)]
+            return [description.strip() for description in descriptions if normalize(description)]
+        except ValueError:
+            pass
+
+    items = []
+    for line in text.splitlines():
+        if line.strip().lower().startswith("predictions:"):
+            break
+        match = BULLET_RE.match(line)
+        if match:
+            description = ITEM_SUFFIX_RE.sub("", match.group(1)).strip(" *:")
+            if normalize(description):
+                items.append(description)
+    return items
+
+
+def _expand(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenated ranges [starts[i], starts[i] + lengths[i])."""
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+    return np.arange(total, dtype=np.int64) - offsets
+
+
+def _features(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Character trigram counts of normalized texts (each non-empty) as CSR arrays
+    (indptr, gram ids sorted within each text, term frequency).
+    """
+    padded = "\0".join(f" {text} " for text in texts).encode("utf-8")
+    data = np.frombuffer(padded, dtype=np.uint8).astype(np.uint32)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    valid = (data[:-2] != 0) & (data[1:-1] != 0) & (data[2:] != 0)
+
+    # Text index of every position: separators mark the boundaries
+    doc = np.cumsum(data == 0)[:-2]
+    keys = (doc[valid].astype(np.int64) << GRAM_BITS) | codes[valid]
+    keys, tf = np.unique(keys, return_counts=True)
+    docs = keys >> GRAM_BITS
+    indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(docs, minlength=len(texts)), out=indptr[1:])
+    return indptr, (keys & ((1 << GRAM_BITS) - 1)).astype(np.uint32), tf.astype(np.uint16)
+
+
+def _minhash(indptr: np.ndarray, grams: np.ndarray) -> np.ndarray:
+    """(texts, NUM_PERM) MinHash signatures of each text's trigram set."""
+    signatures = np.empty((len(indptr) - 1, NUM_PERM), dtype=np.uint32)
+    g = grams.astype(np.uint64)
+    for k in range(NUM_PERM):
+        hashed = ((g * _PERM_A[k] + _PERM_B[k]) >> np.uint64(32)).astype(np.uint32)  # multiply-shift, wraps mod 2**64
+        signatures[:, k] = np.minimum.reduceat(hashed, indptr[:-1])
+    return signatures
+
+
+def _band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(texts, BANDS) bucket keys; texts sharing any key are compared."""
+    keys = np.empty((len(signatures), BANDS), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for band in range(BANDS):
+            key = np.full(len(signatures), band + 1, dtype=np.uint64)
+            for row in signatures[:, band * ROWS:(band + 1) * ROWS].T:
+                key = (key * _BAND_MIX) ^ row.astype(np.uint64)
+            keys[:, band] = key
+    return keys
+
+
+class Vectors:
+    """L2-normalized character-trigram TF-IDF vectors in CSR form, plus LSH band keys."""
+
+    def __init__(self, texts: List[str], idf: Optional[Tuple[np.ndarray, np.ndarray, float]] = None):
+        indptrs, grams, tfs, bands = [np.zeros(1, dtype=np.int64)], [], [], []
+        for start in range(0, len(texts), FEATURE_CHUNK):
+            indptr, chunk_grams, tf = _features(texts[start:start + FEATURE_CHUNK])
+            bands.append(_band_keys(_minhash(indptr, chunk_grams)))
+            indptrs.append(indptr[1:] + indptrs[-1][-1])
+            grams.append(chunk_grams)
+            tfs.append(tf)
+        self.indptr = np.concatenate(indptrs)
+        self.grams = np.concatenate(grams) if grams else np.zeros(0, dtype=np.uint32)
+        self.bands = np.concatenate(bands) if bands else np.zeros((0, BANDS), dtype=np.uint64)
+        tf = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.uint16)
+
+        # idf = (gram ids, log-scaled weights, weight for unseen grams); fitted here unless given
+        self.idf = idf or self.fit_idf(self.grams, len(texts))
+        vocab, weights, unseen = self.idf
+        if len(vocab):
+            position = np.minimum(np.searchsorted(vocab, self.grams), len(vocab) - 1)
+            idf_values = np.where(vocab[position] == self.grams, weights[position], unseen)
+        else:
+            idf_values = np.full(len(self.grams), unseen, dtype=np.float32)
+        w = ((1.0 + np.log(tf.astype(np.float32))) * idf_values).astype(np.float32)
+        lengths = np.diff(self.indptr)
+        norms = np.sqrt(np.bincount(np.repeat(np.arange(len(texts)), lengths), weights=w * w, minlength=len(texts)))
+        self.weights = w / np.repeat(np.maximum(norms, 1e-12), lengths).astype(np.float32)
+
+    @staticmethod
+    def fit_idf(grams: np.ndarray, n_texts: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        vocab, df = np.unique(grams, return_counts=True)
+        weights = (np.log((1.0 + n_texts) / (1.0 + df)) + 1.0).astype(np.float32)
+        return vocab, weights, float(np.log(1.0 + n_texts) + 1.0)
+
+    def cosine(self, a: np.ndarray, b: np.ndarray, other: Optional["Vectors"] = None) -> np.ndarray:
+        """Cosine similarity of rows a[i] (of self) and b[i] (of `other`, default self)."""
+        other = other or self
+        sims = np.empty(len(a), dtype=np.float32)
+        for start in range(0, len(a), PAIR_CHUNK):
+            ca, cb = a[start:start + PAIR_CHUNK], b[start:start + PAIR_CHUNK]
+            la = self.indptr[ca + 1] - self.indptr[ca]
+            lb = other.indptr[cb + 1] - other.indptr[cb]
+            ia, ib = _expand(self.indptr[ca], la), _expand(other.indptr[cb], lb)
+            pair_a = np.repeat(np.arange(len(ca), dtype=np.int64), la)
+            pair_b = np.repeat(np.arange(len(cb), dtype=np.int64), lb)
+            # (pair, gram) keys are sorted and unique on each side; look b's up in a's
+            keys_a = (pair_a << GRAM_BITS) | self.grams[ia]
+            keys_b = (pair_b << GRAM_BITS) | other.grams[ib]
+            position = np.minimum(np.searchsorted(keys_a, keys_b), len(keys_a) - 1)
+            xb = np.flatnonzero(keys_a[position] == keys_b) if len(keys_a) else np.zeros(0, dtype=np.int64)
+            xa = position[xb]
+            sims[start:start + len(ca)] = np.bincount(
+                pair_a[xa], weights=self.weights[ia[xa]] * other.weights[ib[xb]], minlength=len(ca)
+            )
+        return sims
+
+
+def _bucket_pairs(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Blocked candidates for one LSH band: within a bucket only neighbours in sorted order are
+    paired, so a bucket of m texts yields m - 1 pairs instead of m * (m - 1) / 2.
+    """
+    order = np.argsort(keys, kind="stable")
+    same = keys[order[1:]] == keys[order[:-1]]
+    return order[:-1][same], order[1:][same]
+
+
+def _components(a: np.ndarray, b: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Merge the components in `labels` (each the smallest index of its component) along the
+    edges (a[i], b[i]); returns the new labels.
+    """
+    labels = labels.copy()
+    while len(a):
+        # Hook the larger root of every edge under the smaller one ...
+        root_a, root_b = labels[a], labels[b]
+        crossing = root_a != root_b
+        if not crossing.any():
+            break
+        root_a, root_b = root_a[crossing], root_b[crossing]
+        np.minimum.at(labels, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        # ... then point every index at its root again
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        a, b = a[crossing], b[crossing]
+    return labels
+
+
+def cluster_texts(texts: List[str], threshold: Optional[float] = None) -> np.ndarray:
+    """
+    Cluster label (index of the cluster's first text) for every text, linking texts whose
+    normalized trigram TF-IDF cosine is at least `threshold`. Identical normalized texts are
+    clustered once; candidate pairs come from MinHash LSH buckets, so the cost grows with the
+    number of texts and near-duplicates rather than with every pair.
+    """
+    threshold = Config.ACTION_CLUSTER_THRESHOLD if threshold is None else threshold
+    normalized = [normalize(text) for text in texts]
+    first: Dict[str, int] = {}
+    unique_of = np.fromiter((first.setdefault(text, len(first)) for text in normalized), dtype=np.int64,
+                            count=len(normalized))
+    unique_texts = list(first)
+    if not unique_texts:
+        return np.zeros(0, dtype=np.int64)
+
+    vectors = Vectors(unique_texts)
+    labels = np.arange(len(unique_texts), dtype=np.int64)
+    for band in range(BANDS):
+        # Pairs an earlier band already connected need no comparison
+        a, b = _bucket_pairs(vectors.bands[:, band])
+        open_pairs = labels[a] != labels[b]
+        a, b = a[open_pairs], b[open_pairs]
+        keep = vectors.cosine(a, b) >= threshold
+        labels = _components(a[keep], b[keep], labels)
+
+    # Relabel to the first original text of each cluster
+    first_text = np.full(len(unique_texts), len(texts), dtype=np.int64)
+    np.minimum.at(first_text, labels[unique_of], np.arange(len(texts), dtype=np.int64))
+    return first_text[labels[unique_of]]
+
+
+class ClusterIndex:
+    """
+    In-process LSH index over the stored action items, for assigning new items to clusters
+    as meetings arrive. Built from `action_items` on first use; items other workers stored
+    since are picked up before each assignment. IDF weights are those of the build.
+    """
+
+    def __init__(self):
+        self.last_id = 0
+        self.idf = Vectors.fit_idf(np.zeros(0, dtype=np.uint32), 0)
+        self._keys = np.zeros(0, dtype=np.uint64)   # sorted band keys ...
+        self._ids = np.zeros(0, dtype=np.int64)     # ... and the item id of each
+        self._pending: Dict[int, List[int]] = {}
+
+    def catch_up(self, conn: sqlite3.Connection):
+        """Add items stored since the last call; the first call indexes everything and fits the IDF."""
+        rows = conn.execute(
+            "SELECT id, normalized FROM action_items WHERE id > ? ORDER BY id", (self.last_id,)
+        ).fetchall()
+        if rows:
+            vectors = Vectors([text for _, text in rows], self.idf if self.last_id else None)
+            if not self.last_id:
+                self.idf = vectors.idf
+            self.add(np.array([item_id for item_id, _ in rows], dtype=np.int64), vectors.bands)
+
+    def add(self, ids: np.ndarray, bands: np.ndarray):
+        if len(ids) >= MERGE_PENDING or len(self._pending) + len(ids) * BANDS >= MERGE_PENDING:
+            pending_keys = np.fromiter(self._pending, dtype=np.uint64, count=len(self._pending))
+            pending_ids = [self._pending[int(key)] for key in pending_keys]
+            keys = np.concatenate([self._keys, np.repeat(pending_keys, [len(i) for i in pending_ids]), bands.ravel()])
+            item_ids = np.concatenate([self._ids, np.array([i for group in pending_ids for i in group], dtype=np.int64),
+                                       np.repeat(ids, BANDS)])
+            order = np.argsort(keys, kind="stable")
+            self._keys, self._ids, self._pending = keys[order], item_ids[order], {}
+        else:
+            for item_id, row in zip(ids.tolist(), bands.tolist()):
+                for key in row:
+                    self._pending.setdefault(key, []).append(item_id)
+        self.last_id = max(self.last_id, int(ids.max()))
+
+    def candidates(self, bands: np.ndarray) -> List[int]:
+        """
+        Ids of stored items sharing an LSH bucket with a text of band keys `bands`, at most
+        BUCKET_CANDIDATES per bucket: members of a bucket mostly share a cluster already.
+        """
+        found = set()
+        low = np.searchsorted(self._keys, bands, side="left")
+        high = np.searchsorted(self._keys, bands, side="right")
+        for start, stop in zip(low.tolist(), high.tolist()):
+            found.update(self._ids[max(start, stop - BUCKET_CANDIDATES):stop].tolist())
+        for key in bands.tolist():
+            found.update(self._pending.get(key, [])[-BUCKET_CANDIDATES:])
+        return sorted(found)
+
+
+_index: Optional[ClusterIndex] = None
+_index_lock = threading.Lock()
+
+
+def _get_index(conn: sqlite3.Connection) -> ClusterIndex:
+    global _index
+    if _index is None:
+        _index = ClusterIndex()
+    _index.catch_up(conn)
+    return _index
+
+
+def _assign(conn: sqlite3.Connection, index: ClusterIndex, meeting_id: str, item: dict, threshold: float) -> int:
+    """Store one action item in the cluster of its most similar neighbours (merging the clusters it bridges)."""
+    description = item["description"]
+    text = normalize(description)
+    vectors = Vectors([text], index.idf)
+    candidate_ids = index.candidates(vectors.bands[0])
+    clusters = set()
+    if candidate_ids:
+        rows = conn.execute(
+            f"SELECT id, normalized, cluster_id FROM action_items WHERE id IN ({','.join('?' * len(candidate_ids))})",
+            candidate_ids
+        ).fetchall()
+        if rows:
+            neighbours = Vectors([row[1] for row in rows], index.idf)
+            sims = vectors.cosine(np.zeros(len(rows), dtype=np.int64), np.arange(len(rows)), neighbours)
+            clusters = {row[2] for row, sim in zip(rows, sims) if sim >= threshold and row[2] is not None}
+
+    item_id = conn.execute(
+        "INSERT INTO action_items (meeting_id, description, normalized, cluster_id, assignee, deadline, priority, "
+        "delay_risk) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (meeting_id, description, text, min(clusters) if clusters else None, item.get("assignee"),
+         item.get("deadline"), item.get("priority"), item.get("delay_risk"))
+    ).lastrowid
+    if clusters:
+        cluster_id = min(clusters)
+        merged = sorted(clusters - {cluster_id})
+        if merged:
+            marks = ",".join("?" * len(merged))
+            conn.execute(f"UPDATE action_items SET cluster_id=? WHERE cluster_id IN ({marks})", [cluster_id, *merged])
+            conn.execute(f"DELETE FROM action_clusters WHERE cluster_id IN ({marks})", merged)
+    else:
+        cluster_id = item_id
+        conn.execute("UPDATE action_items SET cluster_id=? WHERE id=?", (item_id, item_id))
+        conn.execute("INSERT INTO action_clusters (cluster_id, label) VALUES (?, ?)", (item_id, description))
+    index.add(np.array([item_id], dtype=np.int64), vectors.bands)
+    return cluster_id
+
+
+def index_meeting_actions(conn: sqlite3.Connection, meeting_id: str, actions: Optional[str],
+                          replace: bool = False, action_items: Optional[List[dict]] = None) -> int:
+    """
+    Parse a stored meeting's action items into `action_items` and cluster them; with
+    `replace`, the meeting's previous items (e.g. before a re-process) are dropped first.
+    Typed `action_items` (dicts with description, assignee, deadline, priority, delay_risk),
+    when given, are stored as they are instead of parsing `actions`.
+    Returns the number of items stored. Errors are logged, not raised: trends are derived data.
+    """
+    if action_items is not None:
+        items = [item for item in action_items if normalize(item.get("description") or "")]
+    else:
+        items = [{"description": description} for description in parse_action_items(actions)]
+    threshold = Config.ACTION_CLUSTER_THRESHOLD
+    try:
+        with _index_lock, transaction(conn):
+            if replace:
+                conn.execute("DELETE FROM action_items WHERE meeting_id=?", (meeting_id,))
+            index = _get_index(conn)
+            for item in items:
+                _assign(conn, index, meeting_id, item, threshold)
+            conn.execute("UPDATE meetings SET actions_indexed=1 WHERE meeting_id=?", (meeting_id,))
+    except Exception as e:
+        logger.error(f"Indexing action items of meeting {meeting_id} failed: {e}")
+        _reset_index()
+        return 0
+    return len(items)
+
+
+def rebuild_clusters(conn: sqlite3.Connection, threshold: Optional[float] = None) -> int:
+    """Re-cluster every stored action item from scratch; returns the number of clusters."""
+    start = time.perf_counter()
+    with _index_lock:
+        rows = conn.execute("SELECT id, description, cluster_id FROM action_items ORDER BY id").fetchall()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        labels = cluster_texts([row[1] for row in rows], threshold)
+        cluster_ids = ids[labels] if len(rows) else ids
+        changed = [(int(cluster_ids[i]), int(ids[i])) for i in np.flatnonzero(
+            cluster_ids != np.array([row[2] if row[2] is not None else -1 for row in rows], dtype=np.int64)
+        )]
+        with transaction(conn):
+            conn.executemany("UPDATE action_items SET cluster_id=? WHERE id=?", changed)
+            conn.execute("DELETE FROM action_clusters")
+            conn.execute(
+                "INSERT INTO action_clusters (cluster_id, label) "
+                "SELECT cluster_id, description FROM action_items WHERE id = cluster_id"
+            )
+        _reset_index()
+    clusters = len(np.unique(cluster_ids))
+    logger.info(f"Clustered {len(rows)} action items into {clusters} trends in {time.perf_counter() - start:.2f}s")
+    return clusters
+
+
+def backfill_action_items(conn: sqlite3.Connection) -> int:
+    """Index the action items of meetings stored before clustering existed (or whose indexing failed)."""
+    rows = conn.execute("SELECT meeting_id, actions FROM meetings WHERE actions_indexed=0").fetchall()
+    if not rows:
+        return 0
+    with _index_lock, transaction(conn):
+        for meeting_id, actions in rows:
+            conn.execute("DELETE FROM action_items WHERE meeting_id=?", (meeting_id,))
+            conn.executemany(
+                "INSERT INTO action_items (meeting_id, description, normalized) VALUES (?, ?, ?)",
+                [(meeting_id, description, normalize(description)) for description in parse_action_items(actions)]
+            )
+            conn.execute("UPDATE meetings SET actions_indexed=1 WHERE meeting_id=?", (meeting_id,))
+    logger.info(f"Backfilled action items of {len(rows)} meeting(s)")
+    rebuild_clusters(conn)
+    return len(rows)
+
+
+def _reset_index():
+    global _index
+    _index = None
@@ -0,0 +1,315 @@
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.utils.config import Config
+
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_lock = threading.Lock()
+# sqlite3 has one transaction per connection, so writers sharing `get_connection()` from
+# several threads take turns; otherwise one thread's commit (or rollback) ends another's transaction
+write_lock = threading.RLock()
+
+# Tables whose writes bump `table_versions` (see `init_db`)
+VERSIONED_TABLES = ("meetings", "action_items", "action_clusters", "feedback")
+
+
+def init_db(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meetings (
+            meeting_id TEXT PRIMARY KEY,
+            timestamp DATETIME,
+            file_path TEXT,
+            language TEXT,
+            transcript TEXT,
+            summary TEXT,
+            actions TEXT,
+            diarized_transcript TEXT,
+            industry TEXT,
+            user_id TEXT,
+            meeting_title TEXT
+        )
+    """)
+
+    # Columns added after the first release
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(meetings)")}
+    for name, ddl in (
+        ("custom_prompt_description", "TEXT"),
+        ("version", "INTEGER NOT NULL DEFAULT 1"),
+        ("updated_at", "DATETIME"),
+        ("actions_indexed", "INTEGER NOT NULL DEFAULT 0"),   # parsed into action_items
+    ):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE meetings ADD COLUMN {name} {ddl}")
+
+    # Earlier outputs of re-processed meetings; `meetings` always holds the latest version
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meeting_versions (
+            meeting_id TEXT,
+            version INTEGER,
+            industry TEXT,
+            custom_prompt_description TEXT,
+            summary TEXT,
+            actions TEXT,
+            created_at DATETIME,
+            PRIMARY KEY (meeting_id, version),
+            FOREIGN KEY (meeting_id) REFERENCES meetings (meeting_id)
+        )
+    """)
+
+    # One row per action item of the current version of each meeting, grouped into clusters
+    # of near-duplicates (src/core/action_clusters.py); a cluster is named after its first item
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS action_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id TEXT,
+            description TEXT,
+            normalized TEXT,
+            cluster_id INTEGER,
+            FOREIGN KEY (meeting_id) REFERENCES meetings (meeting_id)
+        )
+    """)
+    # Fields of the typed items from structured extraction; NULL for items parsed from text
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(action_items)")}
+    for name in ("assignee", "deadline", "priority", "delay_risk"):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE action_items ADD COLUMN {name} TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_meeting ON action_items (meeting_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_cluster ON action_items (cluster_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS action_clusters (
+            cluster_id INTEGER PRIMARY KEY,
+            label TEXT
+        )
+    """)
+
+    # Row of each meeting's vector in the related-meetings index file (src/core/meeting_index.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meeting_vectors (
+            row INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id TEXT UNIQUE
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY,
+            meeting_id TEXT,
+            rating INT,
+            comments TEXT,
+            FOREIGN KEY (meeting_id) REFERENCES meetings (meeting_id)
+        )
+    """)
+    if "created_at" not in {row[1] for row in conn.execute("PRAGMA table_info(feedback)")}:
+        conn.execute("ALTER TABLE feedback ADD COLUMN created_at DATETIME")  # for incremental exports
+
+    # Slack notifications waiting for (or given up on by) the background sender;
+    # `parts` is a JSON list of message chunks, posted as one thread
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS slack_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL,
+            parts TEXT NOT NULL,
+            sent_parts INTEGER NOT NULL DEFAULT 0,
+            thread_ts TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at REAL,
+            updated_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slack_outbox_due ON slack_outbox (status, next_attempt_at)")
+
+    # A counter per table, bumped by triggers on every write (from any process), so read
+    # endpoints can tell whether their data changed without re-running their queries
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            changed_at INTEGER NOT NULL
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        # Counters start at the creation time in ms, so a recreated DB never repeats an old version
+        conn.execute(
+            "INSERT OR IGNORE INTO table_versions (name, version, changed_at) "
+            "VALUES (?, CAST(strftime('%s', 'now') AS INTEGER) * 1000, CAST(strftime('%s', 'now') AS INTEGER))",
+            (table,)
+        )
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS bump_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1, changed_at = CAST(strftime('%s', 'now') AS INTEGER)
+                    WHERE name = '{table}';
+                END
+            """)
+
+    conn.commit()
+
+
+def table_versions(conn: sqlite3.Connection, tables: Tuple[str, ...]) -> Tuple[str, int]:
+    """The versions of `tables` joined into one token, and the unix time of the latest change among them."""
+    marks = ",".join("?" * len(tables))
+    rows = conn.execute(
+        f"SELECT name, version, changed_at FROM table_versions WHERE name IN ({marks}) ORDER BY name", tables
+    ).fetchall()
+    return ".".join(str(version) for _, version, _ in rows), max((changed_at for _, _, changed_at in rows), default=0)
+
+
+def get_connection() -> sqlite3.Connection:
+    """Shared analytics DB connection, opened (and the schema created) on first use."""
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                os.makedirs(os.path.dirname(Config.DB_PATH) or ".", exist_ok=True)
+                conn = sqlite3.connect(Config.DB_PATH, check_same_thread=False, timeout=30)
+                # Several API workers share the file; WAL lets them read while one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                init_db(conn)
+                _conn = conn
+    return _conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """Hold the write lock for one transaction on `conn`: committed on exit, rolled back on error."""
+    with write_lock, conn:
+        yield conn
+
+
+def insert_meeting(conn: sqlite3.Connection, result: dict, file_path: str, language: str, industry: str,
+                   user_id: str, meeting_title: str, custom_prompt_description: Optional[str] = None,
+                   meeting_id: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Store a processed meeting (a `run_workflow` result); returns its (meeting_id, timestamp).
+    `meeting_id` is generated unless the caller already handed one out (live recordings).
+    """
+    meeting_id = meeting_id or str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    diarized = result.get("transcript", {}).get("diarized", "")
+    with transaction(conn):
+        conn.execute(
+            "INSERT INTO meetings (meeting_id, timestamp, file_path, language, transcript, summary, actions, "
+            "diarized_transcript, industry, user_id, meeting_title, custom_prompt_description) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (meeting_id, timestamp, file_path, language, diarized, result.get("summary", {}).get("summary", ""),
+             result.get("actions", ""), diarized, industry, user_id, meeting_title, custom_prompt_description)
+        )
+    return meeting_id, timestamp
+
+
+def index_meeting_outputs(conn: sqlite3.Connection, meeting_id: str, meeting_title: Optional[str], summary: str,
+                          actions: str, replace: bool = False, action_items: Optional[List[dict]] = None):
+    """
+    Update the indexes derived from a stored meeting: action-item trends and related-meeting
+    vectors. `action_items` are the typed items of a structured run, stored instead of parsing `actions`.
+    """
+    from src.core.action_clusters import index_meeting_actions
+    from src.core.meeting_index import index_meeting
+
+    index_meeting_actions(conn, meeting_id, actions, replace=replace, action_items=action_items)
+    index_meeting(conn, meeting_id, meeting_title, summary)
+
+
+def get_meeting(conn: sqlite3.Connection, meeting_id: str) -> Optional[dict]:
+    row = conn.execute(
+        "SELECT meeting_id, timestamp, file_path, language, transcript, summary, actions, industry, user_id, "
+        "meeting_title, custom_prompt_description, version, updated_at FROM meetings WHERE meeting_id=?",
+        (meeting_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    keys = ("meeting_id", "timestamp", "file_path", "language", "transcript", "summary", "actions", "industry",
+            "user_id", "meeting_title", "custom_prompt_description", "version", "updated_at")
+    return dict(zip(keys, row))
+
+
+def save_meeting_version(conn: sqlite3.Connection, meeting: dict, summary: str, actions: str,
+                         industry: Optional[str], custom_prompt_description: Optional[str]) -> int:
+    """
+    Archive the current outputs of `meeting` (as returned by `get_meeting`) in
+    meeting_versions and replace them in place; returns the new version number.
+
+    Raises:
+        sqlite3.IntegrityError: if the meeting was re-processed concurrently
+    """
+    version = meeting["version"] or 1
+    with transaction(conn):
+        conn.execute(
+            "INSERT INTO meeting_versions (meeting_id, version, industry, custom_prompt_description, summary, actions, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (meeting["meeting_id"], version, meeting["industry"], meeting["custom_prompt_description"],
+             meeting["summary"], meeting["actions"], meeting["updated_at"] or meeting["timestamp"])
+        )
+        updated = conn.execute(
+            "UPDATE meetings SET summary=?, actions=?, industry=?, custom_prompt_description=?, version=?, updated_at=? "
+            "WHERE meeting_id=? AND version=?",
+            (summary, actions, industry, custom_prompt_description, version + 1, datetime.now().isoformat(),
+             meeting["meeting_id"], version)
+        )
+        if updated.rowcount != 1:
+            raise sqlite3.IntegrityError(f"Meeting {meeting['meeting_id']} changed while it was being re-processed")
+    return version + 1
+
+
+def list_meeting_versions(conn: sqlite3.Connection, meeting_id: str) -> List[dict]:
+    """Archived versions of a meeting, oldest first (the current one lives in `meetings`)."""
+    keys = ("version", "industry", "custom_prompt_description", "summary", "actions", "created_at")
+    rows = conn.execute(
+        f"SELECT {', '.join(keys)} FROM meeting_versions WHERE meeting_id=? ORDER BY version", (meeting_id,)
+    ).fetchall()
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def compute_analytics(conn: sqlite3.Connection, industry: Optional[str] = None) -> dict:
+    """Aggregate action trends (clusters of near-duplicate action items) and summary sentiment across stored meetings."""
+    from src.core.sentiment import labels_for, score_batch
+
+    cursor = conn.cursor()
+
+    if industry:
+        cursor.execute("SELECT summary FROM meetings WHERE industry=?", (industry,))
+    else:
+        cursor.execute("SELECT summary FROM meetings")
+
+    summaries = []
+    total_meetings = 0
+
+    for (summary_text,) in cursor.fetchall():
+        total_meetings += 1
+        if summary_text:
+            summaries.append(summary_text)
+
+    # Action items per cluster, most common trends first
+    trend_query = (
+        "SELECT c.label, COUNT(*) FROM action_items i JOIN action_clusters c ON c.cluster_id = i.cluster_id "
+        + ("JOIN meetings m ON m.meeting_id = i.meeting_id WHERE m.industry=? " if industry else "")
+        + "GROUP BY i.cluster_id ORDER BY COUNT(*) DESC"
+    )
+    action_trends = {}
+    for label, count in cursor.execute(trend_query, (industry,) if industry else ()):
+        action_trends[label] = action_trends.get(label, 0) + count
+
+    # Score all summaries in one vectorized batch
+    sentiment_counts = {
+        "Positive": 0,
+        "Neutral" : 0,
+        "Negative": 0
+    }
+    for label in labels_for(score_batch(summaries)):
+        sentiment_counts[label] += 1
+
+    return {
+        "total_meetings": total_meetings,
+        "action_trends": action_trends,
+        "sentiment_counts": sentiment_counts
+    }
@@ -0,0 +1,109 @@
+import shutil
+import subprocess
+import wave
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+DEFAULT_SAMPLE_RATE = 16000
+BLOCK_SECONDS = 10.0
+
+
+def _pcm_to_float(frames: bytes, width: int) -> np.ndarray:
+    if width == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    if width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if width == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+
+
+class LinearResampler:
+    """
+    Streaming linear-interpolation resampler; good enough for speech recognition and
+    analysis features, not for playback. Carries one sample and the fractional read
+    position across blocks, so block boundaries leave no seams.
+    """
+
+    def __init__(self, rate: int, target_rate: int):
+        self.step = rate / target_rate
+        self.position = 0.0
+        self.tail = None
+
+    def __call__(self, block: np.ndarray) -> np.ndarray:
+        if self.step == 1.0 or block.size == 0:
+            return block
+        buffer = block if self.tail is None else np.concatenate([[self.tail], block])
+        positions = np.arange(self.position, buffer.size - 1, self.step)
+        out = np.interp(positions, np.arange(buffer.size), buffer).astype(np.float32)
+        # Next output position, relative to the last sample (which starts the next buffer)
+        self.position = (positions[-1] + self.step if positions.size else self.position) - (buffer.size - 1)
+        self.tail = buffer[-1]
+        return out
+
+
+def _wav_blocks(file_path: str, sample_rate: int, block_seconds: float) -> Iterator[np.ndarray]:
+    with wave.open(file_path, "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        resampler = LinearResampler(wf.getframerate(), sample_rate)
+        block_frames = max(int(block_seconds * wf.getframerate()), 1)
+        while True:
+            frames = wf.readframes(block_frames)
+            if not frames:
+                break
+            audio = _pcm_to_float(frames, width)
+            if channels > 1:
+                audio = audio.reshape(-1, channels).mean(axis=1)
+            yield resampler(audio)
+
+
+def _ffmpeg_blocks(file_path: str, sample_rate: int, block_seconds: float) -> Iterator[np.ndarray]:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise ValueError(f"Cannot decode {file_path}: not a WAV file and ffmpeg is not installed")
+    process = subprocess.Popen(
+        [ffmpeg, "-nostdin", "-v", "error", "-i", file_path, "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    block_bytes = max(int(block_seconds * sample_rate), 1) * 2
+    try:
+        while True:
+            chunk = process.stdout.read(block_bytes)
+            if not chunk:
+                break
+            yield _pcm_to_float(chunk[:len(chunk) // 2 * 2], 2)
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", "replace").strip()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise ValueError(f"ffmpeg could not decode {file_path}: {stderr}")
+
+
+def iter_audio(file_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE,
+               block_seconds: float = BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file as a stream of mono float32 blocks in [-1, 1] at `sample_rate`.
+
+    WAV is read with the standard library; other containers are piped through ffmpeg
+    when it is installed. Memory use is bounded by the block size, not the file length.
+    """
+    try:
+        with wave.open(file_path, "rb"):
+            pass
+    except (wave.Error, EOFError):
+        logger.info(f"{file_path} is not a PCM WAV file, decoding with ffmpeg")
+        return _ffmpeg_blocks(file_path, sample_rate, block_seconds)
+    return _wav_blocks(file_path, sample_rate, block_seconds)
+
+
+def load_audio(file_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Decode a whole audio file to mono float32 samples in [-1, 1] at `sample_rate`."""
+    blocks = list(iter_audio(file_path, sample_rate))
+    audio = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+    return audio, sample_rate
@@ -0,0 +1,196 @@
+import re
+from typing import Dict, List, Optional
+
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+# Number of LLM calls per processed meeting that carry the full transcript
+# (summary, action items, delay predictions)
+TRANSCRIPT_PROMPTS_PER_MEETING = 3
+
+# Hesitation sounds, lower-case or capitalized only, so acronyms ("HMM", "UM") stay
+FILLER_RE = re.compile(r"(?:,\s*)?\b(?:[Uu]h+m*|[Uu]m+|[Ee]r+m*|[Aa]h+|[Hh]m+|[Mm]m+-?hm+)\b,?")
+# "you know" / "I mean" only as interjections, set off by commas or a sentence boundary on both
+# sides; "Do you know Bob?" and "what I mean is" are content
+FILLER_PHRASE_RE = re.compile(
+    r"(?:^|(?<=[.!?])|,)\s*(?:you know|i mean)\s*(?:,|(?=[.!?;:])|$)", re.IGNORECASE
+)
+# Stuttered words: "I I think", "the the plan". Only 1-2 letter words and a few words that are
+# never doubled on purpose; numbers ("555 555 1234") and real repeats ("had had", "Bora Bora") stay
+STUTTER_WORDS = ("the", "and", "but", "you", "they", "this")
+REPEAT_RE = re.compile(
+    rf"\b([^\W\d_]{{1,2}}|{'|'.join(STUTTER_WORDS)})(?:[\s,]+\1\b)+", re.IGNORECASE
+)
+SPACES_RE = re.compile(r"\s+")
+SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,.!?;:])")
+DIARIZED_LINE_RE = re.compile(r"^(?P<speaker>Speaker \w+)\s*\((?P<start>[\d.:]+)s?\):\s*(?P<text>.*)$")
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local estimate of the BPE token count of `text`.
+
+    Each word costs one token plus one per further 6 characters, each punctuation
+    mark one token. Close enough to the Llama/GPT tokenizers for budgeting.
+    """
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 6 for piece in TOKEN_RE.findall(text))
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds or 0)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _parse_timestamp(value: str) -> float:
+    parts = [float(p) for p in value.split(":")]
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def clean_text(text: str) -> str:
+    """Strip filler words and stuttered (immediately repeated) short words."""
+    text = FILLER_RE.sub("", text)
+    text = FILLER_PHRASE_RE.sub("", text)
+    text = REPEAT_RE.sub(r"\1", text)
+    text = SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+    text = SPACES_RE.sub(" ", text).strip(" ,")
+    return text
+
+
+def segments_from_diarized(diarized: str) -> List[Dict]:
+    """Recover segments from a rendered `Speaker N (12.3s): text` transcript."""
+    segments = []
+    for line in (diarized or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = DIARIZED_LINE_RE.match(line)
+        if match:
+            segments.append({
+                "speaker": match.group("speaker"),
+                "start": _parse_timestamp(match.group("start")),
+                "text": match.group("text")
+            })
+        elif segments:
+            segments[-1]["text"] += " " + line
+        else:
+            segments.append({"speaker": None, "start": 0.0, "text": line})
+    return segments
+
+
+def merge_turns(segments: List[Dict], max_turn_seconds: float) -> List[Dict]:
+    """
+    Merge consecutive segments of the same speaker into turns.
+
+    Segments without a speaker label are treated as one speaker and merged into
+    turns of at most `max_turn_seconds`.
+    """
+    turns: List[Dict] = []
+    for seg in segments:
+        text = clean_text(seg.get("text", ""))
+        if not text:
+            continue
+        speaker = seg.get("speaker")
+        start = float(seg.get("start") or 0.0)
+        last = turns[-1] if turns else None
+        if (
+            last is not None
+            and last["speaker"] == speaker
+            and (speaker is not None or start - last["start"] < max_turn_seconds)
+        ):
+            # Drop a segment that only repeats the previous one
+            if not last["text"].endswith(text):
+                last["text"] += " " + text
+        else:
+            turns.append({"speaker": speaker, "start": start, "text": text})
+    return turns
+
+
+def render_turns(turns: List[Dict], max_words: Optional[int] = None) -> str:
+    lines = []
+    for turn in turns:
+        text = turn["text"]
+        if max_words is not None:
+            words = text.split(" ")
+            if len(words) > max_words:
+                text = " ".join(words[:max_words]) + " …"
+        prefix = f"[{format_timestamp(turn['start'])}]"
+        if turn["speaker"]:
+            prefix += f" {turn['speaker']}"
+        lines.append(f"{prefix}: {text}")
+    return "\n".join(lines)
+
+
+def fit_to_budget(turns: List[Dict], token_budget: int) -> str:
+    """
+    Render `turns` within `token_budget` tokens.
+
+    When the full rendering is too long, every turn is cut to the same maximum
+    number of words (found by binary search) so the whole meeting stays covered.
+    """
+    rendered = render_turns(turns)
+    if token_budget <= 0 or estimate_tokens(rendered) <= token_budget:
+        return rendered
+
+    low, high = 1, max(len(turn["text"].split(" ")) for turn in turns)
+    best = render_turns(turns, max_words=1)
+    while low <= high:
+        mid = (low + high) // 2
+        candidate = render_turns(turns, max_words=mid)
+        if estimate_tokens(candidate) <= token_budget:
+            best, low = candidate, mid + 1
+        else:
+            high = mid - 1
+    return best
+
+
+def compact_transcript(transcript, token_budget: Optional[int] = None) -> Dict:
+    """
+    Compact a transcript for prompting.
+
+    Args:
+        transcript: Transcript dict from `transcribe_audio` (with `segments` or
+            `diarized`) or an already rendered transcript string
+        token_budget (Optional[int]): Maximum tokens for the compacted transcript;
+            defaults to the prompt budget minus the reserve for template and other inputs
+
+    Returns:
+        Dict with the `compact` text and token statistics
+    """
+    if token_budget is None:
+        token_budget = Config.PROMPT_TOKEN_BUDGET - Config.PROMPT_TOKEN_RESERVE
+
+    if isinstance(transcript, dict):
+        original = transcript.get("diarized") or transcript.get("text") or ""
+        segments = transcript.get("segments") or segments_from_diarized(original)
+    else:
+        original = transcript or ""
+        segments = segments_from_diarized(original)
+
+    turns = merge_turns(segments, Config.COMPACT_MAX_TURN_SECONDS)
+    compact = fit_to_budget(turns, token_budget) if turns else original
+
+    original_tokens = estimate_tokens(original)
+    compact_tokens = estimate_tokens(compact)
+    saved = max(original_tokens - compact_tokens, 0)
+    stats = {
+        "original_tokens": original_tokens,
+        "compact_tokens": compact_tokens,
+        "saved_tokens": saved,
+        "saved_tokens_per_meeting": saved * TRANSCRIPT_PROMPTS_PER_MEETING,
+        "token_budget": token_budget,
+        "reduction": round(saved / original_tokens, 3) if original_tokens else 0.0
+    }
+    logger.info(
+        f"Transcript compacted: {original_tokens} -> {compact_tokens} tokens "
+        f"(~{stats['saved_tokens_per_meeting']} input tokens saved per meeting)"
+    )
+    return {"compact": compact, "stats": stats}
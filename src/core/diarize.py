@@ -0,0 +1,299 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.core.audio import load_audio
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+# Frame analysis (at 16 kHz: 32 ms frames every 20 ms)
+FRAME_LENGTH = 512
+HOP_LENGTH = 320
+N_MELS = 26
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+CHUNK_FRAMES = 16384            # frames per FFT batch, bounds peak memory on long files
+
+# Speech detection: frames this far above the noise floor count as speech, and never below
+# SILENCE_FLOOR_DBFS. The noise floor is the 10th percentile energy of the quietest block,
+# so one pause anywhere is enough to measure it.
+SPEECH_MARGIN_DB = 12.0
+SILENCE_FLOOR_DBFS = -50.0
+NOISE_BLOCK_FRAMES = 100        # 2 s at 16 kHz
+# Fewer speech frames than this share means no block had a pause (dense speech, or silence
+# already cut by preprocessing); then every frame above SILENCE_FLOOR_DBFS is speech
+MIN_SPEECH_SHARE = 0.2
+
+# Speaker embeddings are pooled over sliding windows of speech frames. Windows never span
+# a pause this long, since that is where speakers usually change.
+WINDOW_SECONDS = 1.0
+WINDOW_HOP_SECONDS = 0.5
+MIN_SPEECH_RATIO = 0.3
+MIN_PAUSE_SECONDS = 0.25
+
+# Clustering: more speakers are only accepted if they separate the windows this well
+MIN_SILHOUETTE = 0.15
+SILHOUETTE_SAMPLE = 1500
+KMEANS_ITERATIONS = 30
+KMEANS_RESTARTS = 4
+# Clusters holding fewer windows than this share are folded into their nearest neighbour;
+# they are usually windows straddling a change of speaker rather than a real voice
+MIN_CLUSTER_SHARE = 0.03
+
+
+def mel_filterbank(n_mels: int, n_fft: int, sample_rate: int) -> np.ndarray:
+    """Triangular mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    hz = mel_to_hz(mel_points)
+    lower, center, upper = hz[:-2, None], hz[1:-1, None], hz[2:, None]
+    rising = (bins[None, :] - lower) / (center - lower)
+    falling = (upper - bins[None, :]) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+def dct_matrix(n_out: int, n_in: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, shape (n_out, n_in)."""
+    basis = np.cos(np.pi / n_in * (np.arange(n_in)[None, :] + 0.5) * np.arange(n_out)[:, None])
+    basis *= np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+def frame_features(audio: np.ndarray, sample_rate: int):
+    """
+    MFCCs and log energy for every analysis frame.
+
+    Frames are strided views of the signal, and FFTs run in batches of `CHUNK_FRAMES`.
+    Energy is measured before pre-emphasis, which would otherwise mute low voices.
+    Returns (mfcc: (n_frames, N_MFCC), log_energy: (n_frames,)).
+    """
+    audio = audio.astype(np.float32)
+    if audio.size < FRAME_LENGTH:
+        audio = np.pad(audio, (0, FRAME_LENGTH - audio.size))
+    raw_frames = sliding_window_view(audio, FRAME_LENGTH)[::HOP_LENGTH]
+    emphasized = np.append(audio[:1], audio[1:] - PRE_EMPHASIS * audio[:-1])
+
+    frames = sliding_window_view(emphasized, FRAME_LENGTH)[::HOP_LENGTH]
+    window = np.hanning(FRAME_LENGTH).astype(np.float32)
+    filterbank = mel_filterbank(N_MELS, FRAME_LENGTH, sample_rate).T
+    dct = dct_matrix(N_MFCC, N_MELS).T
+
+    mfcc = np.empty((len(frames), N_MFCC), dtype=np.float32)
+    log_energy = np.empty(len(frames), dtype=np.float32)
+    for start in range(0, len(frames), CHUNK_FRAMES):
+        spectrum = np.fft.rfft(frames[start:start + CHUNK_FRAMES] * window, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        mfcc[start:start + len(power)] = np.log(power @ filterbank + 1e-10) @ dct
+        raw = raw_frames[start:start + CHUNK_FRAMES]
+        log_energy[start:start + len(power)] = np.log(np.einsum("ij,ij->i", raw, raw) + 1e-10)
+    return mfcc, log_energy
+
+
+def speech_mask(log_energy: np.ndarray) -> np.ndarray:
+    # log_energy is the natural log of a frame's summed squares; convert the dB settings to that scale
+    per_db = np.log(10.0) / 10.0
+    floor = SILENCE_FLOOR_DBFS * per_db + np.log(FRAME_LENGTH)
+    blocks = len(log_energy) // NOISE_BLOCK_FRAMES
+    if blocks:
+        block_floors = np.percentile(log_energy[:blocks * NOISE_BLOCK_FRAMES].reshape(blocks, -1), 10, axis=1)
+        noise = block_floors.min()
+    else:
+        noise = np.percentile(log_energy, 10)
+    mask = log_energy > max(noise + SPEECH_MARGIN_DB * per_db, floor)
+    if mask.mean() < MIN_SPEECH_SHARE:
+        mask = log_energy > floor
+    return mask
+
+
+def speech_regions(mask: np.ndarray, min_gap_frames: int) -> np.ndarray:
+    """Region id per frame; a new region starts after every pause of at least `min_gap_frames`."""
+    padded = np.concatenate([[1], mask.astype(np.int8), [1]])
+    changes = np.flatnonzero(np.diff(padded))
+    gap_starts, gap_ends = changes[::2], changes[1::2]
+    boundaries = np.zeros(len(mask) + 1, dtype=np.int64)
+    boundaries[gap_ends[gap_ends - gap_starts >= min_gap_frames]] = 1
+    return np.cumsum(boundaries)[:len(mask)]
+
+
+def window_embeddings(mfcc: np.ndarray, mask: np.ndarray, sample_rate: int):
+    """
+    Mean and standard deviation of speech-frame MFCCs (c0, i.e. loudness, dropped) per window.
+
+    Window sums come from cumulative sums, so this is O(frames) regardless of window overlap.
+    Returns (embeddings, window start times, window end times) for windows with enough speech.
+    """
+    frame_seconds = HOP_LENGTH / sample_rate
+    window_frames = max(int(round(WINDOW_SECONDS / frame_seconds)), 1)
+    hop_frames = max(int(round(WINDOW_HOP_SECONDS / frame_seconds)), 1)
+
+    features = mfcc[:, 1:].astype(np.float64) * mask[:, None]
+    zeros = np.zeros((1, features.shape[1]))
+    sums = np.concatenate([zeros, np.cumsum(features, axis=0)])
+    squares = np.concatenate([zeros, np.cumsum(features ** 2, axis=0)])
+    counts = np.concatenate([[0], np.cumsum(mask)])
+
+    starts = np.arange(0, max(len(mfcc) - window_frames, 0) + 1, hop_frames)
+    ends = np.minimum(starts + window_frames, len(mfcc))
+    n = counts[ends] - counts[starts]
+    regions = speech_regions(mask, max(int(round(MIN_PAUSE_SECONDS / frame_seconds)), 1))
+    keep = (n >= MIN_SPEECH_RATIO * (ends - starts)) & (regions[starts] == regions[ends - 1])
+    starts, ends, n = starts[keep], ends[keep], n[keep][:, None]
+    if not len(starts):
+        return np.empty((0, 2 * (N_MFCC - 1))), np.empty(0), np.empty(0)
+
+    mean = (sums[ends] - sums[starts]) / n
+    std = np.sqrt(np.maximum((squares[ends] - squares[starts]) / n - mean ** 2, 0.0))
+    embeddings = np.hstack([mean, std])
+    # Per-file normalization so no single coefficient dominates the distances
+    embeddings = (embeddings - embeddings.mean(axis=0)) / (embeddings.std(axis=0) + 1e-8)
+    return embeddings, starts * frame_seconds, ends * frame_seconds
+
+
+def _squared_distances(x: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    return np.maximum(
+        (x ** 2).sum(axis=1)[:, None] - 2 * x @ centers.T + (centers ** 2).sum(axis=1)[None, :], 0.0
+    )
+
+
+def _kmeans_once(x: np.ndarray, k: int, rng: np.random.Generator, iterations: int):
+    centers = [x[rng.integers(len(x))]]
+    nearest = ((x - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = nearest.sum()
+        index = rng.choice(len(x), p=nearest / total) if total > 0 else rng.integers(len(x))
+        centers.append(x[index])
+        nearest = np.minimum(nearest, ((x - x[index]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = np.zeros(len(x), dtype=np.int64)
+    for _ in range(iterations):
+        labels = _squared_distances(x, centers).argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, x)
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    inertia = float(_squared_distances(x, centers)[np.arange(len(x)), labels].sum())
+    return labels, inertia
+
+
+def kmeans(x: np.ndarray, k: int, rng: np.random.Generator, iterations: int = KMEANS_ITERATIONS,
+           restarts: int = KMEANS_RESTARTS) -> np.ndarray:
+    """k-means with k-means++ seeding, best of `restarts` runs; returns a label per row."""
+    runs = [_kmeans_once(x, k, rng, iterations) for _ in range(restarts)]
+    return min(runs, key=lambda run: run[1])[0]
+
+
+def silhouette(x: np.ndarray, labels: np.ndarray, k: int) -> float:
+    """Mean silhouette coefficient, computed from one pairwise distance matrix."""
+    distances = np.sqrt(_squared_distances(x, x))
+    onehot = np.eye(k)[labels]
+    counts = onehot.sum(axis=0)
+    totals = distances @ onehot                                 # (n, k) summed distance to each cluster
+    own = counts[labels]
+    intra = totals[np.arange(len(x)), labels] / np.maximum(own - 1, 1)
+    other = np.where(onehot > 0, np.inf, totals / np.maximum(counts, 1))
+    other[:, counts == 0] = np.inf
+    nearest = other.min(axis=1)
+    scores = (nearest - intra) / np.maximum(np.maximum(intra, nearest), 1e-12)
+    scores[own <= 1] = 0.0
+    return float(scores.mean())
+
+
+def merge_small_clusters(x: np.ndarray, labels: np.ndarray, min_share: float = MIN_CLUSTER_SHARE) -> np.ndarray:
+    counts = np.bincount(labels)
+    keep = np.flatnonzero(counts >= min_share * len(labels))
+    if len(keep) in (0, len(counts)):
+        return labels
+    centers = np.stack([x[labels == label].mean(axis=0) for label in keep])
+    small = ~np.isin(labels, keep)
+    labels = labels.copy()
+    labels[small] = keep[_squared_distances(x[small], centers).argmin(axis=1)]
+    return labels
+
+
+def cluster_speakers(embeddings: np.ndarray, max_speakers: int, seed: int = 0) -> np.ndarray:
+    """Pick the speaker count (1..max_speakers) with the best silhouette and return window labels."""
+    if len(embeddings) < 4 or max_speakers < 2:
+        return np.zeros(len(embeddings), dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    sample = embeddings
+    if len(embeddings) > SILHOUETTE_SAMPLE:
+        sample_index = rng.choice(len(embeddings), SILHOUETTE_SAMPLE, replace=False)
+    else:
+        sample_index = np.arange(len(embeddings))
+    sample = embeddings[sample_index]
+
+    best_labels, best_score = np.zeros(len(embeddings), dtype=np.int64), MIN_SILHOUETTE
+    for k in range(2, min(max_speakers, len(embeddings) - 1) + 1):
+        labels = kmeans(embeddings, k, rng)
+        score = silhouette(sample, labels[sample_index], k)
+        if score > best_score:
+            best_labels, best_score = labels, score
+    return merge_small_clusters(embeddings, best_labels)
+
+
+def assign_segments(segments: List[Dict], labels: np.ndarray, window_starts: np.ndarray,
+                    window_ends: np.ndarray) -> List[int]:
+    """
+    Speaker index per segment by majority of overlapping window time.
+
+    Segments that overlap no speech window keep the previous segment's speaker.
+    Indices are renumbered by first appearance, so the first speaker is always 0.
+    """
+    if not segments:
+        return []
+    if not len(labels):
+        return [0] * len(segments)
+
+    seg_starts = np.array([seg["start"] for seg in segments], dtype=np.float32)[:, None]
+    seg_ends = np.array([seg["end"] for seg in segments], dtype=np.float32)[:, None]
+    overlap = np.clip(
+        np.minimum(seg_ends, window_ends[None, :]) - np.maximum(seg_starts, window_starts[None, :]), 0.0, None
+    ).astype(np.float32)
+    votes = overlap @ np.eye(labels.max() + 1, dtype=np.float32)[labels]
+
+    assigned, previous = [], None
+    for row in votes:
+        previous = int(row.argmax()) if row.max() > 0 else previous
+        assigned.append(previous)
+    first = next((label for label in assigned if label is not None), 0)
+    assigned = [first if label is None else label for label in assigned]
+
+    order: Dict[int, int] = {}
+    return [order.setdefault(label, len(order)) for label in assigned]
+
+
+def diarize(audio: np.ndarray, sample_rate: int, segments: List[Dict],
+            max_speakers: Optional[int] = None) -> List[int]:
+    """0-based speaker index for each Whisper segment ({start, end, ...}) of `audio`."""
+    max_speakers = max_speakers or Config.DIARIZATION_MAX_SPEAKERS
+    mfcc, log_energy = frame_features(audio, sample_rate)
+    embeddings, window_starts, window_ends = window_embeddings(mfcc, speech_mask(log_energy), sample_rate)
+    labels = cluster_speakers(embeddings, max_speakers)
+    return assign_segments(segments, labels, window_starts, window_ends)
+
+
+def diarize_file(file_path: str, segments: List[Dict], max_speakers: Optional[int] = None) -> List[Dict]:
+    """Copies of `segments` labelled with `speaker: "Speaker N"`."""
+    start = time.perf_counter()
+    audio, sample_rate = load_audio(file_path)
+    speakers = diarize(audio, sample_rate, segments, max_speakers)
+    logger.info(
+        f"Diarized {audio.size / sample_rate:.0f}s of audio into {len(set(speakers))} speaker(s) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return [{**seg, "speaker": f"Speaker {speaker + 1}"} for seg, speaker in zip(segments, speakers)]
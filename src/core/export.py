@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.config import Config
+
+
+BATCH_SIZE = 1_000
+FORMATS = ("ndjson", "csv")
+# Writers stamp rows before they commit (and may wait for the write lock or a busy database
+# in between), so the next incremental export starts this far before this one did
+SINCE_OVERLAP = timedelta(minutes=2)
+
+# table -> (SELECT ... FROM ..., column names, expression compared with `since`)
+# A re-processed meeting counts as changed, and its action items with it: re-processing replaces
+# them (deleted items are not exported), so consumers replace a changed meeting's items wholesale
+_MEETING_CHANGED = "COALESCE(m.updated_at, m.timestamp)"
+TABLES: Dict[str, Tuple[str, List[str], str]] = {
+    "meetings": (
+        "SELECT m.meeting_id, m.timestamp, m.updated_at, m.version, m.file_path, m.language, m.industry, m.user_id, "
+        "m.meeting_title, m.custom_prompt_description, m.summary, m.actions{transcript} FROM meetings m",
+        ["meeting_id", "timestamp", "updated_at", "version", "file_path", "language", "industry", "user_id",
+         "meeting_title", "custom_prompt_description", "summary", "actions"],
+        _MEETING_CHANGED,
+    ),
+    "action_items": (
+        "SELECT i.id, i.meeting_id, i.description, i.assignee, i.deadline, i.priority, i.delay_risk, i.cluster_id, "
+        "c.label, {changed} FROM action_items i "
+        "JOIN meetings m ON m.meeting_id = i.meeting_id LEFT JOIN action_clusters c ON c.cluster_id = i.cluster_id",
+        ["id", "meeting_id", "description", "assignee", "deadline", "priority", "delay_risk", "cluster_id",
+         "cluster_label", "meeting_updated_at"],
+        _MEETING_CHANGED,
+    ),
+    "feedback": (
+        "SELECT f.id, f.meeting_id, f.rating, f.comments, f.created_at FROM feedback f",
+        ["id", "meeting_id", "rating", "comments", "created_at"],
+        "f.created_at",
+    ),
+}
+
+
+def open_reader(path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    A read-only connection of its own, so a long export neither shares a cursor with the
+    API's connection nor blocks writers (WAL readers see one consistent snapshot).
+    """
+    return sqlite3.connect(f"file:{path or Config.DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+
+
+def columns(table: str, include_transcripts: bool = False) -> List[str]:
+    names = list(TABLES[table][1])
+    if table == "meetings" and include_transcripts:
+        names.append("transcript")
+    return names
+
+
+def next_since(started: datetime) -> str:
+    """
+    The `since` for the export after one that started at `started`. Rows stamped near the
+    boundary can appear in both exports; consumers dedupe on the id column.
+    """
+    return (started - SINCE_OVERLAP).isoformat()
+
+
+def iter_batches(conn: sqlite3.Connection, table: str, since: Optional[str] = None,
+                 include_transcripts: bool = False, batch_size: int = BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    Rows of `table` changed after `since` (an ISO timestamp; all rows when None), in
+    batches of `batch_size` fetched from one cursor, so memory stays flat for any size.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown export table {table!r} (expected one of {', '.join(TABLES)})")
+    query, _, changed = TABLES[table]
+    query = query.format(transcript=", m.transcript" if include_transcripts else "", changed=_MEETING_CHANGED)
+    params: tuple = ()
+    if since:
+        query += f" WHERE {changed} > ?"
+        params = (since,)
+    cursor = conn.execute(query, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def encode(batches: Iterable[List[tuple]], names: List[str], fmt: str) -> Iterator[bytes]:
+    """One UTF-8 chunk per batch: NDJSON objects, or CSV with a header row."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")  # header of an empty export
+    else:
+        for rows in batches:
+            yield "".join(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a gzip stream chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(table: str, fmt: str = "ndjson", since: Optional[str] = None, gzip: bool = False,
+                  include_transcripts: bool = False, db_path: Optional[str] = None) -> Iterator[bytes]:
+    """The encoded (and optionally gzipped) export of one table; the connection closes with the stream."""
+    names = columns(table, include_transcripts)
+    conn = open_reader(db_path)
+    try:
+        chunks = encode(iter_batches(conn, table, since, include_transcripts), names, fmt)
+        yield from gzipped(chunks) if gzip else chunks
+    finally:
+        conn.close()
@@ -1,27 +1,18 @@
-from langchain_groq import ChatGroq
-from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-from src.utils.config import Config
+from src.utils.llm import get_chat_model, invoke_prompt
 from src.utils.prompts import PREDICT_PROMPT
 from src.utils.logger import logger
 
 
 def extract_action_items(transcript: str, summary: str, action_prompt: ChatPromptTemplate) -> str:
-    llm = ChatGroq(
-        temperature=0,
-        groq_api_key = Config.GROQ_API_KEY,
-        model_name = Config.MODEL_NAME
-    )
-
-    chain = action_prompt | llm | StrOutputParser()
+    llm = get_chat_model(temperature=0)
 
     try:
-        actions = chain.invoke({"transcript": transcript, "summary": summary})
+        actions = invoke_prompt(action_prompt, llm, {"transcript": transcript, "summary": summary})
 
         # predictive
-        predict_chain = PREDICT_PROMPT | llm | StrOutputParser()
-        predictions = predict_chain.invoke({"actions": actions, "transcript": transcript})
+        predictions = invoke_prompt(PREDICT_PROMPT, llm, {"actions": actions, "transcript": transcript})
         logger.info("Action items extracted")
         
         return f"{actions} \n\nPredictions:\n{predictions}"
@@ -0,0 +1,311 @@
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.analytics import transaction
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+WORD_RE = re.compile(r"[^\W_]+")
+# Function words plus the filler every meeting summary shares
+STOPWORDS = frozenset({
+    "a", "an", "the", "to", "of", "for", "on", "in", "at", "by", "with", "and", "or", "from", "into", "as",
+    "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "we", "they",
+    "he", "she", "their", "our", "will", "would", "should", "also", "about", "not", "but", "so", "if",
+    "meeting", "discussed", "discussion", "team", "summary", "key", "points", "next", "steps", "agreed",
+})
+SCAN_CHUNK = 8_192      # rows converted to float32 and scored per batch
+RERANK_FACTOR = 20      # with PQ, candidates re-scored exactly per result
+PQ_CENTROIDS = 256
+PQ_MIN_ROWS = 1_024     # codebooks are trained once the index has this many meetings
+PQ_ITERATIONS = 12
+PQ_TRAIN_SAMPLE = 20_000  # vectors k-means is trained on
+
+
+def embed(texts: List[str], dim: Optional[int] = None) -> np.ndarray:
+    """
+    (texts, dim) float32 unit vectors: signed feature hashing of word unigrams and bigrams
+    with sublinear term frequency. Deterministic across processes and needs no model.
+    """
+    dim = dim or Config.MEETING_INDEX_DIM
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        words = [word for word in WORD_RE.findall((text or "").lower()) if word not in STOPWORDS]
+        counts = Counter(words)
+        counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        if not counts:
+            continue
+        hashes = np.fromiter((zlib.crc32(term.encode("utf-8")) for term in counts), dtype=np.uint32, count=len(counts))
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        signs = np.where(hashes & np.uint32(1 << 31), -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors[i], hashes % dim, signs * weights)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def meeting_text(title: Optional[str], summary: Optional[str]) -> str:
+    return f"{title or ''}\n{summary or ''}"
+
+
+def train_pq(vectors: np.ndarray, subspaces: int, seed: int = 0) -> np.ndarray:
+    """(subspaces, centroids, dim / subspaces) k-means codebooks for product quantization."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > PQ_TRAIN_SAMPLE:
+        vectors = vectors[rng.choice(len(vectors), PQ_TRAIN_SAMPLE, replace=False)]
+    parts = np.split(vectors.astype(np.float32), subspaces, axis=1)
+    k = min(PQ_CENTROIDS, len(vectors))
+    codebooks = np.empty((subspaces, k, parts[0].shape[1]), dtype=np.float32)
+    for m, part in enumerate(parts):
+        centroids = part[rng.choice(len(part), k, replace=False)]
+        for _ in range(PQ_ITERATIONS):
+            assignment = _nearest(part, centroids)
+            counts = np.bincount(assignment, minlength=k)
+            sums = np.stack([np.bincount(assignment, weights=column, minlength=k) for column in part.T], axis=1)
+            centroids = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids).astype(np.float32)
+        codebooks[m] = centroids
+    return codebooks
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (points ** 2).sum(1)[:, None] - 2 * points @ centroids.T + (centroids ** 2).sum(1)[None, :]
+    return distances.argmin(1)
+
+
+def pq_encode(vectors: np.ndarray, codebooks: np.ndarray) -> np.ndarray:
+    parts = np.split(vectors.astype(np.float32), len(codebooks), axis=1)
+    return np.stack([_nearest(part, codebooks[m]) for m, part in enumerate(parts)], axis=1).astype(np.uint8)
+
+
+class MeetingIndex:
+    """
+    Embeddings of meeting titles and summaries for "related meetings" lookups.
+
+    Vectors are float16 rows in one flat file (MEETING_INDEX_PATH + ".f16"), memory-mapped
+    for search; the `meeting_vectors` table of the analytics DB maps rows to meetings. An
+    append inserts the row in SQLite and writes the vector at that row's offset, so API
+    workers can append to the same file. A meeting that is embedded again (re-processed)
+    gets a new row and its old one is ignored. With MEETING_INDEX_PQ_SUBSPACES set, rows
+    also get product-quantization codes (".codes") that are scanned first; the best
+    candidates are then scored exactly.
+    """
+
+    def __init__(self, path: Optional[str] = None, dim: Optional[int] = None):
+        self.path = path or Config.MEETING_INDEX_PATH
+        self.dim = dim or Config.MEETING_INDEX_DIM
+        self.subspaces = Config.MEETING_INDEX_PQ_SUBSPACES
+        if self.subspaces and self.dim % self.subspaces:
+            raise ValueError(f"MEETING_INDEX_DIM ({self.dim}) must be divisible by MEETING_INDEX_PQ_SUBSPACES")
+        self.last_row = 0
+        self.row_of: Dict[str, int] = {}
+        self.meeting_of: Dict[int, str] = {}
+        self.live = np.zeros(0, dtype=bool)   # row - 1 -> is the current vector of its meeting
+        self.codebooks: Optional[np.ndarray] = None
+        self._vectors: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    @property
+    def vectors_path(self) -> str:
+        return f"{self.path}.f16"
+
+    @property
+    def codes_path(self) -> str:
+        return f"{self.path}.codes"
+
+    @property
+    def codebook_path(self) -> str:
+        return f"{self.path}.codebook.npy"
+
+    def _write_row(self, path: str, row: int, data: bytes):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, data, (row - 1) * len(data))
+        finally:
+            os.close(fd)
+
+    def add(self, conn: sqlite3.Connection, meeting_ids: List[str], vectors: np.ndarray):
+        """Append (or replace) the vectors of `meeting_ids`."""
+        vectors = vectors.astype(np.float16)
+        codes = pq_encode(vectors, self.codebooks) if self._load_codebooks() is not None else None
+        with transaction(conn):
+            for i, meeting_id in enumerate(meeting_ids):
+                conn.execute("DELETE FROM meeting_vectors WHERE meeting_id=?", (meeting_id,))
+                row = conn.execute("INSERT INTO meeting_vectors (meeting_id) VALUES (?)", (meeting_id,)).lastrowid
+                self._write_row(self.vectors_path, row, vectors[i].tobytes())
+                if codes is not None:
+                    self._write_row(self.codes_path, row, codes[i].tobytes())
+
+    def _load_codebooks(self) -> Optional[np.ndarray]:
+        if self.codebooks is None and self.subspaces and os.path.exists(self.codebook_path):
+            self.codebooks = np.load(self.codebook_path)
+        return self.codebooks
+
+    def catch_up(self, conn: sqlite3.Connection):
+        """Pick up rows appended (by any worker) since the last call and remap the files if they grew."""
+        with self._lock:
+            self._catch_up(conn)
+
+    def _catch_up(self, conn: sqlite3.Connection):
+        rows = conn.execute(
+            "SELECT row, meeting_id FROM meeting_vectors WHERE row > ? ORDER BY row", (self.last_row,)
+        ).fetchall()
+        if rows:
+            live = np.zeros(rows[-1][0], dtype=bool)
+            live[:len(self.live)] = self.live
+            for row, meeting_id in rows:
+                previous = self.row_of.get(meeting_id)
+                if previous is not None:
+                    live[previous - 1] = False
+                    self.meeting_of.pop(previous, None)
+                live[row - 1] = True
+                self.row_of[meeting_id] = row
+                self.meeting_of[row] = meeting_id
+            self.live, self.last_row = live, rows[-1][0]
+
+        row_bytes = self.dim * 2
+        if os.path.exists(self.vectors_path):
+            available = min(os.path.getsize(self.vectors_path) // row_bytes, self.last_row)
+            if available and (self._vectors is None or len(self._vectors) < available):
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(available, self.dim))
+        if self._load_codebooks() is not None and os.path.exists(self.codes_path):
+            available = min(os.path.getsize(self.codes_path) // self.subspaces, self.last_row)
+            if available and (self._codes is None or len(self._codes) < available):
+                self._codes = np.memmap(self.codes_path, dtype=np.uint8, mode="r", shape=(available, self.subspaces))
+
+    def vector(self, meeting_id: str) -> Optional[np.ndarray]:
+        row = self.row_of.get(meeting_id)
+        if row is None or self._vectors is None or row > len(self._vectors):
+            return None
+        return np.asarray(self._vectors[row - 1], dtype=np.float32)
+
+    def _exact(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(row indices, cosine scores) of live rows, or of `rows` (0-based) when given."""
+        if rows is not None:
+            return rows, np.asarray(self._vectors[rows], dtype=np.float32) @ query
+        scores = np.full(len(self._vectors), -np.inf, dtype=np.float32)
+        for start in range(0, len(self._vectors), SCAN_CHUNK):
+            chunk = np.asarray(self._vectors[start:start + SCAN_CHUNK], dtype=np.float32)
+            scores[start:start + len(chunk)] = chunk @ query
+        scores[~self.live[:len(scores)]] = -np.inf
+        return np.arange(len(scores)), scores
+
+    def _approximate(self, query: np.ndarray, candidates: int) -> np.ndarray:
+        """Rows with the best product-quantization scores (asymmetric distance: exact query, coded rows)."""
+        tables = np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.subspaces, -1)).astype(np.float32)
+        offsets = np.arange(self.subspaces) * tables.shape[1]
+        codes = self._codes
+        scores = np.zeros(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCAN_CHUNK):
+            chunk = np.asarray(codes[start:start + SCAN_CHUNK])
+            scores[start:start + len(chunk)] = tables.ravel().take(chunk + offsets).sum(1)
+        scores[~self.live[:len(scores)]] = -np.inf
+        top = np.argpartition(-scores, min(candidates, len(scores) - 1))[:candidates]
+        return top[np.isfinite(scores[top])]
+
+    def search(self, query: np.ndarray, k: int, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """The `k` meetings most similar to the unit vector `query`, as (meeting_id, cosine)."""
+        with self._lock:
+            return self._search(query, k, exclude)
+
+    def _search(self, query: np.ndarray, k: int, exclude: Optional[str]) -> List[Tuple[str, float]]:
+        if self._vectors is None or not len(self._vectors):
+            return []
+        query = query.astype(np.float32)
+        wanted = k + (1 if exclude else 0)
+        if self._codes is not None and len(self._codes) >= PQ_MIN_ROWS:
+            rows, scores = self._exact(query, np.sort(self._approximate(query, wanted * RERANK_FACTOR)))
+        else:
+            rows, scores = self._exact(query)
+        order = np.argsort(-scores)[:wanted]
+        results = []
+        for i in order:
+            meeting_id = self.meeting_of.get(int(rows[i]) + 1)
+            if meeting_id is None or meeting_id == exclude or not np.isfinite(scores[i]):
+                continue
+            results.append((meeting_id, round(float(scores[i]), 4)))
+        return results[:k]
+
+    def train_codebooks(self):
+        """Train PQ codebooks on the stored vectors and encode every row (MEETING_INDEX_PQ_SUBSPACES > 0)."""
+        with self._lock:
+            self._train_codebooks()
+
+    def _train_codebooks(self):
+        if not self.subspaces or self._vectors is None or len(self._vectors) < PQ_MIN_ROWS:
+            return
+        vectors = np.asarray(self._vectors, dtype=np.float32)
+        codebooks = train_pq(vectors[self.live[:len(vectors)]], self.subspaces)
+        codes = pq_encode(vectors, codebooks)
+        tmp_path = f"{self.codes_path}.tmp"
+        codes.tofile(tmp_path)
+        os.replace(tmp_path, self.codes_path)
+        np.save(f"{self.codebook_path}.tmp.npy", codebooks)
+        os.replace(f"{self.codebook_path}.tmp.npy", self.codebook_path)
+        self.codebooks, self._codes = codebooks, None
+        logger.info(f"Trained product quantization for {len(vectors)} meeting vectors ({self.subspaces} bytes each)")
+
+
+_index: Optional[MeetingIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index(conn: sqlite3.Connection) -> MeetingIndex:
+    """This process's view of the index, brought up to date with other workers' appends."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MeetingIndex()
+    _index.catch_up(conn)
+    return _index
+
+
+def index_meeting(conn: sqlite3.Connection, meeting_id: str, title: Optional[str], summary: Optional[str]):
+    """Embed a stored (or re-processed) meeting. Errors are logged, not raised: the index is derived data."""
+    try:
+        get_index(conn).add(conn, [meeting_id], embed([meeting_text(title, summary)]))
+    except Exception as e:
+        logger.error(f"Indexing meeting {meeting_id} for related lookups failed: {e}")
+
+
+def related_meetings(conn: sqlite3.Connection, meeting_id: str, k: int = 5) -> Optional[List[Tuple[str, float]]]:
+    """Meetings most similar to `meeting_id` (None if the meeting does not exist)."""
+    index = get_index(conn)
+    query = index.vector(meeting_id)
+    if query is None:
+        row = conn.execute("SELECT meeting_title, summary FROM meetings WHERE meeting_id=?", (meeting_id,)).fetchone()
+        if row is None:
+            return None
+        # Not embedded yet (stored before the index existed): do it now
+        query = embed([meeting_text(row[0], row[1])])[0]
+        index.add(conn, [meeting_id], query[None, :])
+        index.catch_up(conn)
+    return index.search(query, k, exclude=meeting_id)
+
+
+def backfill_index(conn: sqlite3.Connection, batch: int = 1_000) -> int:
+    """Embed meetings that have no vector yet; trains PQ codebooks once there are enough rows."""
+    index = get_index(conn)
+    added = 0
+    while True:
+        rows = conn.execute(
+            "SELECT meeting_id, meeting_title, summary FROM meetings WHERE meeting_id NOT IN "
+            "(SELECT meeting_id FROM meeting_vectors) LIMIT ?", (batch,)
+        ).fetchall()
+        if not rows:
+            break
+        index.add(conn, [row[0] for row in rows], embed([meeting_text(title, summary) for _, title, summary in rows]))
+        added += len(rows)
+    index.catch_up(conn)
+    if added:
+        logger.info(f"Embedded {added} meeting(s) for related-meeting lookups")
+    if index.subspaces and index.codebooks is None:
+        index.train_codebooks()
+    return added
@@ -1,50 +1,261 @@
-import os
-import requests
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from src.core.analytics import transaction
 from src.utils.logger import logger
 from src.utils.config import Config
-from typing import Dict, Optional
+from src.utils.metrics import SLACK_MESSAGES
+
+# Slack errors that retrying will not fix
+PERMANENT_ERRORS = {
+    "channel_not_found", "not_in_channel", "is_archived", "invalid_auth", "not_authed",
+    "account_inactive", "token_revoked", "missing_scope", "msg_too_long", "no_text", "invalid_arguments"
+}
+
+# (loop, event) of the running sender, so producers on other threads can wake it
+_wakeup: Optional[tuple] = None
+
+
+def format_message(summary: Dict, actions: str, transcript: Optional[Dict] = None) -> str:
+    return (
+        "*New Meeting Notes*\n"
+        f"*Transcript*:\n{transcript.get('diarized', 'No transcript available') if transcript else 'No transcript available'}\n\n"
+        f"*Summary*:\n{summary.get('summary', 'No summary available')}\n\n"
+        f"*Sentiment*:\n{summary.get('sentiment', 'No sentiment analysis available')}\n\n"
+        f"*Action Items*:\n{actions or 'No action items identified'}"
+    )
+
+
+def split_message(text: str, limit: Optional[int] = None) -> List[str]:
+    """Split `text` into chunks of at most `limit` characters, preferring line breaks."""
+    limit = limit or Config.SLACK_MESSAGE_LIMIT
+    parts, current = [], ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            cut = line.rfind(" ", 0, limit)
+            cut = cut if cut > limit // 2 else limit
+            parts.append(line[:cut])
+            line = line[cut:].lstrip()
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            parts.append(current)
+            current = line
+        else:
+            current = candidate
+    if current or not parts:
+        parts.append(current)
+    return parts
+
+
+def enqueue_message(conn, channel: str, text: str) -> int:
+    """Store a message in the outbox; the background sender delivers it. Returns the outbox id."""
+    parts = split_message(text)
+    now = time.time()
+    with transaction(conn):
+        cursor = conn.execute(
+            "INSERT INTO slack_outbox (channel, parts, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (channel, json.dumps(parts), now, now)
+        )
+    if _wakeup is not None:
+        loop, event = _wakeup
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # sender loop already closed; the row waits for the next sender
+    return cursor.lastrowid
+
 
 def slack_notify(summary: Dict, actions: str, transcript: Optional[Dict] = None, channel: str = "#social", notify_slack: bool = False):
+    """Queue meeting notes for `channel`; delivery happens off the workflow's critical path."""
     if notify_slack and channel:
-        logger.info(f"Notifying Slack channel: {channel}")
-        try:
-            slack_token = Config.SLACK_BOT_TOKEN
-            if not slack_token:
-                logger.error("SLACK_BOT_TOKEN not set in environment variables")
-                raise ValueError("Slack bot token not configured")
-            
-            # Format the message
-            message = (
-                "*New Meeting Notes*\n"
-                f"*Transcript*:\n{transcript.get('diarized', 'No transcript available') if transcript else 'No transcript available'}\n\n"
-                f"*Summary*:\n{summary.get('summary', 'No summary available')}\n\n"
-                f"*Sentiment*:\n{summary.get('sentiment', 'No sentiment analysis available')}\n\n"
-                f"*Action Items*:\n{actions or 'No action items identified'}"
+        from src.core.analytics import get_connection
+
+        outbox_id = enqueue_message(get_connection(), channel, format_message(summary, actions, transcript))
+        logger.info(f"Queued Slack notification {outbox_id} for channel: {channel}")
+        return outbox_id
+    else:
+        logger.info("Slack notification skipped: notify_slack is False or no channel provided")
+
+
+class SlackDeliveryError(Exception):
+    def __init__(self, error: str, retry_after: Optional[float] = None, permanent: bool = False):
+        super().__init__(error)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+class SlackSender:
+    """
+    Background sender for the Slack outbox.
+
+    Due rows are claimed (pending -> sending) so several workers can share one outbox.
+    Channels are served concurrently; within a channel, posts go out in order and no faster
+    than SLACK_RATE_PER_CHANNEL per second. The first part of a message is posted to the
+    channel and the rest as replies in its thread. Progress is saved after every part, so
+    a retry resumes where delivery stopped. Failures back off exponentially (or as long as
+    Slack's Retry-After says) until SLACK_MAX_ATTEMPTS, then the row is marked failed.
+    """
+
+    def __init__(self, conn=None, base_url: Optional[str] = None, token: Optional[str] = None, client=None):
+        from src.core.analytics import get_connection
+
+        self.conn = conn or get_connection()
+        self.base_url = (base_url or Config.SLACK_API_URL).rstrip("/")
+        self.token = token or Config.SLACK_BOT_TOKEN
+        self._client = client
+        self._next_post: Dict[str, float] = {}
+
+    def _client_or_new(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(Config.SLACK_TIMEOUT_SECONDS, connect=5.0),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _execute(self, sql: str, params=()):
+        with transaction(self.conn):
+            return self.conn.execute(sql, params)
+
+    def _claim_due(self, limit: int = 50) -> List[Dict]:
+        now = time.time()
+        with transaction(self.conn):
+            # Rows left in 'sending' by a crashed worker become due again
+            self.conn.execute(
+                "UPDATE slack_outbox SET status='pending' WHERE status='sending' AND updated_at < ?",
+                (now - Config.SLACK_CLAIM_TIMEOUT_SECONDS,)
             )
-            
-            # Truncate message if too long (Slack limit: ~40,000 characters)
-            max_length = 30000
-            if len(message) > max_length:
-                message = message[:max_length] + "\n... (truncated)"
-            
-            # Send message to Slack
-            response = requests.post(
-                "https://slack.com/api/chat.postMessage",
-                headers={"Authorization": f"Bearer {slack_token}"},
-                json={
-                    "channel": channel,
-                    "text": message,
-                    "as_user": True
-                }
+            rows = self.conn.execute(
+                "SELECT id, channel, parts, sent_parts, thread_ts, attempts FROM slack_outbox "
+                "WHERE status='pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            claimed = []
+            for row in rows:
+                updated = self.conn.execute(
+                    "UPDATE slack_outbox SET status='sending', updated_at=? WHERE id=? AND status='pending'",
+                    (now, row[0])
+                )
+                if updated.rowcount:
+                    claimed.append({
+                        "id": row[0], "channel": row[1], "parts": json.loads(row[2]),
+                        "sent_parts": row[3], "thread_ts": row[4], "attempts": row[5]
+                    })
+        return claimed
+
+    async def _post(self, channel: str, text: str, thread_ts: Optional[str]) -> str:
+        import httpx
+
+        # Per-channel rate limit
+        wait = self._next_post.get(channel, 0.0) - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._next_post[channel] = time.monotonic() + 1.0 / Config.SLACK_RATE_PER_CHANNEL
+
+        payload = {"channel": channel, "text": text}
+        if thread_ts:
+            payload["thread_ts"] = thread_ts
+        try:
+            response = await self._client_or_new().post(
+                "/chat.postMessage", json=payload, headers={"Authorization": f"Bearer {self.token}"}
             )
-            response_data = response.json()
-            if not response_data.get("ok"):
-                logger.error(f"Slack API error: {response_data.get('error', 'Unknown error')}")
-                raise ValueError(f"Failed to send Slack message: {response_data.get('error', 'Unknown error')}")
-            
-            logger.info(f"Slack notification sent successfully to channel: {channel}")
+        except httpx.HTTPError as e:
+            raise SlackDeliveryError(f"{type(e).__name__}: {e}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise SlackDeliveryError(f"HTTP {response.status_code}", float(retry_after) if retry_after else None)
+        data = response.json()
+        if not data.get("ok"):
+            error = data.get("error", "unknown_error")
+            raise SlackDeliveryError(error, permanent=error in PERMANENT_ERRORS)
+        return data.get("ts")
+
+    async def _deliver(self, message: Dict):
+        parts, sent, thread_ts = message["parts"], message["sent_parts"], message["thread_ts"]
+        try:
+            if not self.token:
+                raise SlackDeliveryError("SLACK_BOT_TOKEN not set", permanent=True)
+            while sent < len(parts):
+                ts = await self._post(message["channel"], parts[sent], thread_ts)
+                thread_ts = thread_ts or ts
+                sent += 1
+                await asyncio.to_thread(
+                    self._execute,
+                    "UPDATE slack_outbox SET sent_parts=?, thread_ts=?, updated_at=? WHERE id=?",
+                    (sent, thread_ts, time.time(), message["id"])
+                )
         except Exception as e:
-            logger.error(f"Slack notification error: {str(e)}")
+            if not isinstance(e, SlackDeliveryError):
+                e = SlackDeliveryError(f"{type(e).__name__}: {e}")
+            attempts = message["attempts"] + 1
+            if e.permanent or attempts >= Config.SLACK_MAX_ATTEMPTS:
+                outcome, status, delay = "failed", "failed", 0.0
+                logger.error(f"Slack message {message['id']} to {message['channel']} failed after {attempts} attempt(s): {e}")
+            else:
+                outcome, status = "retry", "pending"
+                delay = e.retry_after if e.retry_after is not None else \
+                    min(Config.SLACK_BACKOFF_SECONDS * 2 ** (attempts - 1), 300.0) * random.uniform(0.8, 1.2)
+                logger.warning(f"Slack message {message['id']} to {message['channel']} failed ({e}), retrying in {delay:.1f}s")
+            SLACK_MESSAGES.inc(outcome=outcome)
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE slack_outbox SET status=?, attempts=?, next_attempt_at=?, last_error=?, updated_at=? WHERE id=?",
+                (status, attempts, time.time() + delay, str(e), time.time(), message["id"])
+            )
             return
-    else:
-        logger.info("Slack notification skipped: notify_slack is False or no channel provided")
\ No newline at end of file
+
+        SLACK_MESSAGES.inc(outcome="sent")
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE slack_outbox SET status='sent', updated_at=? WHERE id=?", (time.time(), message["id"])
+        )
+        logger.info(f"Slack message {message['id']} delivered to {message['channel']} in {len(parts)} part(s)")
+
+    async def _deliver_channel(self, messages: List[Dict]):
+        for message in messages:
+            await self._deliver(message)
+
+    async def deliver_due(self) -> int:
+        """Deliver every due message once; returns how many were attempted."""
+        messages = await asyncio.to_thread(self._claim_due)
+        by_channel: Dict[str, List[Dict]] = {}
+        for message in messages:
+            by_channel.setdefault(message["channel"], []).append(message)
+        await asyncio.gather(*(self._deliver_channel(batch) for batch in by_channel.values()))
+        return len(messages)
+
+    async def run(self, poll_seconds: Optional[float] = None):
+        """Deliver forever: on every enqueue from this process, and every `poll_seconds` otherwise."""
+        global _wakeup
+        event = asyncio.Event()
+        _wakeup = (asyncio.get_running_loop(), event)
+        poll_seconds = poll_seconds or Config.SLACK_POLL_SECONDS
+        try:
+            while True:
+                event.clear()
+                try:
+                    await self.deliver_due()
+                except Exception as e:
+                    logger.error(f"Slack sender error: {e}")
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            _wakeup = None
+            await self.aclose()
@@ -0,0 +1,261 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import wave
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.core.audio import DEFAULT_SAMPLE_RATE, iter_audio
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+FRAME_SECONDS = 0.03
+# A frame is speech if it is this far above the running noise floor, and never below SILENCE_FLOOR_DBFS
+SPEECH_MARGIN_DB = 10.0
+SILENCE_FLOOR_DBFS = -50.0
+# The noise floor follows quieter blocks immediately and louder ones only this fast
+NOISE_RISE_DB_PER_BLOCK = 3.0
+# Silences longer than MAX_SILENCE_SECONDS are cut down to PAD_SECONDS on each side of the speech
+MAX_SILENCE_SECONDS = 1.0
+PAD_SECONDS = 0.25
+
+OPUS_BITRATE = "24k"
+
+_warned_no_ffmpeg = False
+
+
+class _WavSink:
+    def __init__(self, path: str, sample_rate: int):
+        self._wf = wave.open(path, "wb")
+        self._wf.setnchannels(1)
+        self._wf.setsampwidth(2)
+        self._wf.setframerate(sample_rate)
+
+    def write(self, pcm: bytes):
+        self._wf.writeframes(pcm)
+
+    def close(self):
+        self._wf.close()
+
+
+class _FfmpegSink:
+    """Pipes 16-bit PCM into ffmpeg, which encodes to Opus (.ogg) or FLAC."""
+
+    def __init__(self, path: str, sample_rate: int, audio_format: str):
+        codec = ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip"] if audio_format == "ogg" \
+            else ["-c:a", "flac"]
+        self._process = subprocess.Popen(
+            [shutil.which("ffmpeg"), "-nostdin", "-v", "error", "-y", "-f", "s16le", "-ar", str(sample_rate),
+             "-ac", "1", "-i", "-", *codec, path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def write(self, pcm: bytes):
+        self._process.stdin.write(pcm)
+
+    def close(self):
+        self._process.stdin.close()
+        stderr = self._process.stderr.read().decode("utf-8", "replace").strip()
+        self._process.stderr.close()
+        if self._process.wait() != 0:
+            raise ValueError(f"ffmpeg failed to encode preprocessed audio: {stderr}")
+
+
+def _open_sink(path_prefix: str, audio_format: str, sample_rate: int):
+    if audio_format in ("ogg", "flac"):
+        if shutil.which("ffmpeg"):
+            path = f"{path_prefix}.{audio_format}"
+            return path, _FfmpegSink(path, sample_rate, audio_format)
+        global _warned_no_ffmpeg
+        if not _warned_no_ffmpeg:
+            logger.warning(f"ffmpeg not installed; preprocessed audio is written as WAV instead of {audio_format}")
+            _warned_no_ffmpeg = True
+    path = f"{path_prefix}.wav"
+    return path, _WavSink(path, sample_rate)
+
+
+class SilenceCompressor:
+    """
+    Streaming energy-based silence compressor.
+
+    Feed decoded blocks to `process`, which returns the samples to keep. Speech passes
+    through untouched. Silences up to MAX_SILENCE_SECONDS are kept whole; longer ones keep
+    PAD_SECONDS after the last speech and PAD_SECONDS before the next, so word edges are
+    never clipped. `anchors` records [output_seconds, original_seconds] at every cut.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.frame = max(int(FRAME_SECONDS * sample_rate), 1)
+        self.pad_frames = max(int(round(PAD_SECONDS / FRAME_SECONDS)), 1)
+        self.max_silence_frames = max(int(round(MAX_SILENCE_SECONDS / FRAME_SECONDS)), 2 * self.pad_frames)
+        self.noise_db: Optional[float] = None
+        self.leftover = np.zeros(0, dtype=np.float32)
+        self.silent_run = 0           # silent frames since the last speech frame
+        self.held: List[tuple] = []   # (original sample offset, samples) of trailing silence not yet emitted
+        self.held_frames = 0
+        self.original_samples = 0     # samples consumed (at `sample_rate`)
+        self.output_samples = 0
+        self.anchors: List[List[float]] = [[0.0, 0.0]]
+        self._expected = 0            # original offset that would continue the output without a cut
+
+    def _emit(self, offset: int, samples: np.ndarray, out: List[np.ndarray]):
+        if samples.size == 0:
+            return
+        if offset != self._expected:
+            self.anchors.append([self.output_samples / self.sample_rate, offset / self.sample_rate])
+        out.append(samples)
+        self.output_samples += samples.size
+        self._expected = offset + samples.size
+
+    def _speech_frames(self, frames: np.ndarray) -> np.ndarray:
+        energy_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frames.shape[1] + 1e-12)
+        block_floor = float(np.percentile(energy_db, 10))
+        if self.noise_db is None:
+            self.noise_db = block_floor
+        else:
+            self.noise_db = min(block_floor, self.noise_db + NOISE_RISE_DB_PER_BLOCK)
+        return energy_db > max(self.noise_db + SPEECH_MARGIN_DB, SILENCE_FLOOR_DBFS)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        audio = np.concatenate([self.leftover, block]) if self.leftover.size else block
+        usable = audio.size // self.frame * self.frame
+        self.leftover = audio[usable:]
+        base = self.original_samples
+        self.original_samples += usable
+        if not usable:
+            return np.zeros(0, dtype=np.float32)
+
+        frames = audio[:usable].reshape(-1, self.frame)
+        speech = self._speech_frames(frames)
+
+        # Runs of equal speech/silence labels
+        edges = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        starts = np.concatenate([[0], edges])
+        ends = np.concatenate([edges, [len(speech)]])
+
+        out: List[np.ndarray] = []
+        for start, end in zip(starts, ends):
+            offset = base + start * self.frame
+            samples = audio[start * self.frame:end * self.frame]
+            if speech[start]:
+                for held_offset, held in self.held:
+                    self._emit(held_offset, held, out)
+                self.held, self.held_frames, self.silent_run = [], 0, 0
+                self._emit(offset, samples, out)
+                continue
+
+            # Leading pad: silence right after speech is emitted straight away
+            head = min(max(self.pad_frames - self.silent_run, 0), end - start)
+            self._emit(offset, samples[:head * self.frame], out)
+            self.silent_run += end - start
+
+            # Hold the rest; only the last pad_frames survive once the silence gets long
+            rest_offset = offset + head * self.frame
+            rest = samples[head * self.frame:]
+            if rest.size:
+                self.held.append((rest_offset, rest))
+                self.held_frames += rest.size // self.frame
+            if self.silent_run > self.max_silence_frames:
+                self._trim_held()
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+
+    def _trim_held(self):
+        excess = self.held_frames - self.pad_frames
+        while excess > 0 and self.held:
+            held_offset, held = self.held[0]
+            frames = held.size // self.frame
+            if frames <= excess:
+                self.held.pop(0)
+                excess -= frames
+                self.held_frames -= frames
+            else:
+                self.held[0] = (held_offset + excess * self.frame, held[excess * self.frame:])
+                self.held_frames -= excess
+                excess = 0
+
+    def flush(self) -> np.ndarray:
+        """Trailing silence is dropped; a final partial frame is kept."""
+        out: List[np.ndarray] = []
+        if self.silent_run <= self.max_silence_frames:
+            for held_offset, held in self.held:
+                self._emit(held_offset, held, out)
+        self.held, self.held_frames = [], 0
+        self._emit(self.original_samples, self.leftover, out)
+        self.original_samples += self.leftover.size
+        self.leftover = np.zeros(0, dtype=np.float32)
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+
+
+def map_timestamp(seconds: float, anchors: List[List[float]]) -> float:
+    """Map a time in the preprocessed audio back to the original recording."""
+    if not anchors:
+        return seconds
+    outputs = np.array([anchor[0] for anchor in anchors])
+    index = max(int(np.searchsorted(outputs, seconds, side="right")) - 1, 0)
+    output_start, original_start = anchors[index]
+    return round(original_start + (seconds - output_start), 2)
+
+
+def remap_segments(segments: List[Dict], anchors: List[List[float]]) -> List[Dict]:
+    return [
+        {**seg, "start": map_timestamp(seg["start"], anchors), "end": map_timestamp(seg["end"], anchors)}
+        for seg in segments
+    ]
+
+
+def preprocess_audio(file_path: str, audio_format: Optional[str] = None, output_dir: Optional[str] = None,
+                     sample_rate: int = DEFAULT_SAMPLE_RATE) -> Dict:
+    """
+    Decode `file_path` to mono `sample_rate` audio, compress long silences and re-encode it.
+
+    Streams block by block, so memory stays flat however long the recording is.
+
+    Args:
+        audio_format: "ogg" (Opus), "flac" or "wav"; ogg/flac need ffmpeg and fall back to WAV
+        output_dir: where to write the result (default: the system temp directory)
+
+    Returns:
+        {"path", "anchors", "original_seconds", "seconds", "original_bytes", "bytes"};
+        pass `anchors` to `remap_segments` to move timestamps back onto the original audio.
+    """
+    start = time.perf_counter()
+    audio_format = (audio_format or Config.PREPROCESS_FORMAT).lower()
+    fd, prefix = tempfile.mkstemp(prefix="clarity_", dir=output_dir)
+    os.close(fd)
+    os.remove(prefix)
+
+    path, sink = _open_sink(prefix, audio_format, sample_rate)
+    compressor = SilenceCompressor(sample_rate)
+    try:
+        for block in iter_audio(file_path, sample_rate):
+            kept = compressor.process(block)
+            if kept.size:
+                sink.write((np.clip(kept, -1, 1) * 32767).astype("<i2").tobytes())
+        kept = compressor.flush()
+        if kept.size:
+            sink.write((np.clip(kept, -1, 1) * 32767).astype("<i2").tobytes())
+    except BaseException:
+        sink.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    sink.close()
+
+    prepared = {
+        "path": path,
+        "anchors": compressor.anchors,
+        "original_seconds": round(compressor.original_samples / sample_rate, 2),
+        "seconds": round(compressor.output_samples / sample_rate, 2),
+        "original_bytes": os.path.getsize(file_path),
+        "bytes": os.path.getsize(path),
+    }
+    logger.info(
+        f"Preprocessed {file_path}: {prepared['original_seconds']}s -> {prepared['seconds']}s, "
+        f"{prepared['original_bytes']} -> {prepared['bytes']} bytes in {time.perf_counter() - start:.2f}s"
+    )
+    return prepared
@@ -1,5 +1,6 @@
 import os
 import json
+import threading
 from src.utils.logger import logger
 from typing import Dict, Optional
 
@@ -32,7 +33,9 @@ def save_outputs(summary: Dict, actions: str, output_path: str, transcript: Opti
         # Ensure directory exists
         os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
 
-        with open(output_path, "w", encoding="utf-8") as f:
+        # Write to a private temp file and rename, so concurrent runs never interleave
+        tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             f.write("# Meeting Notes\n\n")
             f.write("## Summary\n")
             f.write(json.dumps(summary, ensure_ascii=False, indent=2) + "\n\n")
@@ -42,6 +45,7 @@ def save_outputs(summary: Dict, actions: str, output_path: str, transcript: Opti
             if transcript:
                 f.write("## Raw Transcript\n")
                 f.write(json.dumps(transcript, ensure_ascii=False, indent=2) + "\n\n")
+        os.replace(tmp_path, output_path)
             
         logger.info(f"Outputs saved to {output_path}")
 
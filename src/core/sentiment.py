@@ -0,0 +1,120 @@
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+# Lexicon tuned for meeting summaries: weights in [-3, 3]
+LEXICON: Dict[str, float] = {
+    # positive
+    "achieve": 1.5, "achieved": 1.8, "agree": 1.2, "agreed": 1.4, "agreement": 1.2, "align": 0.8,
+    "aligned": 1.0, "appreciate": 1.8, "appreciated": 1.8, "approve": 1.5, "approved": 1.6,
+    "benefit": 1.4, "best": 2.0, "better": 1.5, "breakthrough": 2.2, "clear": 0.8, "collaborative": 1.4,
+    "complete": 1.0, "completed": 1.3, "confident": 1.8, "consensus": 1.3, "constructive": 1.5,
+    "delighted": 2.5, "effective": 1.5, "efficient": 1.4, "encouraging": 1.8, "excellent": 2.7,
+    "excited": 2.0, "exceeded": 2.0, "fantastic": 2.6, "finalized": 1.0, "good": 1.6, "great": 2.3,
+    "growth": 1.3, "happy": 2.2, "helpful": 1.6, "improve": 1.2, "improved": 1.6, "improvement": 1.5,
+    "innovative": 1.6, "launch": 0.6, "launched": 1.0, "milestone": 1.2, "motivated": 1.6,
+    "on-track": 1.5, "opportunity": 1.3, "optimistic": 2.0, "outstanding": 2.7, "pleased": 2.0,
+    "positive": 1.9, "productive": 1.9, "profit": 1.4, "profitable": 1.8, "progress": 1.5,
+    "promising": 1.8, "resolved": 1.5, "smooth": 1.2, "solid": 1.2, "solution": 1.0, "strong": 1.5,
+    "succeed": 1.8, "success": 2.0, "successful": 2.1, "support": 1.0, "supportive": 1.5,
+    "thank": 1.5, "thanks": 1.5, "win": 2.0, "wins": 2.0, "well": 0.8,
+    # negative
+    "bad": -2.0, "behind": -1.2, "blocked": -1.8, "blocker": -1.8, "breach": -2.4, "bug": -1.2,
+    "bugs": -1.2, "cancel": -1.4, "cancelled": -1.6, "challenge": -0.8, "challenging": -1.0,
+    "complaint": -1.8, "complaints": -1.8, "concern": -1.2, "concerned": -1.5, "concerns": -1.2,
+    "conflict": -1.8, "confused": -1.4, "confusion": -1.4, "crisis": -2.6, "critical": -1.2,
+    "decline": -1.5, "declined": -1.5, "delay": -1.6, "delayed": -1.8, "delays": -1.6,
+    "difficult": -1.4, "disagree": -1.4, "disagreement": -1.5, "disappointed": -2.2,
+    "disappointing": -2.2, "escalate": -1.2, "escalated": -1.5, "fail": -2.2, "failed": -2.3,
+    "failure": -2.4, "frustrated": -2.1, "frustrating": -2.1, "issue": -1.0, "issues": -1.0,
+    "late": -1.2, "loss": -1.8, "losses": -1.8, "miss": -1.2, "missed": -1.6, "negative": -1.9,
+    "outage": -2.2, "overdue": -1.8, "overrun": -1.8, "poor": -2.0, "problem": -1.6,
+    "problems": -1.6, "reject": -1.6, "rejected": -1.8, "risk": -1.0, "risks": -1.0, "risky": -1.4,
+    "shortfall": -1.8, "slip": -1.2, "slipped": -1.5, "struggle": -1.6, "struggling": -1.8,
+    "stuck": -1.6, "tension": -1.5, "unclear": -1.0, "unhappy": -2.1, "unresolved": -1.4,
+    "worse": -2.0, "worst": -2.5, "worried": -1.8, "worry": -1.6,
+}
+
+NEGATORS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot",
+    "hardly", "barely", "lack", "lacks", "lacking",
+})
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.74
+NORMALIZATION_ALPHA = 15.0
+NEUTRAL_THRESHOLD = 0.05
+
+TOKEN_RE = re.compile(r"[a-z][a-z'\-]*|[.!?;:,]")
+
+# Fixed vocabulary: only tokens that affect the score get their own id. Every other word
+# shares id 0 and every "n't" contraction id 1, so nothing grows with the text scored.
+_OTHER, _CONTRACTION = 0, 1
+_BOUNDARIES = frozenset(".!?;:,")  # clause ends: punctuation matched by TOKEN_RE
+_VOCAB = ["", "n't", *LEXICON, *sorted(NEGATORS - LEXICON.keys()), *sorted(_BOUNDARIES)]
+_token_ids: Dict[str, int] = {token: token_id for token_id, token in enumerate(_VOCAB) if token_id > _CONTRACTION}
+_token_weights = np.array([LEXICON.get(token, 0.0) for token in _VOCAB], dtype=np.float64)
+_token_negators = np.array([token in NEGATORS or token == "n't" for token in _VOCAB], dtype=bool)
+_token_boundaries = np.array([token in _BOUNDARIES for token in _VOCAB], dtype=bool)
+
+
+def _token_id(token: str) -> int:
+    token_id = _token_ids.get(token)
+    if token_id is None:
+        return _CONTRACTION if token.endswith("n't") else _OTHER
+    return token_id
+
+
+def score_batch(texts: Iterable[str]) -> np.ndarray:
+    """
+    Compound sentiment score in [-1, 1] for each text.
+
+    Tokens are looked up once, then negation, per-document sums and normalization
+    run as NumPy array operations over the whole batch.
+    """
+    texts = list(texts)
+    token_ids: List[int] = []
+    lengths = np.zeros(len(texts), dtype=np.int64)
+    for doc_id, text in enumerate(texts):
+        tokens = TOKEN_RE.findall((text or "").lower())
+        token_ids.extend(map(_token_id, tokens))
+        lengths[doc_id] = len(tokens)
+
+    if not token_ids:
+        return np.zeros(len(texts), dtype=np.float64)
+
+    ids = np.fromiter(token_ids, dtype=np.int64, count=len(token_ids))
+    weights = _token_weights[ids]
+    negators = _token_negators[ids]
+    boundaries = _token_boundaries[ids]
+    docs = np.repeat(np.arange(len(texts)), lengths)
+
+    # Negation scope: a negator flips the next few words within the same clause and document
+    new_doc = np.empty(len(docs), dtype=bool)
+    new_doc[0] = True
+    new_doc[1:] = docs[1:] != docs[:-1]
+    clause = np.cumsum(boundaries | new_doc)
+    negated = np.zeros(len(weights), dtype=bool)
+    for k in range(1, NEGATION_WINDOW + 1):
+        negated[k:] |= negators[:-k] & (clause[k:] == clause[:-k])
+    weights = np.where(negated, weights * NEGATION_FACTOR, weights)
+
+    totals = np.bincount(docs, weights=weights, minlength=len(texts))
+    return totals / np.sqrt(totals * totals + NORMALIZATION_ALPHA)
+
+
+def score_text(text: str) -> float:
+    return float(score_batch([text])[0])
+
+
+def labels_for(scores: np.ndarray) -> List[str]:
+    return np.where(
+        scores > NEUTRAL_THRESHOLD, "Positive",
+        np.where(scores < -NEUTRAL_THRESHOLD, "Negative", "Neutral")
+    ).tolist()
+
+
+def label_sentiment(text: str) -> str:
+    """Positive / Neutral / Negative label for a single text."""
+    return labels_for(score_batch([text]))[0]
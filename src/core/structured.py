@@ -0,0 +1,49 @@
+import json
+import re
+from typing import List, Optional
+
+from src.interfaces.models import ActionItem, MeetingExtraction
+from src.utils.llm import get_chat_model, invoke_prompt
+from src.utils.logger import logger
+from src.utils.prompts import STRUCTURED_EXTRACTION_PROMPT, industry_focus
+
+
+CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+MEETING_EXTRACTION_SCHEMA = json.dumps(MeetingExtraction.model_json_schema())
+
+
+def extract_meeting_structured(transcript: str, industry: Optional[str] = None,
+                               custom_description: Optional[str] = None) -> MeetingExtraction:
+    """
+    Summary, sentiment, action items and delay risk from a single JSON-mode LLM call.
+
+    Raises:
+        pydantic.ValidationError: If the model output does not match `MeetingExtraction`
+    """
+    llm = get_chat_model(temperature=0, json_mode=True)
+
+    instructions = f"Additional instructions: {custom_description}\n" if custom_description else ""
+    raw = invoke_prompt(STRUCTURED_EXTRACTION_PROMPT, llm, {
+        "schema": MEETING_EXTRACTION_SCHEMA,
+        "focus": industry_focus.get(industry or "General", industry_focus["General"]),
+        "instructions": instructions,
+        "transcript": transcript
+    })
+
+    extraction = MeetingExtraction.model_validate_json(CODE_FENCE_RE.sub("", raw.strip()))
+    for item in extraction.action_items:
+        item.industry = item.industry or industry
+    logger.info(f"Structured extraction produced {len(extraction.action_items)} action items")
+    return extraction
+
+
+def render_action_items(items: List[ActionItem]) -> str:
+    """Render action items as the same bullet text the multi-call path produces."""
+    if not items:
+        return "No action items identified"
+    return "\n".join(
+        f"- {item.description} (Assignee: {item.assignee}, Deadline: {item.deadline}, "
+        f"Priority: {item.priority}, Delay risk: {item.delay_risk or 'N/A'})"
+        for item in items
+    )
@@ -1,35 +1,23 @@
-from langchain_groq import ChatGroq
-from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-import spacy
 
-from src.utils.config import Config
+from src.core.sentiment import label_sentiment
+from src.utils.llm import get_chat_model, invoke_prompt
 from src.utils.logger import logger
 
 
-nlp = spacy.load("en_core_web_sm")
-
 def summarize_transcript(transcript: str, summary_prompt: ChatPromptTemplate) -> dict:
-    llm = ChatGroq(
-        temperature=0,
-        groq_api_key = Config.GROQ_API_KEY,
-        model_name = Config.MODEL_NAME
-    )
-
-    # summary
-    chain = summary_prompt | llm | StrOutputParser()
+    llm = get_chat_model(temperature=0)
 
     try:
-        summary = chain.invoke({"transcript": transcript})
+        # summary
+        summary = invoke_prompt(summary_prompt, llm, {"transcript": transcript})
 
         # Sentiment
-        doc = nlp(summary)
-        sentiment = doc.sentiment
-
+        sentiment = label_sentiment(summary)
 
         logger.info("Summary generated")
         
-        return {"summary": summary, "sentiment": "Positive" if sentiment > 0 else "Negative" if sentiment < 0 else "Nutral"}
+        return {"summary": summary, "sentiment": sentiment}
 
     except Exception as e:
         logger.error(f"Summarization error: {e}")
@@ -1,56 +1,70 @@
-import base64
-from openai import OpenAI
 from src.utils.config import Config
+from src.utils.llm import get_groq_client
 from src.utils.logger import logger
-import httpx
-from groq import Groq
+from src.utils.metrics import AUDIO_SECONDS
+from src.utils.process_pool import run_cpu
 import os
 
 
 def transcribe_audio(file_path: str, language: str = "en") -> dict:
+    prepared = None
     try:
+        upload_path = file_path
+        if Config.PREPROCESS_AUDIO:
+            from src.core.preprocess import preprocess_audio
+            try:
+                prepared = run_cpu(preprocess_audio, file_path)
+                upload_path = prepared["path"]
+            except Exception as e:
+                logger.warning(f"Audio preprocessing failed for {file_path}, uploading it as-is: {e}")
+
         # Validate file size (Groq free tier limit: 25MB)
-        if(os.path.getsize(file_path) > 25 * 1024 * 1024):
+        if(os.path.getsize(upload_path) > Config.WHISPER_MAX_BYTES):
             raise ValueError("Audio file exceed 25MB limit. Use a shorter clip or upgrade tier.")
-        
-        # Read and encode file to base64 (API requirement)
-        with open(file_path, "rb") as audio_file:
-            audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
-
-
-        # Initialize OpenAI client with Groq base URL
-        # client = OpenAI(
-        #     api_key=Config.GROQ_API_KEY,
-        #     base_url="hhtps://api.groq.com/openai/v1",
-        #     http_client=httpx.Client(
-        # verify=False,  # From step 2
-        # timeout=30.0,  # 30s timeout per request
-        # limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)  # Connection pooling
-        # )
-        # )
 
-        client = Groq()
+        client = get_groq_client()
 
 
         # Transcribe
-        with open(file_path, "rb") as audio_file:
+        with open(upload_path, "rb") as audio_file:
             response = client.audio.transcriptions.create(
                 model = Config.WHISPER_MODEL,
                 file=audio_file,
-                response_format="json",
+                response_format="verbose_json",  # includes segment timestamps
                 language=language,
                 temperature=0.0
             )
 
         logger.info(f"Transcription completed for {file_path} using Groq Whisper")
-        segments = response.segments if hasattr(response, 'segments') else []
-        # Format transcript with speakers (basic: use timestamps for pseudo-diarization; advanced: integrate whisperx if needed)
-        transcript = "\n".join([f"Speaker {i+1} ({seg["start"]}s): {seg["text"]}" for i, seg in enumerate(segments)])
+        segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+            for seg in (getattr(response, "segments", None) or [])
+        ]
+        audio_seconds = getattr(response, "duration", None) or (segments[-1]["end"] if segments else 0.0)
+        AUDIO_SECONDS.inc(float(audio_seconds))
+
+        if prepared:
+            from src.core.preprocess import remap_segments
+            # Report times against the original recording, not the silence-trimmed upload
+            segments = remap_segments(segments, prepared["anchors"])
+
+        if segments and Config.DIARIZATION_ENABLED:
+            from src.core.diarize import diarize_file
+            try:
+                # The original recording, pauses included: they set the noise floor and mark speaker changes
+                segments = run_cpu(diarize_file, file_path, segments)
+            except Exception as e:
+                logger.warning(f"Diarization failed for {file_path}, labelling a single speaker: {e}")
+
+        transcript = "\n".join([f"{seg.get('speaker', 'Speaker 1')} ({seg['start']}s): {seg['text']}" for seg in segments])
         if not transcript:
             transcript = response.text  # Fallback to plain transcript
 
-        return {"text": response.text, "diarized": transcript}
+        return {"text": response.text, "diarized": transcript, "segments": segments, "audio_seconds": audio_seconds}
     
     except Exception as e:
         logger.error(f"Transcription error: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if prepared and os.path.exists(prepared["path"]):
+            os.remove(prepared["path"])
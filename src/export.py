@@ -0,0 +1,35 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.core.export import FORMATS, TABLES, export_stream, next_since
+from src.utils.config import Config
+
+
+@click.command()
+@click.option("--table", type=click.Choice(list(TABLES)), required=True)
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="ndjson", show_default=True)
+@click.option("--since", default=None, help="Only rows changed after this ISO timestamp (e.g. the last run's start)")
+@click.option("--gzip", is_flag=True, help="gzip-compress the output")
+@click.option("--include-transcripts", is_flag=True, help="Add the transcript column to a meetings export")
+@click.option("--output", default="-", show_default=True, help="Output file; '-' writes to stdout")
+def main(table: str, fmt: str, since: str, gzip: bool, include_transcripts: bool, output: str):
+    following = next_since(datetime.now())
+    out = click.open_file(output, "wb")
+    with out:
+        try:
+            for chunk in export_stream(table, fmt, since, gzip, include_transcripts):
+                out.write(chunk)
+        except sqlite3.OperationalError as e:
+            raise click.ClickException(f"cannot read {Config.DB_PATH}: {e}")
+    # On stderr, so it never mixes with an export written to stdout
+    destination = "stdout" if output == "-" else output
+    click.echo(f"Exported {table} to {destination}; pass --since {following} for the next incremental export", err=True)
+
+
+if __name__ == "__main__":
+    main()
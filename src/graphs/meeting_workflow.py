@@ -1,11 +1,11 @@
 import os
-from langgraph.graph import StateGraph, END, START
-from langchain_groq import ChatGroq
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
+import time
+import uuid
+from functools import lru_cache, wraps
 from src.utils.config import Config
-from src.utils.prompts import QA_PROMPT, get_action_prompt, get_summary_prompt
-from typing import Optional, TypedDict 
+from src.utils.metrics import WORKFLOW_DURATION, current_node, observe_node
+from src.utils.single_flight import SingleFlight, file_digest, make_key
+from typing import Any, Callable, List, Optional, TypedDict 
 
 from src.utils.logger import logger
 
@@ -25,11 +25,101 @@ class MeetingState(TypedDict):
     qa_response: Optional[str]
     industry: Optional[str]
     custom_prompt_description : Optional[str]
-    summary_prompt : Optional[ChatPromptTemplate]
-    action_prompt : Optional[ChatPromptTemplate]
+    summary_prompt : Optional[Any]  # ChatPromptTemplate; LangChain is imported lazily
+    action_prompt : Optional[Any]
+    token_stats : Optional[dict]
+    pipeline_mode : Optional[str]
+    action_items : Optional[list]
+    structured_ok : Optional[bool]
+    trace_id : Optional[str]
+    run_id : Optional[str]
+
+
+# Called as observer(node_name, seconds, state, error) after every node run
+# (benchmarks, metrics)
+node_observers: List[Callable[[str, float, dict, Optional[BaseException]], None]] = [observe_node]
+
+
+def instrumented(name: str, fn: Callable):
+    """Wrap a graph node so its wall time and outcome are reported to `node_observers`."""
+    @wraps(fn)
+    def wrapper(state: MeetingState):
+        start = time.perf_counter()
+        error = None
+        token = current_node.set(name)
+        try:
+            return fn(state)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            current_node.reset(token)
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"[trace {state.get('trace_id') or '-'}] node={name} "
+                f"duration={elapsed:.3f}s status={'error' if error else 'ok'}"
+            )
+            for observer in node_observers:
+                try:
+                    observer(name, elapsed, state, error)
+                except Exception as e:
+                    logger.warning(f"Node observer failed for {name}: {e}")
+    return wrapper
+
+
+def updates_only(fn: Callable):
+    """
+    Turn a node that fills in and returns the whole state into one that returns only the
+    keys it changed. Nodes running in parallel branches must not write the same keys, and
+    each one gets its own copy of the state, so writing into it is safe.
+    """
+    @wraps(fn)
+    def wrapper(state: MeetingState):
+        before = dict(state)
+        result = fn(state)
+        # Nodes assign new values to the keys they produce, so the update is whatever changed
+        return {key: value for key, value in result.items() if key not in before or before[key] is not value}
+    return wrapper
+
+
+def checkpointed(name: str, fn: Callable):
+    """
+    Wrap a graph node so its state update is checkpointed under the run id. When a run is
+    resumed, nodes that already completed return their saved update instead of running.
+    """
+    @wraps(fn)
+    def wrapper(state: MeetingState):
+        from src.utils import checkpoints
+
+        run_id = state.get("run_id")
+        if not run_id or not Config.CHECKPOINTS_ENABLED:
+            return fn(state)
+
+        saved = checkpoints.load_checkpoint(run_id, name)
+        if saved is not checkpoints.MISSING:
+            logger.info(f"[trace {state.get('trace_id') or '-'}] node={name} restored from checkpoint (run {run_id})")
+            return saved
+
+        result = fn(state)
+        try:
+            checkpoints.save_checkpoint(run_id, name, result)
+        except Exception as e:
+            logger.warning(f"Checkpoint for run {run_id} node {name} not saved: {e}")
+        return result
+    return wrapper
+
+
+def prompt_transcript(state: MeetingState) -> str:
+    """Transcript text to send to the LLM: the compacted form when available."""
+    transcript = state.get("transcript")
+    if isinstance(transcript, dict):
+        return transcript.get("compact") or transcript.get("diarized") or transcript.get("text") or ""
+    return transcript or ""
 
 # Node to generate custom prompts
 def generate_custom_prompts(state: MeetingState):
+    from src.utils.prompts import get_action_prompt, get_summary_prompt
+
     state["summary_prompt"] = get_summary_prompt(
         state.get("industry", "General"), 
         state.get("custom_prompt_description")
@@ -49,6 +139,22 @@ def transcribe(state: MeetingState):
 
     return state
 
+def compact(state: MeetingState):
+    from src.core.compact import compact_transcript
+    from src.utils.process_pool import run_cpu
+
+    if not state.get("transcript"):
+        return state
+
+    compacted = run_cpu(compact_transcript, state["transcript"])
+    transcript = state["transcript"]
+    if not isinstance(transcript, dict):
+        transcript = {"text": transcript, "diarized": transcript}
+    state["transcript"] = {**transcript, "compact": compacted["compact"]}
+    state["token_stats"] = compacted["stats"]
+
+    return state
+
 def summarize(state: MeetingState):
     from src.core.summarize import summarize_transcript
 
@@ -58,7 +164,7 @@ def summarize(state: MeetingState):
 
     summary_prompt = state.get("summary_prompt") 
 
-    state["summary"] = summarize_transcript(state["transcript"], summary_prompt)
+    state["summary"] = summarize_transcript(prompt_transcript(state), summary_prompt)
 
     return state
 
@@ -67,14 +173,45 @@ def extract_actions(state: MeetingState):
 
     action_prompt = state.get("action_prompt")
 
-    state["actions"] = extract_action_items(state["transcript"], state["summary"], action_prompt)
+    state["actions"] = extract_action_items(prompt_transcript(state), state["summary"], action_prompt)
+
+    return state
+
+def structured_extract(state: MeetingState):
+    """One-call summary + actions + delay risk; flags failure so the graph can fall back."""
+    from groq import BadRequestError
+    from pydantic import ValidationError
+    from src.core.structured import extract_meeting_structured, render_action_items
+
+    if not state.get("transcript"):
+        state["structured_ok"] = False
+        return state
+
+    try:
+        extraction = extract_meeting_structured(
+            prompt_transcript(state),
+            state.get("industry"),
+            state.get("custom_prompt_description")
+        )
+    except (ValidationError, ValueError, BadRequestError) as e:
+        # Groq rejects JSON-mode output that doesn't parse with a 400 (json_validate_failed)
+        logger.warning(f"Structured extraction failed validation, falling back to multi-call path: {e}")
+        state["structured_ok"] = False
+        return state
+
+    state["summary"] = {"summary": extraction.summary, "sentiment": extraction.sentiment}
+    state["action_items"] = [item.model_dump() for item in extraction.action_items]
+    state["actions"] = render_action_items(extraction.action_items)
+    state["structured_ok"] = True
 
     return state
 
 def save(state: MeetingState):
     from src.core.save_outputs import save_outputs
+    from src.utils.process_pool import run_cpu
 
-    save_outputs(state["summary"], state["actions"], state["output_path"], state["transcript"])
+    # Rendering full transcripts to JSON is the heavy part; it runs in a pool worker
+    run_cpu(save_outputs, state["summary"], state["actions"], state["output_path"], state["transcript"])
 
     return state
 
@@ -100,19 +237,16 @@ def notify_sl(state: MeetingState):
 
 # Node for Q&A chat
 def qa_chat(state: MeetingState):
+    from src.utils.llm import get_chat_model, invoke_prompt
+    from src.utils.prompts import QA_PROMPT
 
     if not state.get("chat_message"):
         return state
 
-    llm = ChatGroq(
-        temperature=0,
-        groq_api_key=Config.GROQ_API_KEY,
-        model_name = Config.MODEL_NAME
-    )
+    llm = get_chat_model(temperature=0)
 
-    chain = QA_PROMPT | llm | StrOutputParser()
-    response = chain.invoke({
-        "transcript": state["transcript"] or "", 
+    response = invoke_prompt(QA_PROMPT, llm, {
+        "transcript": prompt_transcript(state), 
         "summary": state["summary"] or "",
         "message": state["chat_message"]     
     })
@@ -124,6 +258,98 @@ def qa_chat(state: MeetingState):
 
 
 
+# Concurrent runs over the same audio (or the same chat context) with the same
+# parameters share one execution instead of paying for it twice
+workflow_flight = SingleFlight("workflow")
+
+
+def workflow_key(inputs: dict) -> str:
+    params = dict(inputs)
+    # Per-request ids must not stop identical runs from coalescing
+    params.pop("trace_id", None)
+    params.pop("run_id", None)
+    if params.get("file_path") and os.path.exists(params["file_path"]):
+        # Key on the audio content, not on where it was uploaded to
+        params["file_path"] = file_digest(params["file_path"])
+    return make_key(sorted(params.items()))
+
+
+@lru_cache(maxsize=None)
+def build_graph(has_file: bool, pipeline_mode: str, qa: bool = False):
+    """
+    Build and compile the meeting graph once per topology; LangGraph is imported on first use.
+
+    Independent nodes run in parallel branches: prompt generation alongside transcription,
+    Slack and the notes file side by side. A Q&A message over an existing transcript goes
+    straight to `qa_chat` without re-summarizing it.
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    workflow = StateGraph(MeetingState)
+
+    def node(name: str, fn: Callable):
+        # Restored nodes skip instrumentation, so metrics only count real executions
+        return checkpointed(name, instrumented(name, updates_only(fn)))
+
+    workflow.add_node("compact", node("compact", compact))
+    if qa and not has_file:
+        workflow.add_node("qa_chat", node("qa_chat", qa_chat))
+        workflow.add_edge(START, "compact")
+        workflow.add_edge("compact", "qa_chat")
+        workflow.add_edge("qa_chat", END)
+        return workflow.compile()
+
+    if has_file:
+        workflow.add_node("transcript", node("transcript", transcribe))
+    workflow.add_node("generate_custom_prompts", node("generate_custom_prompts", generate_custom_prompts))
+    workflow.add_node("summarize", node("summarize", summarize))
+    workflow.add_node("extract_actions", node("extract_actions", extract_actions))
+    workflow.add_node("save", node("save", save))
+    workflow.add_node("notify_slack", node("notify_slack", notify_sl))
+
+    # Transcript branch
+    if has_file:
+        workflow.add_edge(START, "transcript")
+        workflow.add_edge("transcript", "compact")
+    else:
+        workflow.add_edge(START, "compact")
+
+    if pipeline_mode == "structured":
+        # One LLM call; fall back to the multi-call path if its output doesn't validate.
+        # Custom prompts are only needed on the fallback, so they are not generated up front.
+        workflow.add_node("structured_extract", node("structured_extract", structured_extract))
+        workflow.add_edge("compact", "structured_extract")
+        workflow.add_conditional_edges(
+            "structured_extract",
+            lambda state: ["notify_slack", "save"] if state.get("structured_ok") else "generate_custom_prompts",
+            ["notify_slack", "save", "generate_custom_prompts"]
+        )
+        workflow.add_edge("generate_custom_prompts", "summarize")
+    else:
+        # Prompts don't depend on the transcript: generate them while it is being made,
+        # and summarize once both branches are done
+        workflow.add_edge(START, "generate_custom_prompts")
+        workflow.add_edge(["compact", "generate_custom_prompts"], "summarize")
+
+    # Actions need the summary; delay predictions need the actions
+    workflow.add_edge("summarize", "extract_actions")
+
+    # Fan out: Slack and the notes file are independent of each other
+    workflow.add_edge("extract_actions", "notify_slack")
+    workflow.add_edge("extract_actions", "save")
+
+    if qa:
+        # Q&A over a freshly processed file waits for both
+        workflow.add_node("qa_chat", node("qa_chat", qa_chat))
+        workflow.add_edge(["notify_slack", "save"], "qa_chat")
+        workflow.add_edge("qa_chat", END)
+    else:
+        workflow.add_edge("notify_slack", END)
+        workflow.add_edge("save", END)
+
+    # Compile
+    return workflow.compile()
+
 
 def run_workflow(
         file_path: str, 
@@ -135,56 +361,36 @@ def run_workflow(
         transcript: str = None,
         summary: str = None,
         industry: str = "General",
-        custom_prompt_description: Optional[str] = None
+        custom_prompt_description: Optional[str] = None,
+        pipeline_mode: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        run_meta: Optional[dict] = None
     ):
+    """
+    Run the meeting graph. Every node's output is checkpointed under `run_id` (a new one
+    by default); calling again with the run id of a failed run resumes it, skipping the
+    nodes that already completed. `run_meta` is stored with the run for whoever retries it.
+
+    A call that joins an identical run already in flight gets that run's result, so the run
+    id to report is `result["run_id"]` (or `run_id` on the exception), not the one passed in.
+    """
 
-    logger.info(f"Validating run_workflow inputs: file_path={file_path}, output_path={output_path}, notify_slack={notify_slack}, channel={channel}")
+    trace_id = trace_id or uuid.uuid4().hex
+    run_id = run_id or uuid.uuid4().hex
+    logger.info(f"[trace {trace_id}] Validating run_workflow inputs: file_path={file_path}, output_path={output_path}, notify_slack={notify_slack}, channel={channel}")
 
     if notify_slack and not isinstance(notify_slack, bool):
         logger.error(f"notify_slack must be a boolean, got {type(notify_slack)}")
         raise ValueError(f"notify_slack must be a boolean, got {type(notify_slack)}")
 
+    pipeline_mode = pipeline_mode or Config.PIPELINE_MODE
+    if pipeline_mode not in ("multi", "structured"):
+        raise ValueError(f"pipeline_mode must be 'multi' or 'structured', got {pipeline_mode!r}")
 
-    
-
-    # Build graph
-    workflow = StateGraph(MeetingState)
-
-    workflow.add_node("transcript", transcribe)
-    workflow.add_node("summarize", summarize)
-    workflow.add_node("extract_actions", extract_actions)
-    workflow.add_node("generate_custom_prompts", generate_custom_prompts)
-    workflow.add_node("save", save)
-    workflow.add_node("notify_slack", notify_sl)
-    workflow.add_node("qa_chat", qa_chat)
-
-    # Edges
-    if file_path:
-        workflow.set_entry_point("transcript")
-        workflow.add_edge("transcript", "generate_custom_prompts")
-        workflow.add_edge("generate_custom_prompts", "summarize")
-    else:
-        workflow.set_entry_point("generate_custom_prompts")
-        workflow.add_edge("generate_custom_prompts","summarize")
-    # workflow.add_edge(START, "transcript")
-    # workflow.add_edge("transcript", "summarize")
-    workflow.add_edge("summarize", "extract_actions")
-    workflow.add_edge("extract_actions", "notify_slack")
-    workflow.add_edge("notify_slack", "save")
-    workflow.add_edge("save", END)
-
-    # Branch for QA
-    workflow.add_conditional_edges(
-        "save",
-        lambda state: "qa_chat" if state["chat_message"] else "end",
-        {
-            "qa_chat": "qa_chat",
-            "end": END
-        }
-    )
-
-    # Compile
-    app = workflow.compile()
+    app = build_graph(bool(file_path), pipeline_mode, bool(chat_message))
+    # A chat answer over a stored transcript is cheap to redo; don't store a run (and the transcript) per message
+    checkpointing = Config.CHECKPOINTS_ENABLED and not (chat_message and not file_path)
 
     inputs = {
         "file_path": file_path, 
@@ -196,15 +402,48 @@ def run_workflow(
         "transcript": transcript,
         "summary": summary,
         "industry": industry,
-        "custom_prompt_description": custom_prompt_description
+        "custom_prompt_description": custom_prompt_description,
+        "pipeline_mode": pipeline_mode,
+        "trace_id": trace_id,
+        "run_id": run_id if checkpointing else None
         }
 
+    def execute(inputs: dict):
+        if not checkpointing:
+            return app.invoke(inputs)
+
+        from src.utils import checkpoints
+
+        checkpoints.begin_run(run_id, {k: v for k, v in inputs.items() if k != "run_id"}, run_meta)
+        try:
+            result = app.invoke(inputs)
+        except BaseException as e:
+            checkpoints.fail_run(run_id, e)
+            e.run_id = run_id  # coalesced callers share this exception; tell them which run to retry
+            logger.error(f"[trace {trace_id}] Run {run_id} failed; completed nodes are kept for a retry")
+            raise
+        checkpoints.complete_run(run_id)
+        return result
+
+    start = time.perf_counter()
     try:
-        result = app.invoke(inputs)
-        logger.info("Workflow completed")
+        result = workflow_flight.do(workflow_key(inputs), execute, inputs)
+        logger.info(f"[trace {trace_id}] Workflow completed")
         return result
     
     except Exception as e:
-        logger.error(f"Workflow error: {e}")
+        logger.error(f"[trace {trace_id}] Workflow error: {e}")
         raise
-    
\ No newline at end of file
+    finally:
+        WORKFLOW_DURATION.observe(time.perf_counter() - start, mode=pipeline_mode)
+    
+
+def resume_workflow(run_id: str):
+    """Re-run a failed or interrupted run from its checkpoints."""
+    from src.utils import checkpoints
+
+    run = checkpoints.get_run(run_id)
+    if run is None:
+        raise KeyError(f"Unknown run {run_id}")
+    logger.info(f"Resuming run {run_id} after {run['last_node'] or 'no completed node'}")
+    return run_workflow(**run["inputs"], run_id=run_id, run_meta=run["meta"])
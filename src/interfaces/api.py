@@ -1,97 +1,193 @@
+import asyncio
+from contextlib import nullcontext
 from datetime import datetime
 import json
-import sqlite3
 import time
 from typing import Optional
 import uuid
 import wave
-from fastapi import FastAPI, Form, Query, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, FastAPI, Form, Header, Query, Request, Response, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_socketio import SocketManager
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+from fastapi.responses import StreamingResponse
 import socketio
 import sys
 import os
 
-from src.utils.config import Config
-
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-import pyaudio
-import uvicorn
+from src.utils.config import Config
 from src.utils.logger import logger
-from src.graphs.meeting_workflow import run_workflow
-from src.interfaces.models import FeedbackInput, MeetingInput
-
+from src.core.analytics import get_connection
+from src.interfaces.models import FeedbackInput, MeetingInput, ReprocessInput
+from src.utils.state_store import get_state_store, socket_manager
 
-app = FastAPI()
+# Heavy dependencies (LangChain/LangGraph, Groq, NumPy, PyAudio) are imported inside
+# the handlers that need them, so importing this module and starting a worker stay fast.
 
-# Socket.io Integration
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="http://localhost:3000")
-app.mount("/socket.io", socketio.ASGIApp(sio))
+router = APIRouter()
 
-# Add CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Socket.io Integration; emits reach clients connected to any worker
+sio = socketio.AsyncServer(
+    async_mode="asgi", cors_allowed_origins="http://localhost:3000", client_manager=socket_manager()
 )
 
-llm = ChatGroq(
-    model = Config.MODEL_NAME,
-    temperature=0.3,
-    groq_api_key = Config.GROQ_API_KEY
-)
+# Cross-worker state lives in the shared state store (STATE_BACKEND):
+#   "recording"         - set while a real-time recording runs; deleting it stops the recording
+#   "latest_meeting_id" - latest meeting id for chat context
+#   "latest_recording_id" - meeting id of the most recent real-time recording
+#   "recording_result:<meeting_id>" - finished real-time result, kept RECORDING_RESULT_TTL seconds
+#   cache "recent_results" - recent batch results for Q&A context, bounded to RECENT_RESULTS_MAX
+RECORD_SECONDS = 30
+RECORDING_RESULT_TTL = 24 * 3600
+# Long-polls are woken by an in-process event; results finished by another worker are
+# picked up by re-reading the store this often
+RESULT_RECHECK_SECONDS = 1.0
+
+# meeting_id -> [asyncio.Event, waiter count] for /get_transcription_results long-polls
+_result_waiters: dict = {}
+
+
+def _publish_recording_result(loop, meeting_id: str, payload: dict):
+    """From the recording thread: store the result, wake long-polls and push it over socket.io."""
+    get_state_store().set(f"recording_result:{meeting_id}", payload, ttl=RECORDING_RESULT_TTL)
 
-# DB for analytics
-conn = sqlite3.connect("instance/analytics.db", check_same_thread=False)\
-
-conn.execute("""
-                CREATE TABLE IF NOT EXISTS meetings (
-             meeting_id TEXT PRIMARY KEY,
-             timestamp DATETIME,
-             file_path TEXT,
-             language TEXT,
-             transcript TEXT,
-             summary TEXT,
-             actions TEXT,
-             diarized_transcript TEXT,
-             industry TEXT,
-             user_id TEXT,
-             meeting_title TEXT
-             )
-        """)
-
-conn.execute("""
-    CREATE TABLE IF NOT EXISTS feedback (
-        id INTEGER PRIMARY KEY,
-        meeting_id TEXT,
-        rating INT,
-        comments TEXT,
-        FOREIGN KEY (meeting_id) REFERENCES meetings (meeting_id)
+    def wake():
+        waiter = _result_waiters.get(meeting_id)
+        if waiter:
+            waiter[0].set()
+
+    try:
+        loop.call_soon_threadsafe(wake)
+        asyncio.run_coroutine_threadsafe(sio.emit("transcription_result", payload), loop)
+    except RuntimeError:
+        pass  # event loop already closed; the stored result is still served
+
+
+async def _wait_for_recording_result(meeting_id: str, timeout: float) -> Optional[dict]:
+    store = get_state_store()
+    waiter = _result_waiters.setdefault(meeting_id, [asyncio.Event(), 0])
+    waiter[1] += 1
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            result = store.get(f"recording_result:{meeting_id}")
+            remaining = deadline - time.monotonic()
+            if result is not None or remaining <= 0:
+                return result
+            try:
+                await asyncio.wait_for(waiter[0].wait(), timeout=min(remaining, RESULT_RECHECK_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        waiter[1] -= 1
+        if not waiter[1]:
+            _result_waiters.pop(meeting_id, None)
+
+
+def create_app() -> FastAPI:
+    """Application factory (`uvicorn --factory src.interfaces.api:create_app`)."""
+    app = FastAPI()
+    app.include_router(router)
+    app.mount("/socket.io", socketio.ASGIApp(sio))
+
+    # Add CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
     )
-""")
 
-conn.commit()
+    @app.on_event("startup")
+    def open_db():
+        # DB for analytics
+        get_connection()
+
+    @app.on_event("startup")
+    async def start_upload_gc():
+        from src.utils.checkpoints import prune_runs
+        from src.utils.storage import gc_uploads
+
+        async def collect():
+            while True:
+                try:
+                    await run_in_threadpool(gc_uploads)
+                    await run_in_threadpool(prune_runs)
+                except Exception as e:
+                    logger.warning(f"Upload GC failed: {e}")
+                await asyncio.sleep(Config.UPLOAD_GC_INTERVAL_SECONDS)
+
+        app.state.upload_gc = asyncio.create_task(collect())
+
+    @app.on_event("startup")
+    async def start_slack_sender():
+        from src.core.notify_slack import SlackSender
+
+        app.state.slack_sender = asyncio.create_task(SlackSender().run())
+
+    @app.on_event("startup")
+    async def monitor_event_loop():
+        from src.utils.metrics import EVENT_LOOP_LAG
+
+        async def probe(interval: float = 0.1):
+            loop = asyncio.get_running_loop()
+            while True:
+                start = loop.time()
+                await asyncio.sleep(interval)
+                EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
+
+        app.state.loop_monitor = asyncio.create_task(probe())
+
+    @app.on_event("startup")
+    async def warm_process_pool():
+        from src.utils.process_pool import warm_up
+
+        # In the background, so the worker starts accepting requests straight away
+        app.state.process_pool_warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    @app.on_event("startup")
+    async def backfill_indexes():
+        from src.core.action_clusters import backfill_action_items
+        from src.core.meeting_index import backfill_index
+
+        def backfill():
+            # One worker indexes meetings stored before action-item clustering and the
+            # related-meetings index existed
+            if not get_state_store().add("index_backfill", os.getpid(), ttl=600):
+                return
+            for name, job in (("Action item", backfill_action_items), ("Meeting index", backfill_index)):
+                try:
+                    job(get_connection())
+                except Exception as e:
+                    logger.error(f"{name} backfill failed: {e}")
+
+        app.state.index_backfill = asyncio.create_task(asyncio.to_thread(backfill))
 
-# Global flag for recording control
-recording_active = False
+    @app.on_event("shutdown")
+    def stop_process_pool():
+        from src.utils.process_pool import shutdown_pool
 
-# Store latest meeting id for chat context
-latest_meeting_id = None
+        shutdown_pool()
 
-# Store recent transcription results for Q&A context
-recent_results = {}
+    return app
 
 
-@app.post("/process_meeting")
-async def process_meeting(input: str = Form(...), file: UploadFile = File(None)):
+@router.post("/process_meeting")
+async def process_meeting(
+    input: str = Form(...),
+    file: UploadFile = File(None),
+    x_trace_id: Optional[str] = Header(None)
+):
+    from src.graphs.meeting_workflow import run_workflow
+    from src.utils.single_flight import file_digest
+    from src.utils.storage import notes_path, pinned, save_upload
+
+    trace_id = x_trace_id or uuid.uuid4().hex
+    run_id = uuid.uuid4().hex
     try:
         # Parse input JSON
         input_data = json.loads(input)
-        logger.debug(f"Input data: {input_data}")
         meeting_input = MeetingInput.from_dict(input_data)
         
         # Validate channel if notify_slack is true
@@ -100,62 +196,52 @@ async def process_meeting(input: str = Form(...), file: UploadFile = File(None))
 
         # Prioritize uploaded file; ignore file_path in input
         if file:
-            if file.size > 25 * 1024 * 1024:
-                raise ValueError("File size exceeds 25MB limit")
-            file_path = f"uploads/{file.filename}"
-            os.makedirs("uploads", exist_ok=True)
-            with open(file_path, "wb") as f:
-                f.write(await file.read())
+            # Streamed to disk in chunks and stored under its content hash
+            stored = await save_upload(file)
+            file_path, digest = stored["path"], stored["digest"]
         elif meeting_input.file_path and os.path.exists(meeting_input.file_path):
             file_path = meeting_input.file_path
+            digest = await run_in_threadpool(file_digest, file_path)
         else:
             raise ValueError("A file must be uploaded or a valid file_path provided")
 
-        result = run_workflow(
-            file_path = file_path,
-            output_path = f"notes_{os.path.basename(file_path)}.md",
-            language = meeting_input.language,
-            notify_slack = meeting_input.notify_slack,
-            channel = meeting_input.channel,
-            industry = meeting_input.industry,
-            custom_prompt_description = meeting_input.custom_prompt_description
-        )
+        # Run off the event loop; identical concurrent submissions share one run
+        with pinned(file_path):
+            result = await run_in_threadpool(
+                run_workflow,
+                file_path = file_path,
+                output_path = notes_path(
+                    digest, meeting_input.language, meeting_input.industry,
+                    meeting_input.custom_prompt_description, meeting_input.pipeline_mode
+                ),
+                language = meeting_input.language,
+                notify_slack = meeting_input.notify_slack,
+                channel = meeting_input.channel,
+                industry = meeting_input.industry,
+                custom_prompt_description = meeting_input.custom_prompt_description,
+                pipeline_mode = meeting_input.pipeline_mode,
+                trace_id = trace_id,
+                run_id = run_id,
+                # What /runs/{run_id}/retry needs to store the meeting once the run succeeds
+                run_meta = {
+                    "source": "process_meeting",
+                    "file_path": file_path,
+                    "language": meeting_input.language,
+                    "industry": meeting_input.industry,
+                    "user_id": meeting_input.user_id,
+                    "meeting_title": meeting_input.meeting_title,
+                    "custom_prompt_description": meeting_input.custom_prompt_description
+                }
+            )
 
-        logger.debug(f"Process meeting result: {result}")
-
-        # Store in DB
-        meeting_id = str(uuid.uuid4())
-        timestamp_now = datetime.now().isoformat()
-        conn.execute(
-            "INSERT INTO meetings (meeting_id, timestamp, file_path, language, transcript, \
-                summary, actions, diarized_transcript, industry, user_id, meeting_title) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    meeting_id,
-                    timestamp_now, 
-                    file_path,
-                    meeting_input.language,
-                    result.get("transcript", {}).get("diarized", ""),
-                    result.get("summary", {}).get("summary", ""),
-                    result.get("actions", ""),
-                    result.get("transcript", {}).get("diarized", ""),
-                    meeting_input.industry,
-                    meeting_input.user_id,
-                    meeting_input.meeting_title
+        logger.info(f"[trace {trace_id}] Processed meeting {os.path.basename(file_path)}")
+        run_id = result.get("run_id") or run_id  # the run this request joined, if it was coalesced
 
-                )
+        meeting_id = await _record_meeting(
+            result, file_path, meeting_input.language, meeting_input.industry,
+            meeting_input.user_id, meeting_input.meeting_title, meeting_input.custom_prompt_description
         )
-
-        # Emit new meeting to all connected clients
-        await sio.emit("new_meeting", {
-            "meeting_id": meeting_id,
-            "meeting_title": meeting_input.meeting_title,
-            "timestamp": timestamp_now
-        })
-        
-        conn.commit()
-        global latest_meeting_id
-        latest_meeting_id = meeting_id  # Update latest meeting id for chat context
-        return {"meeting_id": meeting_id, "result": result}
+        return {"meeting_id": meeting_id, "trace_id": trace_id, "run_id": run_id, "result": result}
     except json.JSONDecodeError:
         raise HTTPException(status_code=422, detail="Invalid input JSON")
     except ValueError as e:
@@ -163,50 +249,260 @@ async def process_meeting(input: str = Form(...), file: UploadFile = File(None))
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"API error: {e}")
+        run_id = getattr(e, "run_id", run_id)
+        raise HTTPException(status_code=500, detail=f"{e} (run {run_id}; POST /runs/{run_id}/retry to resume)")
+
+
+async def _record_meeting(result: dict, file_path: str, language: str, industry: str,
+                          user_id: str, meeting_title: str, custom_prompt_description: Optional[str] = None) -> str:
+    """Store a processed meeting, announce it to socket.io clients and make it the chat context."""
+    from src.core.analytics import index_meeting_outputs, insert_meeting
+
+    conn = get_connection()
+    meeting_id, timestamp_now = insert_meeting(
+        conn, result, file_path, language, industry, user_id, meeting_title, custom_prompt_description
+    )
+
+    # Emit new meeting to all connected clients
+    await sio.emit("new_meeting", {
+        "meeting_id": meeting_id,
+        "meeting_title": meeting_title,
+        "timestamp": timestamp_now
+    })
+
+    get_state_store().set("latest_meeting_id", meeting_id)  # Update latest meeting id for chat context
+    await run_in_threadpool(
+        index_meeting_outputs, conn, meeting_id, meeting_title, result.get("summary", {}).get("summary", ""),
+        result.get("actions", ""), action_items=result.get("action_items")
+    )
+    return meeting_id
+
+
+@router.get("/runs/{run_id}")
+async def get_run_status(run_id: str):
+    """Status of a workflow run, the nodes it has completed and, if it failed, why."""
+    from src.utils.checkpoints import get_run
+
+    run = await run_in_threadpool(get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    run.pop("inputs")
+    return run
+
+
+@router.post("/runs/{run_id}/retry")
+async def retry_run(run_id: str):
+    """
+    Resume a failed (or interrupted) run. Nodes that completed before the failure are
+    restored from their checkpoints, so transcription and summaries are not paid for twice.
+    """
+    from src.graphs.meeting_workflow import resume_workflow
+    from src.utils.checkpoints import claim_run, get_run
+    from src.utils.storage import pinned
+
+    run = await run_in_threadpool(get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    if run["status"] == "completed":
+        raise HTTPException(status_code=409, detail="Run already completed")
+    if not await run_in_threadpool(claim_run, run_id):
+        raise HTTPException(status_code=409, detail="Run is still in progress")
+
+    meta = run["meta"]
+    file_path = run["inputs"].get("file_path") or ""
+    try:
+        with pinned(file_path) if file_path else nullcontext():
+            result = await run_in_threadpool(resume_workflow, run_id)
+    except Exception as e:
+        logger.error(f"Retry of run {run_id} failed: {e}")
+        raise HTTPException(status_code=500, detail=f"{e} (run {run_id}; POST /runs/{run_id}/retry to resume)")
+
+    response = {"run_id": run_id, "trace_id": result.get("trace_id"), "result": result}
+    if meta.get("source") == "process_meeting":
+        response["meeting_id"] = await _record_meeting(
+            result, meta["file_path"], meta["language"], meta["industry"], meta["user_id"], meta["meeting_title"],
+            meta.get("custom_prompt_description")
+        )
+    return response
+
+
+@router.post("/meetings/{meeting_id}/reprocess")
+async def reprocess_meeting(meeting_id: str, params: ReprocessInput):
+    """
+    Re-run summary and action extraction on a stored meeting's transcript with a new
+    industry or custom prompt. Whisper is not called again; the meeting row is updated in
+    place and its previous outputs are kept in meeting_versions.
+    """
+    import sqlite3
+    from src.core.analytics import get_meeting, index_meeting_outputs, save_meeting_version
+    from src.graphs.meeting_workflow import run_workflow
+
+    conn = get_connection()
+    meeting = await run_in_threadpool(get_meeting, conn, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if not meeting["transcript"]:
+        raise HTTPException(status_code=422, detail="Meeting has no stored transcript to re-process")
+
+    industry = params.industry or meeting["industry"] or "General"
+    if params.custom_prompt_description is None:
+        custom_prompt_description = meeting["custom_prompt_description"]
+    else:
+        custom_prompt_description = params.custom_prompt_description or None
+    try:
+        # No file: the graph starts from the stored transcript (compact -> summarize -> actions)
+        result = await run_in_threadpool(
+            run_workflow,
+            file_path="",
+            output_path="",
+            language=meeting["language"] or "en",
+            transcript=meeting["transcript"],
+            industry=industry,
+            custom_prompt_description=custom_prompt_description,
+            pipeline_mode=params.pipeline_mode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Re-processing meeting {meeting_id} failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    summary = result.get("summary", {}).get("summary", "")
+    actions = result.get("actions", "")
+    try:
+        version = await run_in_threadpool(
+            save_meeting_version, conn, meeting, summary, actions, industry, custom_prompt_description
+        )
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="Meeting was re-processed concurrently; retry")
+    await run_in_threadpool(
+        index_meeting_outputs, conn, meeting_id, meeting["meeting_title"], summary, actions, replace=True,
+        action_items=result.get("action_items")
+    )
+
+    # Derived state: Q&A context for this upload and connected clients
+    store = get_state_store()
+    if meeting["file_path"] and store.cache_get("recent_results", meeting["file_path"]) is not None:
+        store.cache_put("recent_results", meeting["file_path"], {
+            "transcript": result.get("transcript"),
+            "summary": result.get("summary"),
+            "actions": actions
+        }, Config.RECENT_RESULTS_MAX)
+    await sio.emit("meeting_updated", {"meeting_id": meeting_id, "version": version})
+
+    logger.info(f"[trace {result.get('trace_id')}] Re-processed meeting {meeting_id} as version {version}")
+    return {"meeting_id": meeting_id, "version": version, "trace_id": result.get("trace_id"), "result": result}
+
+
+@router.get("/meetings/{meeting_id}/related")
+async def get_related_meetings(meeting_id: str, k: int = Query(5, ge=1, le=50)):
+    """Past meetings whose title and summary are most similar to this one's (local embeddings, no LLM call)."""
+    from src.core.meeting_index import related_meetings
+
+    conn = get_connection()
+    related = await run_in_threadpool(related_meetings, conn, meeting_id, k)
+    if related is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    details = {}
+    if related:
+        marks = ",".join("?" * len(related))
+        details = {row[0]: row[1:] for row in conn.execute(
+            f"SELECT meeting_id, meeting_title, timestamp FROM meetings WHERE meeting_id IN ({marks})",
+            [related_id for related_id, _ in related]
+        )}
+    return {
+        "meeting_id": meeting_id,
+        "related": [
+            {"meeting_id": related_id, "meeting_title": details[related_id][0], "timestamp": details[related_id][1],
+             "score": score}
+            for related_id, score in related if related_id in details
+        ]
+    }
+
+
+@router.get("/export/{table}")
+async def export_table(table: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                       since: Optional[str] = None, gzip: bool = False, include_transcripts: bool = False):
+    """
+    Stream every row of `table` (meetings, action_items or feedback) changed after `since`
+    as NDJSON or CSV (gzipped if `gzip`). Send the returned `X-Export-Next-Since` value as the
+    next `since`. Action items of a changed meeting come as its complete current set; replace
+    that meeting's stored items with them, since deleted items are not exported.
+    """
+    from src.core.export import TABLES, export_stream, next_since
+
+    if table not in TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table; expected one of {', '.join(TABLES)}")
+    next_since_value = next_since(datetime.now())
+    filename = f"{table}.{format}" + (".gz" if gzip else "")
+    # A sync generator: Starlette pulls each batch in the threadpool, off the event loop
+    return StreamingResponse(
+        export_stream(table, format, since, gzip, include_transcripts),
+        media_type="application/gzip" if gzip else "text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Export-Next-Since": next_since_value}
+    )
+
+
+@router.get("/meetings/{meeting_id}/versions")
+async def meeting_versions(meeting_id: str):
+    """The current outputs of a meeting and every earlier version."""
+    from src.core.analytics import get_meeting, list_meeting_versions
+
+    conn = get_connection()
+    meeting = await run_in_threadpool(get_meeting, conn, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    current = {key: meeting[key] for key in (
+        "version", "industry", "custom_prompt_description", "summary", "actions", "updated_at"
+    )}
+    return {
+        "meeting_id": meeting_id,
+        "current": current,
+        "previous": await run_in_threadpool(list_meeting_versions, conn, meeting_id)
+    }
+
 # Batch processing endpoint
-@app.post("/process_batch")
+@router.post("/process_batch")
 async def process_batch(files: list[UploadFile] = File(...)):
+    from src.core.analytics import index_meeting_outputs, insert_meeting
+    from src.graphs.meeting_workflow import run_workflow
+    from src.utils.storage import UploadTooLarge, notes_path, pinned, save_upload
+
+    conn = get_connection()
     results = []
     for file in files:
-        file_path = f"uploads/{file.filename}"
-        os.makedirs("uploads", exist_ok = True)
-
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        
-        result = run_workflow(file_path, f"notes_{file.filename}.md")
+        try:
+            stored = await save_upload(file)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=f"{file.filename}: {e}")
+        file_path = stored["path"]
+
+        with pinned(file_path):
+            result = await run_in_threadpool(run_workflow, file_path, notes_path(stored["digest"]))
         results.append(result)
-        recent_results[file_path] = result # store for Q&A
-
-        # Store in DB
-        meeting_id = str(uuid.uuid4())
-        conn.execute(
-            "INSERT INTO meetings (meeting_id, timestamp, file_path, language, transcript, summary, actions, diarized_transcript, industry, user_id, meeting_title) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                meeting_id,
-                datetime.now().isoformat(),
-                file_path,
-                "en",  # Default language; adjust if needed
-                result.get("transcript", {}).get("diarized", ""),
-                result.get("summary", {}).get("summary", ""),
-                result.get("actions", ""),
-                result.get("transcript", {}).get("diarized", ""),
-                "General",  # Default industry
-                "anonymous",  # Default user
-                f"Batch Meeting {file.filename}"  # Default title
-            )
+        # store for Q&A
+        get_state_store().cache_put("recent_results", file_path, {
+            "transcript": result.get("transcript"),
+            "summary": result.get("summary"),
+            "actions": result.get("actions")
+        }, Config.RECENT_RESULTS_MAX)
+
+        # Store in DB (default language, industry and user)
+        meeting_id, _ = await run_in_threadpool(
+            insert_meeting, conn, result, file_path, "en", "General", "anonymous", f"Batch Meeting {file.filename}"
+        )
+        get_state_store().set("latest_meeting_id", meeting_id)
+        await run_in_threadpool(
+            index_meeting_outputs, conn, meeting_id, f"Batch Meeting {file.filename}",
+            result.get("summary", {}).get("summary", ""), result.get("actions", ""),
+            action_items=result.get("action_items")
         )
-        conn.commit()
-        global latest_meeting_id
-        latest_meeting_id = meeting_id
 
 
     return {"results": results}
 
 # Real time endpoint (stream audio)
-@app.post("/real_time_transcribe")
+@router.post("/real_time_transcribe")
 async def real_time_transcribe(
     background_tasks: BackgroundTasks, 
     language: str = "en",
@@ -215,20 +511,25 @@ async def real_time_transcribe(
     meeting_title: str = "real-Time meeting",
     custom_prompt_description: Optional[str] = None
 ):
-    global recording_active
-    if recording_active:
+    store = get_state_store()
+    meeting_id = str(uuid.uuid4())
+    # Atomic across workers; the TTL frees the flag if a worker dies mid-recording
+    if not store.add("recording", {"started_at": time.time(), "meeting_id": meeting_id}, ttl=RECORD_SECONDS + 120):
         raise HTTPException(status_code=400, detail="Recording already in progress")
+    store.set("latest_recording_id", meeting_id, ttl=RECORDING_RESULT_TTL)
+    loop = asyncio.get_running_loop()
 
 
     def record_and_process():
-        global recording_active
-        recording_active = True
+        import pyaudio
+        from src.core.analytics import index_meeting_outputs, insert_meeting
+        from src.graphs.meeting_workflow import run_workflow
+
         try: 
             CHUNK = 1024
             FORMAT = pyaudio.paInt16
             CHANNELS = 1
             RATE = 16000
-            RECORD_SECONDS = 30
 
             p = pyaudio.PyAudio()
 
@@ -241,7 +542,12 @@ async def real_time_transcribe(
             )
             frames = []
 
-            for _ in range(0, int(RATE / CHUNK * RECORD_SECONDS)):
+            chunks_per_second = max(int(RATE / CHUNK), 1)
+            for i in range(0, int(RATE / CHUNK * RECORD_SECONDS)):
+                # /stop_recording (on any worker) clears the flag
+                if i % chunks_per_second == 0 and store.get("recording") is None:
+                    logger.info("Recording stopped early")
+                    break
                 data = stream.read(CHUNK)
                 frames.append(data)
 
@@ -253,7 +559,7 @@ async def real_time_transcribe(
                 # Use consistent path relative to project root
                 upload_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
                 os.makedirs(upload_dir, exist_ok=True)
-                file_path = os.path.join(upload_dir, "real_time.wav")
+                file_path = os.path.join(upload_dir, f"real_time_{meeting_id}.wav")
                 logger.info(f"Saving audio to {file_path}")
                 try:
                     wf = wave.open(file_path, 'wb')
@@ -270,101 +576,113 @@ async def real_time_transcribe(
                 else:
                     logger.error(f"Failed to create audio file: {file_path}")
                     raise ValueError("Failed to save audio file")
-                output_path = os.path.join(upload_dir, "real_time_notes.md")
+                output_path = os.path.join(upload_dir, f"real_time_{meeting_id}_notes.md")
                 result = run_workflow(
                     file_path, 
                     output_path, 
                     language=language,
                     custom_prompt_description =  custom_prompt_description
                 )
-                logger.debug(f"Real-time transcription result: {result}")
-                # Store in DB
-                meeting_id = str(uuid.uuid4())
-                timestamp_now = datetime.now().isoformat()
-                conn.execute(
-                    "INSERT INTO meetings (meeting_id, timestamp, file_path, language, transcript, summary, actions, diarized_transcript, industry, user_id, meeting_title) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        meeting_id,
-                        timestamp_now,
-                        "real_time.wav",
-                        language,
-                        result.get("transcript", {}).get("diarized", ""),
-                        result.get("summary", {}).get("summary", ""),
-                        result.get("actions", ""),
-                        result.get("transcript", {}).get("diarized", ""),
-                        industry,
-                        user_id,
-                        meeting_title
-                    )
+                logger.info(f"[trace {result.get('trace_id')}] Real-time transcription processed")
+                # Store in DB, under the id the client is already polling for
+                conn = get_connection()
+                insert_meeting(
+                    conn, result, os.path.basename(file_path), language, industry, user_id, meeting_title,
+                    custom_prompt_description, meeting_id=meeting_id
                 )
-
-                
-                conn.commit()
-                global latest_meeting_id
-                latest_meeting_id = meeting_id
+                store.set("latest_meeting_id", meeting_id)
+                index_meeting_outputs(
+                    conn, meeting_id, meeting_title, result.get("summary", {}).get("summary", ""),
+                    result.get("actions", ""), action_items=result.get("action_items")
+                )
+                _publish_recording_result(loop, meeting_id, {
+                    "meeting_id": meeting_id,
+                    "status": "completed",
+                    "trace_id": result.get("trace_id"),
+                    "transcript": result.get("transcript", {}),
+                    "summary": result.get("summary", {}),
+                    "actions": result.get("actions", ""),
+                })
+            else:
+                _publish_recording_result(loop, meeting_id, {
+                    "meeting_id": meeting_id, "status": "empty", "error": "No audio was recorded"
+                })
 
         except Exception as e:
             logger.error(f"Recording error: {e}")
+            _publish_recording_result(loop, meeting_id, {"meeting_id": meeting_id, "status": "failed", "error": str(e)})
             raise
 
         finally:
-            recording_active = False
+            store.delete("recording")
 
     background_tasks.add_task(record_and_process)
-    return {"status": "Recording started", "meeting_id": latest_meeting_id}
+    return {"status": "Recording started", "meeting_id": meeting_id}
 
-@app.post("/stop_recording")
+@router.post("/stop_recording")
 async def stop_recording():
-    global recording_active
-    if not recording_active:
+    store = get_state_store()
+    if store.get("recording") is None:
         raise HTTPException(status_code=400, detail="No active recording")
-    recording_active = False
+    store.delete("recording")
     return {"status": "Recording stopped"}
 
-@app.get("/get_transcription_results")
-async def get_transcription_results():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, "uploads", "real_time.wav")
-    output_file = os.path.join(base_dir, "uploads", "real_time_notes.md")
-    logger.info(f"Checking for audio file: {file_path}")
-    if not os.path.exists(file_path):
-        logger.error(f"Audio file not found: {file_path}")
+@router.get("/get_transcription_results")
+async def get_transcription_results(
+    meeting_id: Optional[str] = Query(None),
+    timeout: float = Query(30.0, ge=0, le=120)
+):
+    """
+    Result of a real-time recording (default: the latest one). Returns as soon as it is
+    stored, waiting up to `timeout` seconds while it is still being processed; clients can
+    instead listen for the socket.io "transcription_result" event.
+    """
+    meeting_id = meeting_id or get_state_store().get("latest_recording_id")
+    if not meeting_id:
         raise HTTPException(status_code=404, detail="No recorded audio found")
-    logger.info(f"Waiting for transcription output: {output_file}")
-    for _ in range(15):  # 10-second timeout
-        if os.path.exists(output_file):
-            try:
-                result = run_workflow(file_path, output_file, language="en")
-                logger.debug(f"Transcription results: {result}")
-                return result
-            except Exception as e:
-                logger.error(f"Error retrieving transcription results: {e}")
-                raise HTTPException(status_code=500, detail=f"Failed to retrieve transcription results: {str(e)}")
-        time.sleep(1)
-    logger.error(f"Transcription output not found: {output_file}")
-    raise HTTPException(status_code=404, detail="Transcription results not yet available")
-
-@app.post("/feedback")
+
+    result = await _wait_for_recording_result(meeting_id, timeout)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Transcription results not yet available")
+    if result["status"] == "empty":
+        raise HTTPException(status_code=404, detail="No recorded audio found")
+    if result["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve transcription results: {result['error']}")
+    logger.info(f"[trace {result.get('trace_id')}] Transcription results ready for meeting {meeting_id}")
+    return result
+
+@router.post("/feedback")
 async def submit_feedback(feedback: FeedbackInput):
+    from src.core.analytics import transaction
+
+    def insert():
+        conn = get_connection()
+        with transaction(conn):
+            conn.execute(
+                "INSERT INTO feedback (meeting_id, rating, comments, created_at) VALUES (?, ?, ?, ?)",
+                (feedback.meeting_id, feedback.rating, feedback.comments, datetime.now().isoformat())
+            )
+
     try:
-        conn.execute(
-            "INSERT INTO feedback (meeting_id, rating, comments) VALUES (?, ?, ?)",
-            (feedback.meeting_id, feedback.rating, feedback.comments)
-        )
-        conn.commit()
+        # In the threadpool: the write lock may be held by a background indexing job
+        await run_in_threadpool(insert)
         return {"status": "Feedback saved"}
     except Exception as e:
         logger.error(f"Feedback error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/get_meetings")
-async def get_meetings():
-    try:
-        cursor = conn.cursor()
+@router.get("/get_meetings")
+async def get_meetings(request: Request):
+    from src.interfaces.http_cache import cached_json
+
+    def build():
+        cursor = get_connection().cursor()
         cursor.execute("SELECT meeting_id, meeting_title, timestamp FROM meetings ORDER BY timestamp DESC")
-        meetings = [{"meeting_id": row[0], "meeting_title": row[1], "timestamp": row[2]} for row in cursor.fetchall()]
-        return {"meetings": meetings}
+        return {"meetings": [{"meeting_id": row[0], "meeting_title": row[1], "timestamp": row[2]} for row in cursor]}
+
+    try:
+        return await cached_json(request, "meetings", ("meetings",), build)
     except Exception as e:
         logger.error(f"Error fetching meetings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -381,12 +699,11 @@ async def handle_disconnect(sid):
 
 @sio.on("message")
 async def handle_message(sid, data):
-    global latest_meeting_id
     from src.graphs.meeting_workflow import run_workflow
     logger.info(f"Message received from {sid}: {data}")
 
     try:
-        meeting_id = data.get("meeting_id", latest_meeting_id)
+        meeting_id = data.get("meeting_id") or get_state_store().get("latest_meeting_id")
         if not meeting_id:
             await sio.emit("message",
                            {
@@ -396,7 +713,7 @@ async def handle_message(sid, data):
             return 
 
         # Fetch latest meeting context from DB
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
         cursor.execute(
             "SELECT transcript, summary FROM meetings WHERE meeting_id = ?",
             (meeting_id,)
@@ -414,7 +731,8 @@ async def handle_message(sid, data):
         transcript, summary = row
 
         # Run Langgraph workflow with chat message
-        result = run_workflow(
+        result = await run_in_threadpool(
+            run_workflow,
             file_path="", # Not need for Q&A
             output_path="",
             language="en",
@@ -442,60 +760,33 @@ async def handle_message(sid, data):
                        }, room=sid)
 
 
-app.get("/analytics")
-async def get_analytics(industry: Optional[str] = Query(None)):
-    """Return Aggregate insights across meetings"""
+@router.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    from src.utils.metrics import CONTENT_TYPE_LATEST, render_latest
 
-    cursor = conn.cursor()
-
-    if industry:
-        cursor.execute("SELECT actions, summary FROM meetings WHERE industry=?", (industry,))
-    else:
-        cursor.execute("SELECT actions, summary FROM meetings")
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
 
-    action_trends = {}
-    sentiment_counts = {
-        "Positive": 0,
-        "Neutral" : 0,
-        "Negative": 0
-    }
-    total_meetings = 0
 
-    for row in cursor.fetchall():
-        actions_json, summary_text = row
-        total_meetings += 1
+@router.get("/analytics")
+async def get_analytics(request: Request, industry: Optional[str] = Query(None)):
+    """Return Aggregate insights across meetings (cached until a meeting or action item changes)"""
+    from src.core.analytics import compute_analytics
+    from src.interfaces.http_cache import cached_json
 
-        # Aggregate action trends
-        if actions_json:
-            try:
-                actions_list = json.loads(actions_json)
-                for a in actions_list:
-                    desc = a.get("description", "Unknown")
-                    action_trends[desc] = action_trends.get(desc, 0) + 1
-            except Exception as e:
-                logger.error(f"Error parsing actions JSON: {e}")
-
-        # Aggregate sentiment from summary (if sentiment included)
-        if summary_text:
-            if "positive" in summary_text.lower():
-                sentiment_counts["Positive"] += 1
-            elif "neutral" in summary_text.lower():
-                sentiment_counts["Neutral"] += 1
-            else:
-                sentiment_counts["Negative"] += 1
-
-    return {
-        "total_meetings": total_meetings,
-        "action_trends": action_trends,
-        "sentiment_counts": sentiment_counts
-    }
+    return await cached_json(
+        request, "analytics", ("action_clusters", "action_items", "meetings"),
+        lambda: compute_analytics(get_connection(), industry)
+    )
 
 
-app.post("/ai_insight")
+@router.post("/ai_insight")
 async def ai_insight(query: str = Form(...), industry: Optional[str] = Query(None)):
     """Return conversational insights across multiple meetings"""
+    from langchain_core.messages import HumanMessage
+    from src.utils.llm import get_chat_model, invoke_messages
 
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     if industry:
         cursor.execute("SELECT summary FROM meetings WHERE industry=?", (industry,))
@@ -504,7 +795,7 @@ async def ai_insight(query: str = Form(...), industry: Optional[str] = Query(Non
 
     summaries = "\n".join([row[0] for row in cursor.fetchall() if row[0]])
 
-    prompt_template = f"""
+    prompt = f"""
 You are AI analyst. Given the following meeting summaries across multiple meetings:
 
 {summaries}
@@ -513,15 +804,8 @@ Answer the user query conciesly:
 {query}
     """
 
-    prompt = ChatPromptTemplate.from_template(prompt_template)
-
     try:
-        response = llm.invoke([
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ])
+        response = await run_in_threadpool(invoke_messages, get_chat_model(temperature=0.3), [HumanMessage(content=prompt)])
 
         return {"answer": response.content}
     
@@ -530,5 +814,9 @@ Answer the user query conciesly:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+app = create_app()
+
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000,)
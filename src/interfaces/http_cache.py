@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import json
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from src.core.analytics import get_connection, table_versions
+from src.utils.config import Config
+from src.utils.state_store import get_state_store
+
+
+CACHE_NAMESPACE = "responses"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison: proxies may strip the W/ prefix after decompressing
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _not_modified(request: Request, etag: str, changed_at: int, settled: bool) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)  # takes precedence over If-Modified-Since
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and settled:
+        try:
+            return changed_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        name, _, q = params.partition("=")
+        try:
+            refused = name.strip() == "q" and float(q) == 0
+        except ValueError:
+            refused = False
+        if not refused:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def compress(body: bytes, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+    """Brotli (if the `brotli` package is installed) or gzip for bodies of COMPRESS_MIN_BYTES or more."""
+    if len(body) < Config.COMPRESS_MIN_BYTES:
+        return body, None
+    accepted = _accepted_encodings(accept_encoding)
+    if "br" in accepted:
+        try:
+            import brotli
+        except ImportError:
+            pass
+        else:
+            return brotli.compress(body, quality=5), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=6, mtime=0), "gzip"
+    return body, None
+
+
+async def cached_json(request: Request, name: str, tables: Tuple[str, ...], build: Callable[[], Any]) -> Response:
+    """
+    Serve `build()` as JSON with an ETag and Last-Modified taken from the versions of the
+    `tables` it reads. A client sending back a current validator gets an empty 304; otherwise
+    the serialized body is shared by every worker through the state store until a write to
+    one of `tables` changes the version, so `build` runs once per change, not once per poll.
+    """
+    conn = get_connection()
+    version, changed_at = await run_in_threadpool(table_versions, conn, tables)
+    params = hashlib.sha1(urlencode(sorted(request.query_params.multi_items())).encode()).hexdigest()[:12]
+    etag = f'W/"{name}-{params}-{version}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # always revalidate; revalidating is the cheap part
+        "Vary": "Accept-Encoding",
+    }
+    # `changed_at` has whole-second resolution: while its second is still running, a later
+    # write can share it, so the date is neither sent nor trusted until then (the ETag is)
+    settled = changed_at < int(time.time())
+    if settled:
+        headers["Last-Modified"] = formatdate(changed_at, usegmt=True)
+    if _not_modified(request, etag, changed_at, settled):
+        return Response(status_code=304, headers=headers)
+
+    def load() -> str:
+        store = get_state_store()
+        body = store.cache_get(CACHE_NAMESPACE, etag)
+        if body is None:
+            # The version was read before `build`, so a write racing with it can only make the
+            # cached body newer than its version, and the next version misses the cache anyway
+            body = json.dumps(build(), ensure_ascii=False, separators=(",", ":"), default=str)
+            store.cache_put(CACHE_NAMESPACE, etag, body, Config.RESPONSE_CACHE_MAX)
+        return body
+
+    body, encoding = compress((await run_in_threadpool(load)).encode("utf-8"), request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
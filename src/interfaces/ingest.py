@@ -0,0 +1,155 @@
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import logger
+
+
+AUDIO_EXTENSIONS = frozenset({
+    ".wav", ".mp3", ".m4a", ".mp4", ".mpeg", ".mpga", ".webm", ".ogg", ".oga", ".flac", ".aac", ".mov", ".mkv",
+})
+
+
+def discover(source: str) -> List[str]:
+    """Recordings under a directory (recursively), matching a glob (`**` allowed), or one file."""
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+        ]
+    elif glob.has_magic(source):
+        paths = [path for path in glob.glob(source, recursive=True) if os.path.isfile(path)]
+    else:
+        paths = [source] if os.path.isfile(source) else []
+    return sorted(os.path.abspath(path) for path in paths)
+
+
+def file_key(path: str) -> str:
+    """Identity of a recording for the manifest: a changed (re-exported) file is processed again."""
+    stat = os.stat(path)
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class Manifest:
+    """
+    Append-only JSON-lines record of processed files. A file whose latest entry is "done"
+    (for the same size and mtime) is skipped on the next run; failed files are retried.
+    Lines are flushed as they are written, so an interrupted run loses nothing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.entries[entry["key"]] = entry
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def done(self, key: str) -> bool:
+        return self.entries.get(key, {}).get("status") == "done"
+
+    def record(self, entry: Dict):
+        with self._lock:
+            self.entries[entry["key"]] = entry
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def ingest(paths: List[str], manifest: Manifest, concurrency: int = 4, language: str = "en",
+           industry: str = "General", user_id: str = "ingest", custom_prompt_description: Optional[str] = None,
+           pipeline_mode: Optional[str] = None, store: bool = True,
+           echo: Callable[[str], None] = print) -> Dict:
+    """
+    Process `paths` with up to `concurrency` workflows at a time in this one process (CPU
+    stages go to the shared process pool), store each meeting in the analytics DB and
+    record it in `manifest`. Returns counts of done, failed and skipped files.
+    """
+    from src.core.analytics import get_connection, index_meeting_outputs, insert_meeting
+    from src.graphs.meeting_workflow import run_workflow
+    from src.utils.storage import notes_path
+
+    pending = []
+    for path in paths:
+        key = file_key(path)
+        if not manifest.done(key):
+            pending.append((path, key))
+    skipped = len(paths) - len(pending)
+    echo(f"{len(paths)} recording(s): {skipped} already done, {len(pending)} to process with concurrency {concurrency}")
+    if not pending:
+        return {"done": 0, "failed": 0, "skipped": skipped}
+
+    conn = get_connection() if store else None
+    db_lock = threading.Lock()  # one shared connection; keep each meeting's writes together
+
+    def process(path: str, key: str) -> Dict:
+        start = time.perf_counter()
+        entry = {"key": key, "path": path}
+        try:
+            result = run_workflow(
+                path, notes_path(key, language, industry, custom_prompt_description, pipeline_mode),
+                language=language, industry=industry, custom_prompt_description=custom_prompt_description,
+                pipeline_mode=pipeline_mode
+            )
+            if conn is not None:
+                title = os.path.splitext(os.path.basename(path))[0]
+                with db_lock:
+                    meeting_id, _ = insert_meeting(
+                        conn, result, path, language, industry, user_id, title, custom_prompt_description
+                    )
+                    index_meeting_outputs(
+                        conn, meeting_id, title, result.get("summary", {}).get("summary", ""), result.get("actions", ""),
+                        action_items=result.get("action_items")
+                    )
+                entry["meeting_id"] = meeting_id
+            entry.update(status="done", trace_id=result.get("trace_id"))
+        except Exception as e:
+            logger.error(f"Ingesting {path} failed: {e}")
+            entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+        entry.update(seconds=round(time.perf_counter() - start, 2), finished_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        manifest.record(entry)
+        return entry
+
+    counts = {"done": 0, "failed": 0, "skipped": skipped}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as pool:
+        futures = [pool.submit(process, path, key) for path, key in pending]
+        try:
+            for finished, future in enumerate(as_completed(futures), start=1):
+                entry = future.result()
+                counts[entry["status"]] += 1
+                elapsed = time.perf_counter() - started
+                rate = finished / elapsed
+                eta = (len(pending) - finished) / rate if rate else 0.0
+                echo(
+                    f"[{finished}/{len(pending)}] {entry['status']:<6} {os.path.basename(entry['path'])} "
+                    f"({entry['seconds']:.1f}s) | {rate * 60:.1f} files/min, ETA {_format_duration(eta)}"
+                )
+        except KeyboardInterrupt:
+            # Files already finished are in the manifest; the rest run again next time
+            for future in futures:
+                future.cancel()
+            raise
+    echo(f"Finished in {_format_duration(time.perf_counter() - started)}: "
+         f"{counts['done']} done, {counts['failed']} failed, {counts['skipped']} skipped")
+    return counts
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 class FeedbackInput(BaseModel):
@@ -15,6 +15,7 @@ class MeetingInput(BaseModel):
     user_id: Optional[str] = None
     meeting_title: Optional[str] = None  
     custom_prompt_description: Optional[str] = None
+    pipeline_mode: Optional[Literal["multi", "structured"]] = None
 
     class Config:
         extra = "forbid"
@@ -30,18 +31,38 @@ class MeetingInput(BaseModel):
             "industry": data.get("industry", "General"),
             "user_id": data.get("user_id", "anonymous"),
             "meeting_title": data.get("meeting_title", "Untitled Meeting"),
-            "custom_prompt_description": data.get("custom_prompt_description", None)
+            "custom_prompt_description": data.get("custom_prompt_description", None),
+            "pipeline_mode": data.get("pipeline_mode", None)
         }
         return cls(**input_data)
     
 
+class ReprocessInput(BaseModel):
+    """New parameters for re-running summary and actions on a stored transcript."""
+    industry: Optional[str] = None  # None keeps the meeting's current industry
+    custom_prompt_description: Optional[str] = None  # None keeps the current prompt, "" clears it
+    pipeline_mode: Optional[Literal["multi", "structured"]] = None
+
+    class Config:
+        extra = "forbid"
+
+
 class ActionItem(BaseModel):
     description: str
     assignee: str
     deadline: str
     priority: str
-    meeting_id: str
+    meeting_id: Optional[str] = None  # Not known until the meeting is stored
     industry: Optional[str] = None
+    delay_risk: Optional[str] = None
+
+
+class MeetingExtraction(BaseModel):
+    """Output of the one-call structured extraction (summary, sentiment, actions with delay risk)"""
+    summary: str
+    sentiment: Literal["Positive", "Neutral", "Negative"]
+    action_items: List[ActionItem]
+
 
 class MeetingRecord(BaseModel):
     meeting_id: str
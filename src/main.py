@@ -1,19 +1,60 @@
+import os
+import sys
+
 import click
-from graphs.meeting_workflow import run_workflow
-from utils.logger import logger
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.utils.logger import logger
+
 
 @click.command()
-@click.option("--input", required=True, help="Path to audio/video file")
-@click.option("--output", default="notes.md", help="Path to save output (default: notes.md)")
-def main(input: str, output: str):
+@click.option("--input", required=True, help="Audio/video file, or a directory or glob of recordings to ingest")
+@click.option("--output", default="notes.md", help="Path to save output for a single file (default: notes.md)")
+@click.option("--concurrency", default=4, show_default=True, help="Recordings processed at once when ingesting")
+@click.option("--manifest", default=os.path.join("instance", "ingest_manifest.jsonl"), show_default=True,
+              help="Ingest progress file; files recorded as done are skipped on the next run")
+@click.option("--language", default="en", show_default=True)
+@click.option("--industry", default="General", show_default=True)
+@click.option("--user-id", default="ingest", show_default=True, help="user_id stored with ingested meetings")
+@click.option("--custom-prompt", default=None, help="Custom action-item prompt description")
+@click.option("--pipeline-mode", type=click.Choice(["multi", "structured"]), default=None)
+@click.option("--store/--no-store", default=True, show_default=True, help="Store ingested meetings in the analytics DB")
+def main(input: str, output: str, concurrency: int, manifest: str, language: str, industry: str, user_id: str,
+         custom_prompt: str, pipeline_mode: str, store: bool):
+    # Imported here so `--help` and argument errors don't pay for LangGraph/LangChain
+    from src.interfaces.ingest import Manifest, discover, ingest
 
-    try:
-        run_workflow(input, output)
-        logger.info("Project run successful!")
+    if os.path.isfile(input):
+        from src.graphs.meeting_workflow import run_workflow
+
+        try:
+            run_workflow(input, output, language=language, industry=industry,
+                         custom_prompt_description=custom_prompt, pipeline_mode=pipeline_mode)
+            logger.info("Project run successful!")
 
-    except Exception as e:
-        logger.error(f"Main error: {e}")
+        except Exception as e:
+            logger.error(f"Main error: {e}")
+        return
+
+    paths = discover(input)
+    if not paths:
+        raise click.BadParameter(f"no recordings found for {input!r}", param_hint="--input")
+
+    from src.utils.process_pool import shutdown_pool, warm_up
+
+    warm_up()  # one pool for the whole run instead of one per file
+    progress = Manifest(manifest)
+    try:
+        counts = ingest(
+            paths, progress, concurrency=max(concurrency, 1), language=language, industry=industry, user_id=user_id,
+            custom_prompt_description=custom_prompt, pipeline_mode=pipeline_mode, store=store, echo=click.echo
+        )
+    finally:
+        progress.close()
+        shutdown_pool()
+    if counts["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,158 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+# Returned by load_checkpoint when a node has not completed in a run
+MISSING = object()
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def _conn() -> sqlite3.Connection:
+    """Per-thread autocommit connection to CHECKPOINT_DB_PATH (WAL, so API workers share it)."""
+    path = Config.CHECKPOINT_DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _schema_lock:
+            if path not in _schema_ready:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS workflow_runs (
+                        run_id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,          -- running | completed | failed
+                        inputs TEXT NOT NULL,          -- run_workflow keyword arguments (JSON)
+                        meta TEXT,                     -- caller context needed to finish a retried run (JSON)
+                        last_node TEXT,
+                        error TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 1,
+                        created_at REAL,
+                        updated_at REAL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS workflow_checkpoints (
+                        run_id TEXT,
+                        node TEXT,
+                        seq INTEGER,
+                        state BLOB,                    -- pickled state update written by the node
+                        created_at REAL,
+                        PRIMARY KEY (run_id, node)
+                    )
+                """)
+                _schema_ready.add(path)
+        conns[path] = conn
+    return conn
+
+
+def begin_run(run_id: str, inputs: Dict, meta: Optional[Dict] = None):
+    """Record a run as running; a run that already exists (a resume) keeps its checkpoints."""
+    now = time.time()
+    _conn().execute(
+        "INSERT INTO workflow_runs (run_id, status, inputs, meta, created_at, updated_at) VALUES (?, 'running', ?, ?, ?, ?) "
+        "ON CONFLICT(run_id) DO UPDATE SET status='running', error=NULL, attempts=attempts+1, updated_at=excluded.updated_at",
+        (run_id, json.dumps(inputs, default=str), json.dumps(meta or {}, default=str), now, now)
+    )
+
+
+def complete_run(run_id: str):
+    """Mark a run completed and drop its checkpoints; nothing is left to resume."""
+    conn = _conn()
+    conn.execute("UPDATE workflow_runs SET status='completed', error=NULL, updated_at=? WHERE run_id=?", (time.time(), run_id))
+    conn.execute("DELETE FROM workflow_checkpoints WHERE run_id=?", (run_id,))
+
+
+def fail_run(run_id: str, error: BaseException):
+    _conn().execute(
+        "UPDATE workflow_runs SET status='failed', error=?, updated_at=? WHERE run_id=?",
+        (f"{type(error).__name__}: {error}", time.time(), run_id)
+    )
+
+
+def claim_run(run_id: str) -> bool:
+    """
+    Take a failed run, or one interrupted mid-flight (still "running" but not updated for
+    CHECKPOINT_STALE_SECONDS), for a retry. Atomic across workers; True if this caller got it.
+    """
+    now = time.time()
+    cursor = _conn().execute(
+        "UPDATE workflow_runs SET status='running', updated_at=? WHERE run_id=? "
+        "AND (status='failed' OR (status='running' AND updated_at < ?))",
+        (now, run_id, now - Config.CHECKPOINT_STALE_SECONDS)
+    )
+    return cursor.rowcount == 1
+
+
+def save_checkpoint(run_id: str, node: str, update: Dict):
+    conn = _conn()
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO workflow_checkpoints (run_id, node, seq, state, created_at) VALUES "
+        "(?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM workflow_checkpoints WHERE run_id=?), ?, ?)",
+        (run_id, node, run_id, pickle.dumps(update, protocol=pickle.HIGHEST_PROTOCOL), now)
+    )
+    conn.execute("UPDATE workflow_runs SET last_node=?, updated_at=? WHERE run_id=?", (node, now, run_id))
+
+
+def load_checkpoint(run_id: str, node: str) -> Any:
+    """The state update `node` wrote in `run_id`, or MISSING if it has not completed."""
+    row = _conn().execute(
+        "SELECT state FROM workflow_checkpoints WHERE run_id=? AND node=?", (run_id, node)
+    ).fetchone()
+    if row is None:
+        return MISSING
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Unreadable checkpoint for run {run_id} node {node}, running it again: {e}")
+        return MISSING
+
+
+def get_run(run_id: str) -> Optional[Dict]:
+    conn = _conn()
+    row = conn.execute(
+        "SELECT run_id, status, inputs, meta, last_node, error, attempts, created_at, updated_at "
+        "FROM workflow_runs WHERE run_id=?", (run_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    nodes: List[str] = [
+        node for (node,) in conn.execute(
+            "SELECT node FROM workflow_checkpoints WHERE run_id=? ORDER BY seq", (run_id,)
+        )
+    ]
+    return {
+        "run_id": row[0], "status": row[1], "inputs": json.loads(row[2]), "meta": json.loads(row[3] or "{}"),
+        "last_node": row[4], "error": row[5], "attempts": row[6], "created_at": row[7], "updated_at": row[8],
+        "completed_nodes": nodes,
+    }
+
+
+def prune_runs(max_age_seconds: Optional[float] = None) -> int:
+    """Forget runs (and their checkpoints) not touched for CHECKPOINT_RETENTION_HOURS."""
+    max_age_seconds = Config.CHECKPOINT_RETENTION_HOURS * 3600 if max_age_seconds is None else max_age_seconds
+    cutoff = time.time() - max_age_seconds
+    conn = _conn()
+    conn.execute(
+        "DELETE FROM workflow_checkpoints WHERE run_id IN (SELECT run_id FROM workflow_runs WHERE updated_at < ?)",
+        (cutoff,)
+    )
+    removed = conn.execute("DELETE FROM workflow_runs WHERE updated_at < ?", (cutoff,)).rowcount
+    if removed:
+        logger.info(f"Pruned {removed} workflow run(s) older than {max_age_seconds / 3600:.0f}h")
+    return removed
@@ -5,14 +5,88 @@ load_dotenv()
 
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-    MODEL_NAME = "llama-3.3-70b-versatile"
-    MODEL_NAME = "meta-llama/llama-4-scout-17b-16e-instruct"
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # None = Groq cloud; set to point at a local stand-in
+    MODEL_NAME = os.getenv("MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+    # Models the router (src/utils/model_router.py) picks from per call, e.g.
+    # "llama-3.1-8b-instant,meta-llama/llama-4-scout-17b-16e-instruct,llama-3.3-70b-versatile".
+    # Unset or a single name disables routing: every call uses MODEL_NAME (or that one name).
+    MODEL_POOL = os.getenv("MODEL_POOL", "")
+    MODEL_ROUTING = os.getenv("MODEL_ROUTING", "true").lower() in ("1", "true", "yes")
+    ROUTER_LARGE_PROMPT_TOKENS = int(os.getenv("ROUTER_LARGE_PROMPT_TOKENS", "4000"))  # larger prompts skip tier-1 models
     WHISPER_MODEL = "whisper-large-v3-turbo"
+    WHISPER_MAX_BYTES = 25 * 1024 * 1024  # Groq free tier upload limit
+    # Uploads may exceed the Whisper limit; preprocessing shrinks them before transcription
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+
+    # Content-addressed upload store (src/utils/storage.py) and its garbage collection
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+    NOTES_DIR = os.getenv("NOTES_DIR", "notes")
+    UPLOAD_MAX_AGE_HOURS = float(os.getenv("UPLOAD_MAX_AGE_HOURS", "72"))
+    UPLOAD_MAX_TOTAL_BYTES = int(os.getenv("UPLOAD_MAX_TOTAL_MB", "2048")) * 1024 * 1024
+    UPLOAD_GC_INTERVAL_SECONDS = float(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "600"))
+    UPLOAD_GC_MIN_AGE_SECONDS = float(os.getenv("UPLOAD_GC_MIN_AGE_SECONDS", "3600"))
+
+    # Resample to 16 kHz mono, compress long silences and re-encode before upload
+    # (src/core/preprocess.py). "ogg" (Opus) and "flac" need ffmpeg, otherwise WAV is used.
+    PREPROCESS_AUDIO = os.getenv("PREPROCESS_AUDIO", "true").lower() in ("1", "true", "yes")
+    PREPROCESS_FORMAT = os.getenv("PREPROCESS_FORMAT", "ogg")
+
+    # "multi": separate summary / action / prediction calls; "structured": one JSON-mode call
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "multi")
+
+    # Transcript compaction / prompt token budgeting
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+    PROMPT_TOKEN_RESERVE = int(os.getenv("PROMPT_TOKEN_RESERVE", "1500"))  # template, summary, actions
+    COMPACT_MAX_TURN_SECONDS = float(os.getenv("COMPACT_MAX_TURN_SECONDS", "60"))
+
+    # Local speaker-turn detection on the decoded audio (src/core/diarize.py)
+    DIARIZATION_ENABLED = os.getenv("DIARIZATION_ENABLED", "true").lower() in ("1", "true", "yes")
+    DIARIZATION_MAX_SPEAKERS = int(os.getenv("DIARIZATION_MAX_SPEAKERS", "6"))
+
+    # Process pool for CPU-bound stages (src/utils/process_pool.py); 0 workers = the available cores
+    # shared out among the WEB_CONCURRENCY API workers (uvicorn also reads it as its --workers default)
+    WEB_CONCURRENCY = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+    PROCESS_POOL_ENABLED = os.getenv("PROCESS_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+    PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "0"))
+    PROCESS_POOL_QUEUE = int(os.getenv("PROCESS_POOL_QUEUE", "16"))  # waiting tasks before callers block
 
     SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+    # Outbox sender (src/core/notify_slack.py)
+    SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api")  # point at a local stand-in for tests
+    SLACK_MESSAGE_LIMIT = 3900            # characters per post; longer notes continue in the thread
+    SLACK_RATE_PER_CHANNEL = float(os.getenv("SLACK_RATE_PER_CHANNEL", "1"))  # posts per second
+    SLACK_TIMEOUT_SECONDS = float(os.getenv("SLACK_TIMEOUT_SECONDS", "10"))
+    SLACK_MAX_ATTEMPTS = int(os.getenv("SLACK_MAX_ATTEMPTS", "6"))
+    SLACK_BACKOFF_SECONDS = 2.0
+    SLACK_POLL_SECONDS = 5.0
+    SLACK_CLAIM_TIMEOUT_SECONDS = 300.0
 
+    DB_PATH = os.getenv("DB_PATH", "instance/analytics.db")
+    # Action items whose character-trigram TF-IDF cosine reaches this count as one trend
+    ACTION_CLUSTER_THRESHOLD = float(os.getenv("ACTION_CLUSTER_THRESHOLD", "0.7"))
+    # Related-meetings index (src/core/meeting_index.py); changing the dimension needs a fresh index
+    MEETING_INDEX_PATH = os.getenv("MEETING_INDEX_PATH", "instance/meeting_index")
+    MEETING_INDEX_DIM = int(os.getenv("MEETING_INDEX_DIM", "256"))
+    MEETING_INDEX_PQ_SUBSPACES = int(os.getenv("MEETING_INDEX_PQ_SUBSPACES", "0"))  # 0 = no product quantization
 
+    # Per-node workflow checkpoints (src/utils/checkpoints.py), so failed runs resume
+    CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "instance/checkpoints.db")
+    CHECKPOINT_RETENTION_HOURS = float(os.getenv("CHECKPOINT_RETENTION_HOURS", "72"))
+    CHECKPOINT_STALE_SECONDS = float(os.getenv("CHECKPOINT_STALE_SECONDS", "900"))  # "running" this long = interrupted
 
+    # State shared by API workers (src/utils/state_store.py): sqlite | redis | memory
+    STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+    STATE_DB_PATH = os.getenv("STATE_DB_PATH", "instance/state.db")
+    REDIS_URL = os.getenv("REDIS_URL")
+    RECENT_RESULTS_MAX = int(os.getenv("RECENT_RESULTS_MAX", "100"))
+    # Serialized /get_meetings and /analytics responses kept per data version (src/interfaces/http_cache.py)
+    RESPONSE_CACHE_MAX = int(os.getenv("RESPONSE_CACHE_MAX", "64"))
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))  # smaller JSON responses go uncompressed
 
-if not Config.GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not set in .env")
\ No newline at end of file
+    @classmethod
+    def require_groq_key(cls) -> str:
+        """Checked when a Groq client is first built, not at import, so tooling can start without a key."""
+        if not cls.GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY not set in .env")
+        return cls.GROQ_API_KEY
\ No newline at end of file
@@ -0,0 +1,112 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.config import Config
+from src.utils.metrics import LLM_REQUESTS, LLM_TOKENS, current_node
+from src.utils.single_flight import SingleFlight, make_key
+
+
+# Identical prompts sent to the same model at the same time share one request
+llm_flight = SingleFlight("llm")
+
+# (id of a shared client, model) -> copy of that client bound to the model
+_routed: Dict[Tuple[int, str], object] = {}
+_routed_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(temperature: float = 0, json_mode: bool = False):
+    """
+    Shared ChatGroq client, built on first use.
+
+    LangChain/Groq are only imported here, so importing the API or CLI does not pay
+    for them, and one client (and its connection pool) is reused across calls.
+    """
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        temperature=temperature,
+        groq_api_key = Config.require_groq_key(),
+        model_name = Config.MODEL_NAME,
+        base_url = Config.GROQ_BASE_URL,
+        model_kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    )
+
+
+@lru_cache(maxsize=None)
+def get_groq_client():
+    """Shared Groq SDK client (used for Whisper transcription), built on first use."""
+    from groq import Groq
+
+    return Groq(api_key=Config.require_groq_key(), base_url=Config.GROQ_BASE_URL)
+
+
+def _model_of(llm) -> str:
+    return getattr(llm, "model_name", None) or getattr(llm, "model", "")
+
+
+def _with_model(llm, model: str):
+    """`llm` bound to `model`; copies share the original's HTTP client and connection pool."""
+    if _model_of(llm) == model or not hasattr(llm, "model_copy"):
+        return llm
+    key = (id(llm), model)
+    with _routed_lock:
+        routed = _routed.get(key)
+        if routed is None:
+            routed = _routed[key] = llm.model_copy(update={"model_name": model})
+        return routed
+
+
+def _invoke_and_record(llm, messages: List):
+    from src.core.compact import estimate_tokens
+    from src.utils.model_router import stats
+
+    node = current_node.get() or "other"
+    LLM_REQUESTS.inc(node=node)
+    start = time.perf_counter()
+    try:
+        response = llm.invoke(messages)
+    except Exception:
+        stats.record(_model_of(llm), time.perf_counter() - start, ok=False)
+        raise
+    stats.record(_model_of(llm), time.perf_counter() - start, ok=True)
+
+    # Prefer the provider's usage numbers; fall back to the local estimate
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens") or sum(estimate_tokens(str(m.content)) for m in messages)
+    output_tokens = usage.get("output_tokens") or estimate_tokens(str(response.content))
+    LLM_TOKENS.inc(input_tokens, node=node, direction="input")
+    LLM_TOKENS.inc(output_tokens, node=node, direction="output")
+    return response
+
+
+def invoke_messages(llm, messages: List, task: Optional[str] = None):
+    """
+    Invoke a chat model, coalescing identical in-flight requests.
+
+    The model is chosen per call by the router from the prompt size and the task (by
+    default inferred from the graph node making the call); `llm` supplies the temperature
+    and output format.
+    """
+    from src.core.compact import estimate_tokens
+    from src.utils.model_router import route
+
+    prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+    llm = _with_model(llm, route(current_node.get(), prompt_tokens, task))
+    key = make_key(
+        _model_of(llm),
+        getattr(llm, "temperature", None),
+        getattr(llm, "model_kwargs", None),
+        [(m.type, m.content) for m in messages]
+    )
+    return llm_flight.do(key, _invoke_and_record, llm, messages)
+
+
+def invoke_prompt(prompt, llm, variables: dict, task: Optional[str] = None) -> str:
+    """Render `prompt` (a ChatPromptTemplate) with `variables`, invoke `llm` and return the text output."""
+    from langchain_core.output_parsers import StrOutputParser
+
+    messages = prompt.format_messages(**variables)
+    return StrOutputParser().invoke(invoke_messages(llm, messages, task))
@@ -0,0 +1,148 @@
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts, sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            le_label = f'le="{le}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+# Graph node currently executing in this context, so LLM calls can be attributed to it
+current_node: ContextVar[str] = ContextVar("current_node", default="")
+
+
+def render_latest() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Workflow / node metrics
+NODE_DURATION = Histogram("clarity_node_duration_seconds", "Wall time of each meeting graph node", ["node"])
+NODE_ERRORS = Counter("clarity_node_errors_total", "Graph node runs that raised", ["node"])
+WORKFLOW_DURATION = Histogram("clarity_workflow_duration_seconds", "End-to-end run_workflow wall time", ["mode"])
+LLM_TOKENS = Counter("clarity_llm_tokens_total", "LLM tokens by node and direction (input/output)", ["node", "direction"])
+LLM_REQUESTS = Counter("clarity_llm_requests_total", "LLM requests sent by node", ["node"])
+AUDIO_SECONDS = Counter("clarity_audio_seconds_total", "Seconds of audio transcribed")
+SLACK_MESSAGES = Counter("clarity_slack_messages_total", "Slack outbox delivery attempts by outcome (sent/retry/failed)", ["outcome"])
+PROCESS_POOL_TASKS = Gauge("clarity_process_pool_tasks", "CPU tasks running or queued in the process pool")
+LLM_ROUTES = Counter("clarity_llm_routes_total", "Model routing decisions by task, chosen model and reason", ["task", "model", "reason"])
+LLM_MODEL_LATENCY = Histogram("clarity_llm_model_latency_seconds", "LLM call latency per model", ["model"])
+LLM_MODEL_ERRORS = Counter("clarity_llm_model_errors_total", "Failed LLM calls per model", ["model"])
+EVENT_LOOP_LAG = Histogram(
+    "clarity_event_loop_lag_seconds", "How late the API event loop runs a timer (sampled every 100 ms)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+CACHE_HITS = Counter("clarity_cache_hits_total", "Requests served by joining an in-flight computation", ["cache"])
+
+
+def observe_node(name: str, seconds: float, state: Optional[dict], error: Optional[BaseException]):
+    """`node_observers` hook for the meeting graph."""
+    NODE_DURATION.observe(seconds, node=name)
+    if error is not None:
+        NODE_ERRORS.inc(node=name)
@@ -0,0 +1,177 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src.utils.config import Config
+from src.utils.logger import logger
+from src.utils.metrics import LLM_MODEL_ERRORS, LLM_MODEL_LATENCY, LLM_ROUTES
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    tier: int                   # 1 = small and fast ... 3 = most capable
+    context_tokens: int
+    tokens_per_second: float    # nominal output speed, used until latency has been observed
+
+
+# Groq models the router knows about; names in MODEL_POOL that are not listed get DEFAULT_SPEC values
+KNOWN_MODELS: Dict[str, ModelSpec] = {
+    spec.name: spec for spec in (
+        ModelSpec("llama-3.1-8b-instant", 1, 131072, 560.0),
+        ModelSpec("meta-llama/llama-4-scout-17b-16e-instruct", 2, 131072, 460.0),
+        ModelSpec("llama-3.3-70b-versatile", 3, 131072, 280.0),
+        ModelSpec("openai/gpt-oss-120b", 3, 131072, 500.0),
+    )
+}
+DEFAULT_SPEC = ModelSpec("", 2, 131072, 300.0)
+
+# Node (see metrics.current_node) -> task type
+NODE_TASKS = {
+    "qa_chat": "interactive",
+    "generate_custom_prompts": "prompt",
+    "summarize": "heavy",
+    "extract_actions": "heavy",
+    "structured_extract": "heavy",
+}
+# Task type -> (lowest adequate tier, objective): "fast" picks the quickest adequate model,
+# "capable" the highest tier
+TASK_PROFILES: Dict[str, Tuple[int, str]] = {
+    "interactive": (1, "fast"),
+    "prompt": (2, "fast"),
+    "heavy": (2, "capable"),
+}
+
+EXPECTED_OUTPUT_TOKENS = 400    # for nominal latency estimates
+STATS_WINDOW = 50               # calls remembered per model
+STATS_MAX_AGE_SECONDS = 300.0   # older observations are ignored
+MIN_SAMPLES = 3
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+@dataclass
+class RouteRequest:
+    task: str
+    prompt_tokens: int
+    node: str
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+
+
+class ModelStats:
+    """Rolling latency and error rate per model over the last STATS_WINDOW calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+
+    def record(self, model: str, seconds: float, ok: bool):
+        with self._lock:
+            self._calls.setdefault(model, deque(maxlen=STATS_WINDOW)).append((time.time(), seconds, ok))
+        LLM_MODEL_LATENCY.observe(seconds, model=model)
+        if not ok:
+            LLM_MODEL_ERRORS.inc(model=model)
+
+    def summary(self, model: str) -> Dict:
+        """{"samples", "error_rate", "latency"}; latency is the median of successful calls (None if unknown)."""
+        cutoff = time.time() - STATS_MAX_AGE_SECONDS
+        with self._lock:
+            calls = [call for call in self._calls.get(model, ()) if call[0] >= cutoff]
+        latencies = sorted(seconds for _, seconds, ok in calls if ok)
+        return {
+            "samples": len(calls),
+            "error_rate": sum(1 for _, _, ok in calls if not ok) / len(calls) if calls else 0.0,
+            "latency": latencies[len(latencies) // 2] if latencies else None,
+        }
+
+
+class RoutingPolicy(ABC):
+    """Picks a model for one call. Replace the active policy with `set_policy`."""
+
+    @abstractmethod
+    def choose(self, request: RouteRequest, pool: List[ModelSpec], stats: ModelStats) -> RouteDecision:
+        ...
+
+
+class DefaultPolicy(RoutingPolicy):
+    """
+    Candidates must fit the prompt in their context window and not be failing (error rate
+    at or above UNHEALTHY_ERROR_RATE over recent calls). Interactive and prompt-generation
+    calls get the fastest candidate of adequate tier, by observed median latency (nominal
+    speed until enough calls have been seen); heavy calls get the most capable one.
+    Prompts over ROUTER_LARGE_PROMPT_TOKENS need at least tier 2.
+    """
+
+    def expected_latency(self, spec: ModelSpec, stats: ModelStats) -> float:
+        summary = stats.summary(spec.name)
+        if summary["latency"] is not None and summary["samples"] >= MIN_SAMPLES:
+            return summary["latency"]
+        return EXPECTED_OUTPUT_TOKENS / spec.tokens_per_second
+
+    def choose(self, request, pool, stats):
+        min_tier, objective = TASK_PROFILES.get(request.task, TASK_PROFILES["interactive"])
+        if request.prompt_tokens > Config.ROUTER_LARGE_PROMPT_TOKENS:
+            min_tier = max(min_tier, 2)
+
+        fitting = [spec for spec in pool if request.prompt_tokens + EXPECTED_OUTPUT_TOKENS <= spec.context_tokens]
+        healthy = []
+        for spec in fitting:
+            summary = stats.summary(spec.name)
+            if summary["samples"] < MIN_SAMPLES or summary["error_rate"] < UNHEALTHY_ERROR_RATE:
+                healthy.append(spec)
+        candidates, reason = healthy, objective
+        if not candidates:
+            candidates, reason = fitting or pool, "fallback"
+
+        adequate = [spec for spec in candidates if spec.tier >= min_tier]
+        if not adequate:
+            # Nothing of the wanted tier is usable: take the most capable that is
+            top = max(spec.tier for spec in candidates)
+            adequate, reason = [spec for spec in candidates if spec.tier == top], "degraded"
+
+        if objective == "capable":
+            chosen = max(adequate, key=lambda spec: (spec.tier, -self.expected_latency(spec, stats)))
+        else:
+            chosen = min(adequate, key=lambda spec: (self.expected_latency(spec, stats), -spec.tier))
+        return RouteDecision(chosen.name, reason)
+
+
+stats = ModelStats()
+_policy: RoutingPolicy = DefaultPolicy()
+
+
+def set_policy(policy: RoutingPolicy):
+    global _policy
+    _policy = policy
+
+
+def model_pool() -> List[ModelSpec]:
+    """MODEL_POOL's models; just MODEL_NAME when no pool is configured."""
+    names = [name.strip() for name in Config.MODEL_POOL.split(",") if name.strip()] or [Config.MODEL_NAME]
+    return [KNOWN_MODELS.get(name) or ModelSpec(name, DEFAULT_SPEC.tier, DEFAULT_SPEC.context_tokens,
+                                                DEFAULT_SPEC.tokens_per_second) for name in names]
+
+
+def route(node: Optional[str], prompt_tokens: int, task: Optional[str] = None) -> str:
+    """Model name for a call made from `node` with a prompt of `prompt_tokens` tokens."""
+    pool = model_pool()
+    if not Config.MODEL_ROUTING or len(pool) == 1:
+        return pool[0].name if len(pool) == 1 else Config.MODEL_NAME
+
+    request = RouteRequest(task=task or NODE_TASKS.get(node or "", "interactive"),
+                           prompt_tokens=prompt_tokens, node=node or "other")
+    try:
+        decision = _policy.choose(request, pool, stats)
+    except Exception as e:
+        logger.warning(f"Routing policy failed, using {Config.MODEL_NAME}: {e}")
+        decision = RouteDecision(Config.MODEL_NAME, "error")
+    LLM_ROUTES.inc(task=request.task, model=decision.model, reason=decision.reason)
+    logger.debug(f"Routed {request.task} call from {request.node} ({prompt_tokens} tokens) to {decision.model} ({decision.reason})")
+    return decision.model
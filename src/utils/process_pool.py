@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from src.utils.config import Config
+from src.utils.logger import logger
+from src.utils.metrics import PROCESS_POOL_TASKS
+
+
+# Modules the workers import up front, so the first real task does not pay for them
+WARM_MODULES = ("numpy", "src.core.preprocess", "src.core.diarize", "src.core.compact", "src.core.save_outputs")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_pool_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    """
+    PROCESS_POOL_WORKERS, or when it is 0 this process's share of the cores it may run on:
+    every API worker has its own pool, so the cores are divided by WEB_CONCURRENCY.
+    """
+    if Config.PROCESS_POOL_WORKERS > 0:
+        return Config.PROCESS_POOL_WORKERS
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(cores // Config.WEB_CONCURRENCY, 1)
+
+
+def _warm_worker():
+    import importlib
+
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+
+
+def _noop(_=None):
+    return os.getpid()
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, created on first use; None when PROCESS_POOL_ENABLED is off."""
+    global _pool, _slots
+    if not Config.PROCESS_POOL_ENABLED:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            workers = pool_size()
+            # "spawn": forking a process that already runs threads (uvicorn, the GC and
+            # Slack tasks, the workflow thread pool) can copy held locks into the child
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_warm_worker
+            )
+            # Running tasks plus at most PROCESS_POOL_QUEUE waiting ones; callers past that block
+            _slots = threading.BoundedSemaphore(workers + Config.PROCESS_POOL_QUEUE)
+            logger.info(f"Started process pool with {workers} worker(s)")
+        return _pool
+
+
+def warm_up():
+    """Start every worker now instead of on the first upload."""
+    pool = get_process_pool()
+    if pool is None:
+        return
+    try:
+        pids = set(pool.map(_noop, range(pool_size() * 2)))
+    except BrokenProcessPool as e:
+        logger.error(f"Process pool failed to start, CPU stages will run inline until it recovers: {e}")
+        _reset_broken(pool)
+        return
+    logger.info(f"Process pool warm: {len(pids)} worker(s) ready")
+
+
+def shutdown_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool, _slots = None, None
+
+
+def _reset_broken(pool: ProcessPoolExecutor):
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is pool:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool, _slots = None, None
+
+
+def run_cpu(fn: Callable, *args, **kwargs):
+    """
+    Run a CPU-bound, picklable `fn(*args, **kwargs)` in the process pool and wait for it.
+
+    Keeps heavy NumPy and pure-Python work off the threads that share the GIL with the
+    event loop. When the pool is disabled it runs inline; when a worker dies the pool is
+    rebuilt for the next call and this one runs inline.
+    """
+    pool = get_process_pool()
+    slots = _slots
+    if pool is None or slots is None:
+        return fn(*args, **kwargs)
+
+    name = getattr(fn, "__name__", "task")
+    with slots:
+        PROCESS_POOL_TASKS.inc()
+        try:
+            try:
+                future = pool.submit(fn, *args, **kwargs)
+            except RuntimeError as e:
+                if isinstance(e, BrokenProcessPool):
+                    raise
+                return fn(*args, **kwargs)  # pool shut down under us (application stopping)
+            return future.result()
+        except BrokenProcessPool:
+            logger.error(f"Process pool broke while running {name}; restarting it and running inline")
+            _reset_broken(pool)
+            return fn(*args, **kwargs)
+        finally:
+            PROCESS_POOL_TASKS.dec()
@@ -1,15 +1,9 @@
 from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
 from src.utils.logger import logger
-from src.utils.config import Config
-from langchain_groq import ChatGroq
+from src.utils.llm import get_chat_model, invoke_messages
 from langchain_core.messages import HumanMessage, SystemMessage
 
-chat = ChatGroq(
-    model = Config.MODEL_NAME,
-    temperature=0.5
-)
-
 # Summary prompt
 DEFAULT_SUMMARY_PROMPT = ChatPromptTemplate.from_template(
     "Summarize the following meeting transcript concisely, capturing key points, decisions and outcomes: \n\n{transcript}"
@@ -125,6 +119,29 @@ PREDICT_PROMPT = ChatPromptTemplate.from_template(
     "For each action item, predict risk of delay (Low/Medium/High) based on context:\nActions: {actions}\nTranscript: {transcript}"
 )
 
+# One-call structured extraction: summary, sentiment, action items and delay risk
+industry_focus = {
+    "General": "key points, decisions and outcomes",
+    "Finance": "compliance, decisions and outcomes, highlighting all regulatory aspects",
+    "Healthcare": "patient privacy, medical decisions and compliance with health regulations",
+    "Marketing": "campaign strategies, budget allocations and compliance with advertising standards",
+    "Education": "teaching strategies, student outcomes and compliance with educational policies",
+}
+
+STRUCTURED_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You extract structured meeting notes. Reply with a single JSON object that validates against this JSON schema and nothing else:\n{schema}"),
+    ("human", """
+From the meeting transcript below:
+- Write a concise summary focusing on {focus}.
+- Classify the overall sentiment as Positive, Neutral or Negative.
+- Extract every action item with description, assignee (infer from names mentioned; 'Unassigned' if unclear),
+  deadline (if mentioned; else 'N/A'), priority (High/Medium/Low based on context)
+  and delay_risk (Low/Medium/High, predicted from context).
+{instructions}
+Transcript: {transcript}
+"""),
+])
+
 # Q&A prompt for live chat
 QA_PROMPT = ChatPromptTemplate.from_template(
     """
@@ -152,7 +169,7 @@ def get_summary_prompt(industry: str, custom_description: Optional[str] = None)
             )
         ]
 
-        generated = chat.invoke(messages)
+        generated = invoke_messages(get_chat_model(temperature=0.5), messages)
 
         custom_template = generated.content.strip()
 
@@ -167,7 +184,7 @@ def get_action_prompt(industry: str, custom_description: Optional[str] = None) -
         logger.info(f"Generating custom action prompt for industry: {industry} with description: {custom_description}")
 
         # Ask model for a custom action item extraction prompt
-        response = chat.invoke([
+        response = invoke_messages(get_chat_model(temperature=0.5), [
             SystemMessage(content="You are an expert at writing structured meeting prompts."),
             HumanMessage(
                 content=f"Generate a customizable action item extraction prompt for a meeting in the {industry} industry based on this description: {custom_description}"
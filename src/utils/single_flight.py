@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+from src.utils.logger import logger
+from src.utils.metrics import CACHE_HITS
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable key from arbitrary parts (strings, numbers, None, dicts)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight computation.
+
+    The first caller for a key (the leader) runs the function; callers that arrive
+    while it is still running wait for the leader's result (or exception) instead of
+    starting their own. Nothing is cached once the call completes. Callers are threads
+    (API handlers reach it through the threadpool), so waiting blocks only the waiter.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.shared = 0
+
+    def _join_or_lead(self, key: str):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                CACHE_HITS.inc(cache=self.name)
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            logger.info(f"[{self.name}] joining in-flight call {key[:12]}")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from src.utils.config import Config
+from src.utils.logger import logger
+
+
+# Expired keys are deleted by the first write after this many seconds since the last sweep
+EXPIRY_SWEEP_SECONDS = 60.0
+
+
+class StateStore(ABC):
+    """
+    State shared by every API worker: small JSON values with optional TTLs and bounded
+    LRU caches. Backends: "sqlite" (default, one file in WAL mode, for several workers on
+    one box), "redis" (several boxes) and "memory" (single process).
+    """
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set `key` only if it is absent (or expired); True if this call set it."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def cache_put(self, namespace: str, key: str, value: Any, max_entries: int):
+        """Store in a cache that keeps the `max_entries` most recently used keys."""
+
+    @abstractmethod
+    def cache_get(self, namespace: str, key: str, default: Any = None) -> Any:
+        ...
+
+
+class MemoryStateStore(StateStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._caches: Dict[str, OrderedDict] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self, now: float):
+        # Called with the lock held; keys nobody reads again would otherwise stay forever
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + EXPIRY_SWEEP_SECONDS
+        for key in [key for key, (_, expires_at) in self._values.items() if expires_at is not None and expires_at <= now]:
+            del self._values[key]
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else default
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._sweep(time.time())
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            self._sweep(time.time())
+            if self._live(key):
+                return False
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def cache_put(self, namespace, key, value, max_entries):
+        with self._lock:
+            cache = self._caches.setdefault(namespace, OrderedDict())
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > max_entries:
+                cache.popitem(last=False)
+
+    def cache_get(self, namespace, key, default=None):
+        with self._lock:
+            cache = self._caches.get(namespace)
+            if not cache or key not in cache:
+                return default
+            cache.move_to_end(key)
+            return cache[key]
+
+
+class SQLiteStateStore(StateStore):
+    """One SQLite file in WAL mode; readers never block the writer, so workers share it cheaply."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv (expires_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT, key TEXT, value TEXT, accessed_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache (namespace, accessed_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pubsub (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT, payload TEXT, created_at REAL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit, so every statement is its own transaction
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key=? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _sweep(self, conn: sqlite3.Connection, now: float):
+        # Reads already skip expired keys; this keeps ones nobody reads again from piling up
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + EXPIRY_SWEEP_SECONDS
+        conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def set(self, key, value, ttl=None):
+        conn = self._conn()
+        self._sweep(conn, time.time())
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=str), time.time() + ttl if ttl else None)
+        )
+
+    def add(self, key, value, ttl=None):
+        conn = self._conn()
+        now = time.time()
+        self._sweep(conn, now)
+        cursor = conn.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value, expires_at=excluded.expires_at "
+            "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+            (key, json.dumps(value, default=str), now + ttl if ttl else None, now)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key=?", (key,))
+
+    def cache_put(self, namespace, key, value, max_entries):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, accessed_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, default=str), time.time())
+        )
+        conn.execute(
+            "DELETE FROM cache WHERE namespace=? AND key NOT IN "
+            "(SELECT key FROM cache WHERE namespace=? ORDER BY accessed_at DESC LIMIT ?)",
+            (namespace, namespace, max_entries)
+        )
+
+    def cache_get(self, namespace, key, default=None):
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM cache WHERE namespace=? AND key=?", (namespace, key)).fetchone()
+        if not row:
+            return default
+        conn.execute("UPDATE cache SET accessed_at=? WHERE namespace=? AND key=?", (time.time(), namespace, key))
+        return json.loads(row[0])
+
+    # Message log backing SQLiteSocketManager
+    def publish(self, channel: str, payload: str, retention_seconds: float = 60.0):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT INTO pubsub (channel, payload, created_at) VALUES (?, ?, ?)", (channel, payload, now))
+        conn.execute("DELETE FROM pubsub WHERE created_at < ?", (now - retention_seconds,))
+
+    def last_message_id(self, channel: str) -> int:
+        row = self._conn().execute("SELECT MAX(id) FROM pubsub WHERE channel=?", (channel,)).fetchone()
+        return row[0] or 0
+
+    def messages_after(self, channel: str, last_id: int) -> List[Tuple[int, str]]:
+        return self._conn().execute(
+            "SELECT id, payload FROM pubsub WHERE channel=? AND id>? ORDER BY id", (channel, last_id)
+        ).fetchall()
+
+
+class RedisStateStore(StateStore):
+    def __init__(self, url: str):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+
+    def get(self, key, default=None):
+        value = self.redis.get(f"state:{key}")
+        return json.loads(value) if value is not None else default
+
+    def set(self, key, value, ttl=None):
+        self.redis.set(f"state:{key}", json.dumps(value, default=str), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.redis.set(
+            f"state:{key}", json.dumps(value, default=str), nx=True, px=int(ttl * 1000) if ttl else None
+        ))
+
+    def delete(self, key):
+        self.redis.delete(f"state:{key}")
+
+    def cache_put(self, namespace, key, value, max_entries):
+        values, lru = f"cache:{namespace}", f"cache:{namespace}:lru"
+        pipe = self.redis.pipeline()
+        pipe.hset(values, key, json.dumps(value, default=str))
+        pipe.zadd(lru, {key: time.time()})
+        pipe.zrange(lru, 0, -(max_entries + 1))
+        evicted = pipe.execute()[-1]
+        if evicted:
+            pipe = self.redis.pipeline()
+            pipe.hdel(values, *evicted)
+            pipe.zrem(lru, *evicted)
+            pipe.execute()
+
+    def cache_get(self, namespace, key, default=None):
+        value = self.redis.hget(f"cache:{namespace}", key)
+        if value is None:
+            return default
+        self.redis.zadd(f"cache:{namespace}:lru", {key: time.time()})
+        return json.loads(value)
+
+
+@lru_cache(maxsize=None)
+def get_state_store() -> StateStore:
+    """The configured backend (STATE_BACKEND), created on first use."""
+    backend = Config.STATE_BACKEND
+    if backend == "memory":
+        store = MemoryStateStore()
+    elif backend == "redis":
+        if not Config.REDIS_URL:
+            raise ValueError("STATE_BACKEND=redis requires REDIS_URL")
+        store = RedisStateStore(Config.REDIS_URL)
+    elif backend == "sqlite":
+        store = SQLiteStateStore(Config.STATE_DB_PATH)
+    else:
+        raise ValueError(f"Unknown STATE_BACKEND {backend!r} (expected sqlite, redis or memory)")
+    logger.info(f"Shared state backend: {backend}")
+    return store
+
+
+class SQLiteSocketManager(AsyncPubSubManager):
+    """
+    Socket.IO client manager that relays emits between worker processes through the
+    SQLite state file, so an event emitted in one worker reaches clients connected to any.
+    Listeners poll for new rows every `poll_interval` seconds.
+    """
+    name = "sqlite"
+
+    def __init__(self, channel: str = "socketio", poll_interval: float = 0.05, **kwargs):
+        super().__init__(channel=channel, **kwargs)
+        self.poll_interval = poll_interval
+
+    async def _publish(self, data):
+        await asyncio.to_thread(get_state_store().publish, self.channel, json.dumps(data))
+
+    async def _listen(self):
+        store = get_state_store()
+        last_id = await asyncio.to_thread(store.last_message_id, self.channel)
+        while True:
+            rows = await asyncio.to_thread(store.messages_after, self.channel, last_id)
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+            if not rows:
+                await asyncio.sleep(self.poll_interval)
+
+
+def socket_manager() -> Optional[socketio.AsyncManager]:
+    """Client manager for the Socket.IO server that matches STATE_BACKEND (None = in-process)."""
+    if Config.STATE_BACKEND == "redis":
+        return socketio.AsyncRedisManager(Config.REDIS_URL)
+    if Config.STATE_BACKEND == "sqlite":
+        return SQLiteSocketManager()
+    return None
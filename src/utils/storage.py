@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from src.utils.config import Config
+from src.utils.logger import logger
+from src.utils.single_flight import make_key
+
+
+CHUNK_SIZE = 1024 * 1024
+TMP_DIR = ".tmp"
+SUFFIX_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+# Uploads referenced by a running workflow; garbage collection leaves them alone
+_pinned: Dict[str, int] = {}
+_pinned_lock = threading.Lock()
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def _suffix(filename: Optional[str]) -> str:
+    # Whisper and ffmpeg detect the format from the extension, so keep a sanitized one
+    suffix = os.path.splitext(filename or "")[1].lower()
+    return suffix if SUFFIX_RE.match(suffix) else ""
+
+
+def content_path(digest: str, suffix: str = "", upload_dir: Optional[str] = None) -> str:
+    """Where an upload with this SHA-256 lives: uploads/ab/abcdef....ext"""
+    return os.path.join(upload_dir or Config.UPLOAD_DIR, digest[:2], f"{digest}{suffix}")
+
+
+def _open_temp(tmp_dir: str):
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _store(tmp_path: str, path: str) -> bool:
+    """Move a finished temp file to its content path; True if that content was already stored."""
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        os.utime(path)  # refresh for age-based GC
+        return True
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+    return False
+
+
+def _discard(tmp_path: str):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+async def save_upload(file, max_bytes: Optional[int] = None, upload_dir: Optional[str] = None) -> Dict:
+    """
+    Stream an UploadFile to content-addressed storage.
+
+    The body is read in CHUNK_SIZE pieces, hashed as it is written to a private temp
+    file and then atomically renamed to its content path, so memory stays constant and
+    concurrent uploads (even of the same content) cannot clobber each other. Hashing and
+    file I/O run in worker threads, so a large upload never blocks the event loop.
+
+    Returns:
+        {"path", "digest", "size", "duplicate"}; `duplicate` is True when the same content
+        was already stored, in which case nothing new is kept.
+
+    Raises:
+        UploadTooLarge: if the body exceeds `max_bytes` (the partial file is removed)
+    """
+    upload_dir = upload_dir or Config.UPLOAD_DIR
+    max_bytes = max_bytes or Config.MAX_UPLOAD_BYTES
+
+    digest = hashlib.sha256()
+    size = 0
+    out, tmp_path = await asyncio.to_thread(_open_temp, os.path.join(upload_dir, TMP_DIR))
+    try:
+        try:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File size exceeds {max_bytes // (1024 * 1024)}MB limit")
+                await asyncio.to_thread(_write_chunk, out, digest, chunk)
+        finally:
+            await asyncio.to_thread(out.close)
+
+        hexdigest = digest.hexdigest()
+        path = content_path(hexdigest, _suffix(file.filename), upload_dir)
+        duplicate = await asyncio.to_thread(_store, tmp_path, path)
+    except BaseException:
+        await asyncio.to_thread(_discard, tmp_path)
+        raise
+
+    logger.info(f"Stored upload {file.filename} ({size} bytes) as {hexdigest[:12]}{' (duplicate)' if duplicate else ''}")
+    return {"path": path, "digest": hexdigest, "size": size, "duplicate": duplicate}
+
+
+def notes_path(digest: str, *params) -> str:
+    """Notes file for one set of processing parameters over one upload."""
+    return os.path.join(Config.NOTES_DIR, f"notes_{make_key(digest, *params)[:16]}.md")
+
+
+@contextmanager
+def pinned(path: str):
+    """Keep `path` out of garbage collection while the block runs."""
+    key = os.path.abspath(path)
+    with _pinned_lock:
+        _pinned[key] = _pinned.get(key, 0) + 1
+    try:
+        yield path
+    finally:
+        with _pinned_lock:
+            _pinned[key] -= 1
+            if not _pinned[key]:
+                del _pinned[key]
+
+
+def gc_uploads(max_age_seconds: Optional[float] = None, max_total_bytes: Optional[int] = None,
+               upload_dir: Optional[str] = None) -> Dict:
+    """
+    Delete uploads older than `max_age_seconds`, then the least recently used ones until
+    the store fits in `max_total_bytes`. Pinned files are never removed, and neither is
+    anything younger than UPLOAD_GC_MIN_AGE_SECONDS (it may be pinned by another worker);
+    abandoned temp files are removed once they are older than the age limit.
+    """
+    upload_dir = upload_dir or Config.UPLOAD_DIR
+    max_age_seconds = Config.UPLOAD_MAX_AGE_HOURS * 3600 if max_age_seconds is None else max_age_seconds
+    max_total_bytes = Config.UPLOAD_MAX_TOTAL_BYTES if max_total_bytes is None else max_total_bytes
+    now = time.time()
+
+    with _pinned_lock:
+        pinned_paths = set(_pinned)
+
+    entries = []
+    for root, _, files in os.walk(upload_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if os.path.abspath(path) not in pinned_paths:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    removed, freed = 0, 0
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        in_tmp = os.path.basename(os.path.dirname(path)) == TMP_DIR
+        expired = now - mtime > max_age_seconds
+        if now - mtime < Config.UPLOAD_GC_MIN_AGE_SECONDS and not expired:
+            continue
+        if expired or (total > max_total_bytes and not in_tmp):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+            total -= size
+
+    if removed:
+        logger.info(f"Upload GC removed {removed} file(s), {freed} bytes; {total} bytes remain")
+    return {"removed": removed, "freed_bytes": freed, "remaining_bytes": total}
+
@@ -0,0 +1,47 @@
+import pytest
+
+from src.core.compact import clean_text
+
+
+@pytest.mark.parametrize("text", [
+    "Call 555 555 1234",
+    "version 1, 1, 2",
+    "revenue grew 10 10 percent",
+    "We had had enough",
+    "Bora Bora trip",
+])
+def test_clean_text_keeps_real_repeats(text):
+    assert clean_text(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I I think we should ship", "I think we should ship"),
+    ("we we need the the budget", "we need the budget"),
+    ("so, um, and and then it's done", "so and then it's done"),
+    ("Uh, to to be honest", "to be honest"),
+])
+def test_clean_text_collapses_stutters_and_fillers(text, expected):
+    assert clean_text(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("You know, we should ship", "we should ship"),
+    ("It's, you know, fine", "It's fine"),
+    ("I mean, it works", "it works"),
+    ("We shipped it, you know.", "We shipped it."),
+    ("Hmm, mm-hm, sounds good", "sounds good"),
+])
+def test_clean_text_strips_interjections(text, expected):
+    assert clean_text(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Do you know Bob?",
+    "That's what I mean is the problem",
+    "I mean it",
+    "Do you know, Bob?",
+    "The HMM model beat the baseline",
+    "She studied at UM last year",
+])
+def test_clean_text_keeps_fillers_used_as_content(text):
+    assert clean_text(text) == text
@@ -0,0 +1,89 @@
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.core import transcribe
+from src.core.audio import DEFAULT_SAMPLE_RATE, load_audio
+from src.core.diarize import diarize_file
+from src.utils.config import Config
+
+
+def write_two_speakers(path, turns=8, turn_seconds=4.0, pause_seconds=2.0, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Alternating turns of two voiced "speakers" (different pitch and timbre); returns their segments."""
+    voices = [(110.0, [1.0, 0.8, 0.6, 0.4]), (240.0, [1.0, 0.2, 0.5, 0.1])]
+    rng = np.random.default_rng(0)
+    parts, segments, start = [], [], 0.0
+    for turn in range(turns):
+        f0, harmonics = voices[turn % 2]
+        t = np.arange(int(turn_seconds * sample_rate)) / sample_rate
+        # Voiced throughout: syllable-rate loudness changes, but no gaps between words
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+        parts.append(0.2 * envelope * sum(a * np.sin(2 * np.pi * f0 * (k + 1) * t) for k, a in enumerate(harmonics)))
+        segments.append({"start": start, "end": start + turn_seconds, "text": f"turn {turn}"})
+        start += turn_seconds
+        if pause_seconds:
+            parts.append(np.zeros(int(pause_seconds * sample_rate)))
+            start += pause_seconds
+    audio = np.concatenate(parts)
+    audio += rng.normal(0, 0.002, audio.size)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return segments
+
+
+def speakers(segments):
+    return [seg["speaker"] for seg in segments]
+
+
+def test_diarize_separates_speakers_with_pauses(tmp_path):
+    path = tmp_path / "meeting.wav"
+    segments = write_two_speakers(path)
+    assert speakers(diarize_file(str(path), segments)) == ["Speaker 1", "Speaker 2"] * 4
+
+
+def test_diarize_separates_speakers_without_pauses(tmp_path):
+    # No silence to take a noise floor from: the 10th percentile energy is already speech
+    path = tmp_path / "meeting.wav"
+    segments = write_two_speakers(path, pause_seconds=0.0)
+    assert speakers(diarize_file(str(path), segments)) == ["Speaker 1", "Speaker 2"] * 4
+
+
+class FakeWhisper:
+    """Groq client stand-in: one segment per run of sound in the uploaded file, on its own timeline."""
+
+    def __init__(self):
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self.create))
+        self.uploaded_seconds = None
+
+    def create(self, file, **kwargs):
+        audio, sample_rate = load_audio(file.name)
+        self.uploaded_seconds = audio.size / sample_rate
+        frame = sample_rate // 100
+        loud = np.abs(audio[:audio.size // frame * frame].reshape(-1, frame)).max(axis=1) > 0.05
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], loud.astype(np.int8), [0]])))
+        segments = [
+            {"start": start / 100, "end": end / 100, "text": f"turn {i}"}
+            for i, (start, end) in enumerate(zip(edges[::2], edges[1::2]))
+        ]
+        return SimpleNamespace(segments=segments, duration=self.uploaded_seconds, text="")
+
+
+def test_transcribe_diarizes_preprocessed_uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PREPROCESS_AUDIO", True)
+    monkeypatch.setattr(Config, "PREPROCESS_FORMAT", "wav")
+    monkeypatch.setattr(Config, "DIARIZATION_ENABLED", True)
+    monkeypatch.setattr(Config, "PROCESS_POOL_ENABLED", False)
+    whisper = FakeWhisper()
+    monkeypatch.setattr(transcribe, "get_groq_client", lambda: whisper)
+    path = tmp_path / "meeting.wav"
+    expected = write_two_speakers(path)
+
+    segments = transcribe.transcribe_audio(str(path))["segments"]
+
+    assert whisper.uploaded_seconds < expected[-1]["end"] - 5  # long pauses were cut before upload
+    assert speakers(segments) == ["Speaker 1", "Speaker 2"] * 4
+    assert [round(seg["start"]) for seg in segments] == [round(seg["start"]) for seg in expected]
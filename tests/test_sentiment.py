@@ -0,0 +1,21 @@
+from src.core import sentiment
+from src.core.sentiment import label_sentiment, score_batch
+
+
+def test_vocabulary_does_not_grow_with_unseen_words():
+    size = len(sentiment._token_weights)
+    score_batch([f"token{i} word{i}" for i in range(1000)])
+    assert len(sentiment._token_weights) == size
+
+
+def test_negation_and_contractions():
+    assert label_sentiment("The launch was a great success") == "Positive"
+    assert label_sentiment("The launch was not a success") == "Negative"
+    assert label_sentiment("We didn't hit the milestone") == "Negative"
+    # Negation flips the next few words, but not past the end of the clause
+    assert score_batch(["It is not bad"])[0] > 0
+    assert score_batch(["It is not. Bad"])[0] < 0
+
+
+def test_empty_texts_score_zero():
+    assert score_batch(["", None]).tolist() == [0.0, 0.0]
@@ -0,0 +1,17 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import LAZY_MODULES, ROOT
+
+
+def test_api_import_leaves_heavy_modules_unloaded():
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    code = "import json, sys, src.interfaces.api; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    eager = [name for name in loaded if name.split(".")[0] in LAZY_MODULES]
+    assert eager == []